@@ -3,6 +3,7 @@
 import { useState } from "react";
 import { motion, AnimatePresence } from "framer-motion";
 import { ChevronDown, List, ExternalLink } from "lucide-react";
+import { useExperimentSummary } from "./useExperimentSummary";
 
 const ease = [0.16, 1, 0.3, 1] as const;
 
@@ -16,6 +17,8 @@ const prospects = [
   { company: "MongoDB", score: 49, note: "Database company, heavy developer community" },
 ];
 
+const PROSPECTS_SHOWN = prospects.length;
+
 const datadogSignals = [
   { name: "Tool Count", score: 3, max: 3, detail: "19 confirmed tools" },
   { name: "Tool Overlap", score: 3, max: 3, detail: "Overlap in 4 categories" },
@@ -71,6 +74,8 @@ function ScoreBadge({ score }: { score: number }) {
 
 export function ProspectListPanel() {
   const [expanded, setExpanded] = useState<"list" | "datadog">("list");
+  const summary = useExperimentSummary();
+  const rows: typeof prospects = summary ? summary.topProspects.slice(0, PROSPECTS_SHOWN) : prospects;
 
   const toggle = (section: "list" | "datadog") => {
     setExpanded((prev) => (prev === section ? section : section));
@@ -136,7 +141,7 @@ export function ProspectListPanel() {
                   <span className="font-mono text-[10px] text-muted uppercase tracking-widest">Score</span>
                   <span className="font-mono text-[10px] text-muted uppercase tracking-widest">Key Signals</span>
                 </div>
-                {prospects.map((p, i) => (
+                {rows.map((p, i) => (
                   <div
                     key={p.company}
                     className={`grid grid-cols-[1fr_120px_2fr] gap-x-4 px-3 py-2 items-center border-b border-white/[0.03] ${
@@ -11,6 +11,7 @@ import {
   ResponsiveContainer,
   Cell,
 } from "recharts";
+import { useExperimentSummary, type ExperimentSummary } from "./useExperimentSummary";
 
 const ease = [0.16, 1, 0.3, 1] as const;
 
@@ -62,6 +63,26 @@ const scoreDistribution = [
   { range: "61-80", customers: 3, nonCustomers: 2 },
 ];
 
+// Shown until (or unless) the exported summary loads
+const fallback = { randomRate: 20, customerAvg: 42.8, nonCustomerAvg: 25.8, separation: 17 };
+const fallbackMetrics = [
+  { label: "Top Quartile", companies: 55, value: 55, lift: "2.75" },
+  { label: "Top Decile", companies: 22, value: 68, lift: "3.4" },
+];
+
+function heroMetrics(summary: ExperimentSummary | null) {
+  if (!summary) return fallbackMetrics;
+  return [
+    { label: "Top Quartile", block: summary.topQuartile },
+    { label: "Top Decile", block: summary.topDecile },
+  ].map(({ label, block }) => ({
+    label,
+    companies: block.companies,
+    value: Math.round(block.hitRate),
+    lift: block.lift === null ? "n/a" : String(block.lift),
+  }));
+}
+
 function CustomTooltip({
   active,
   payload,
@@ -86,28 +107,15 @@ function CustomTooltip({
 }
 
 export function ResultsPanel() {
+  const summary = useExperimentSummary();
+  const { randomRate, customerAvg, nonCustomerAvg, separation } = summary ?? fallback;
+  const distribution = summary?.scoreDistribution ?? scoreDistribution;
+
   return (
     <div className="flex flex-col gap-6 w-full">
       {/* Hero metrics */}
       <div className="grid grid-cols-2 gap-6">
-        {[
-          {
-            label: "Top Quartile",
-            sublabel: "55 companies",
-            value: 55,
-            suffix: "%",
-            lift: "2.75",
-            description: "are known Glean customers",
-          },
-          {
-            label: "Top Decile",
-            sublabel: "22 companies",
-            value: 68,
-            suffix: "%",
-            lift: "3.4",
-            description: "are known Glean customers",
-          },
-        ].map((metric, i) => (
+        {heroMetrics(summary).map((metric, i) => (
           <motion.div
             key={metric.label}
             className="flex flex-col gap-3 border-t border-b border-white/[0.08] py-5"
@@ -121,26 +129,26 @@ export function ResultsPanel() {
                 {metric.label}
               </span>
               <span className="font-mono text-[10px] text-faint">
-                {metric.sublabel}
+                {metric.companies} companies
               </span>
             </div>
             <div className="flex items-end gap-4">
               <span className="text-6xl font-serif font-medium text-foreground tracking-tighter leading-none">
                 <AnimatedNumber
                   value={metric.value}
-                  suffix={metric.suffix}
+                  suffix="%"
                 />
               </span>
               <div className="flex flex-col gap-0.5 pb-1">
                 <span className="text-sm text-secondary">
-                  {metric.description}
+                  are known Glean customers
                 </span>
                 <div className="flex items-center gap-2">
                   <span className="font-mono text-sm font-bold text-lime">
                     {metric.lift}x lift
                   </span>
                   <span className="font-mono text-xs text-faint">
-                    vs 20% random
+                    vs {Math.round(randomRate)}% random
                   </span>
                 </div>
               </div>
@@ -176,7 +184,7 @@ export function ResultsPanel() {
         <div className="bg-white/[0.02] border border-white/[0.06] rounded-2xl p-4">
           <ResponsiveContainer width="100%" height={180}>
             <BarChart
-              data={scoreDistribution}
+              data={distribution}
               barGap={4}
               margin={{ top: 10, right: 10, left: -10, bottom: 5 }}
             >
@@ -196,7 +204,7 @@ export function ResultsPanel() {
                 cursor={{ fill: "rgba(255,255,255,0.03)" }}
               />
               <Bar dataKey="customers" radius={[4, 4, 0, 0]} maxBarSize={48}>
-                {scoreDistribution.map((_, index) => (
+                {distribution.map((_, index) => (
                   <Cell
                     key={`customer-${index}`}
                     fill="#343CED"
@@ -204,7 +212,7 @@ export function ResultsPanel() {
                 ))}
               </Bar>
               <Bar dataKey="nonCustomers" radius={[4, 4, 0, 0]} maxBarSize={48}>
-                {scoreDistribution.map((_, index) => (
+                {distribution.map((_, index) => (
                   <Cell
                     key={`noncustomer-${index}`}
                     fill="rgba(255,255,255,0.15)"
@@ -229,12 +237,13 @@ export function ResultsPanel() {
             Non-Customer Avg
           </span>
           <span className="text-3xl font-serif text-secondary">
-            <AnimatedNumber value={25.8} decimals={1} />
+            <AnimatedNumber value={nonCustomerAvg} decimals={1} />
           </span>
         </div>
         <div className="flex flex-col items-center gap-0.5">
           <span className="font-mono text-[10px] font-bold text-lime">
-            +17pt
+            {separation >= 0 ? "+" : ""}
+            {Math.round(separation)}pt
           </span>
           <span className="text-accent text-lg">→</span>
         </div>
@@ -243,7 +252,7 @@ export function ResultsPanel() {
             Customer Avg
           </span>
           <span className="text-3xl font-serif text-foreground">
-            <AnimatedNumber value={42.8} decimals={1} />
+            <AnimatedNumber value={customerAvg} decimals={1} />
           </span>
         </div>
       </motion.div>
@@ -10,10 +10,13 @@ import {
   ResponsiveContainer,
   Cell,
 } from "recharts";
+import { useExperimentSummary, type ExperimentSummary } from "./useExperimentSummary";
 
 const ease = [0.16, 1, 0.3, 1] as const;
 
-const signalContributions = [
+type Contribution = { signal: string; contribution: number; strong?: boolean };
+
+const signalContributions: Contribution[] = [
   { signal: "KM Hiring", contribution: 2.37, strong: true },
   { signal: "Tool Count", contribution: 2.33, strong: true },
   { signal: "Tool Overlap", contribution: 1.5, strong: true },
@@ -26,6 +29,48 @@ const signalContributions = [
   { signal: "Distributed Workforce", contribution: 0.16 },
 ];
 
+const STRONG_SIGNALS = 4;
+
+const topSignals = [
+  {
+    name: "KM Hiring",
+    contribution: "+2.37",
+    custAvg: "1.2",
+    nonCustAvg: "0.4",
+    insight: "Customers 3x more likely to be hiring for KM roles",
+  },
+  {
+    name: "Tool Count",
+    contribution: "+2.33",
+    custAvg: "1.9",
+    nonCustAvg: "0.7",
+    insight: "Highest raw separation of any signal",
+  },
+];
+
+const insights = Object.fromEntries(topSignals.map((s) => [s.name, s.insight]));
+
+// The exported summary's signals are already sorted by contribution
+function contributions(summary: ExperimentSummary | null): Contribution[] {
+  if (!summary) return signalContributions;
+  return summary.signals.map((s, i) => ({
+    signal: s.label,
+    contribution: s.contribution,
+    strong: i < STRONG_SIGNALS,
+  }));
+}
+
+function callouts(summary: ExperimentSummary | null) {
+  if (!summary) return topSignals;
+  return summary.signals.slice(0, 2).map((s) => ({
+    name: s.label,
+    contribution: `${s.contribution >= 0 ? "+" : ""}${s.contribution.toFixed(2)}`,
+    custAvg: s.customerAvg.toFixed(1),
+    nonCustAvg: s.nonCustomerAvg.toFixed(1),
+    insight: insights[s.label] ?? `Weight ${s.weight} × separation ${s.separation.toFixed(2)}`,
+  }));
+}
+
 function CustomTooltip({
   active,
   payload,
@@ -47,6 +92,9 @@ function CustomTooltip({
 }
 
 export function SignalAnalysisPanel() {
+  const summary = useExperimentSummary();
+  const bars = contributions(summary);
+
   return (
     <div className="flex flex-col gap-6 w-full">
       {/* Chart + top signal callouts side by side */}
@@ -66,7 +114,7 @@ export function SignalAnalysisPanel() {
           <div className="bg-white/[0.02] border border-white/[0.06] rounded-2xl p-4">
             <ResponsiveContainer width="100%" height={280}>
               <BarChart
-                data={signalContributions}
+                data={bars}
                 layout="vertical"
                 margin={{ top: 2, right: 20, left: 0, bottom: 2 }}
                 barSize={16}
@@ -76,7 +124,7 @@ export function SignalAnalysisPanel() {
                   tick={{ fill: "#71717A", fontSize: 10, fontFamily: "monospace" }}
                   axisLine={{ stroke: "rgba(255,255,255,0.06)" }}
                   tickLine={false}
-                  domain={[0, 2.5]}
+                  domain={[0, "auto"]}
                 />
                 <YAxis
                   type="category"
@@ -91,7 +139,7 @@ export function SignalAnalysisPanel() {
                   cursor={{ fill: "rgba(255,255,255,0.03)" }}
                 />
                 <Bar dataKey="contribution" radius={[0, 4, 4, 0]}>
-                  {signalContributions.map((entry, index) => (
+                  {bars.map((entry, index) => (
                     <Cell
                       key={`bar-${index}`}
                       fill={entry.strong ? "#343CED" : "rgba(255,255,255,0.12)"}
@@ -105,22 +153,7 @@ export function SignalAnalysisPanel() {
 
         {/* Right: Top signal callouts stacked */}
         <div className="flex flex-col gap-4 pt-6">
-          {[
-            {
-              name: "KM Hiring",
-              contribution: "+2.37",
-              custAvg: "1.2",
-              nonCustAvg: "0.4",
-              insight: "Customers 3x more likely to be hiring for KM roles",
-            },
-            {
-              name: "Tool Count",
-              contribution: "+2.33",
-              custAvg: "1.9",
-              nonCustAvg: "0.7",
-              insight: "Highest raw separation of any signal",
-            },
-          ].map((signal, i) => (
+          {callouts(summary).map((signal, i) => (
             <motion.div
               key={signal.name}
               className="bg-accent/5 border border-accent/15 rounded-xl p-4 flex flex-col gap-2"
@@ -0,0 +1,82 @@
+"use client";
+
+import { useEffect, useState } from "react";
+
+// Written by experiment/scripts/export_bundle.py. The manifest is the only
+// file that is not content-hashed, so it is the one fetched uncached.
+const DATA_URL = "/experiment-data";
+
+export type HitBlock = {
+  companies: number;
+  customers: number;
+  hitRate: number;
+  lift: number | null;
+};
+
+export type SignalSummary = {
+  signal: string;
+  label: string;
+  weight: number;
+  customerAvg: number;
+  nonCustomerAvg: number;
+  separation: number;
+  contribution: number;
+};
+
+export type Prospect = {
+  rank: number;
+  company: string;
+  domain: string | null;
+  score: number;
+  note: string;
+  shard: number;
+};
+
+export type ExperimentSummary = {
+  companies: number;
+  customers: number;
+  nonCustomers: number;
+  randomRate: number;
+  topQuartile: HitBlock;
+  topDecile: HitBlock;
+  customerAvg: number;
+  nonCustomerAvg: number;
+  separation: number;
+  scoreDistribution: Array<{ range: string; customers: number; nonCustomers: number }>;
+  signals: SignalSummary[];
+  topProspects: Prospect[];
+};
+
+let summaryRequest: Promise<ExperimentSummary | null> | null = null;
+
+async function fetchJson(url: string, init?: RequestInit) {
+  const response = await fetch(url, init);
+  if (!response.ok) throw new Error(`${url}: ${response.status}`);
+  return response.json();
+}
+
+function loadSummary() {
+  if (!summaryRequest) {
+    summaryRequest = fetchJson(`${DATA_URL}/manifest.json`, { cache: "no-store" })
+      .then((manifest: { summary: string }) => fetchJson(`${DATA_URL}/${manifest.summary}`))
+      .catch(() => null); // no export yet: panels keep their built-in numbers
+  }
+  return summaryRequest;
+}
+
+/** The exported summary bundle, or null until it loads (or if there is none). */
+export function useExperimentSummary() {
+  const [summary, setSummary] = useState<ExperimentSummary | null>(null);
+
+  useEffect(() => {
+    let active = true;
+    loadSummary().then((loaded) => {
+      if (active) setSummary(loaded);
+    });
+    return () => {
+      active = false;
+    };
+  }, []);
+
+  return summary;
+}
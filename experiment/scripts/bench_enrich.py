@@ -0,0 +1,246 @@
+"""
+Offline benchmark for enrich.py, run against fake_claude.py instead of the real CLI.
+
+For each size it builds a scratch workspace (generated company lists, the
+real prompt template, a `claude` shim on PATH) and runs a fresh enrich.py
+process in it. It then reports:
+
+- throughput (companies/hour)
+- call latency p50/p95/p99/max
+- retry overhead: extra calls per company and the share of call time
+  spent on failed attempts
+- salvage counts
+- peak RSS and CPU time of the orchestrator process
+
+Retry and cool-down delays are scaled down (--delay-scale) so failure
+handling is exercised without waiting minutes.
+
+Usage:
+    python experiment/scripts/bench_enrich.py [--sizes 200,2000,20000]
+        [--latency lognormal:0.2,0.5] [--fail-rate 0.05] [--quota-rate 0]
+        [--truncate-rate 0.02] [--prose-rate 0.1] [--concurrency 10]
+        [--delay-scale 0.01] [--enrich-args "--batch-size=4"] [--keep]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+BASE_DIR = SCRIPTS_DIR.parent
+PROMPT_TEMPLATE = BASE_DIR / "prompts" / "enrichment_prompt.txt"
+FAKE_CLAUDE = SCRIPTS_DIR / "fake_claude.py"
+
+INDUSTRIES = ["Software Development", "Financial Services", "Retail", "Hospital & Health Care",
+              "Manufacturing", "Marketing & Advertising", "Higher Education", "Logistics"]
+TYPES = ["Privately Held", "Public Company", "Nonprofit"]
+
+
+def generate_companies(n, seed=0, customer_share=0.2):
+    """(known customers, non-customers) shaped like data/raw/*.json."""
+    rng = random.Random(seed)
+    known, non = [], []
+    for i in range(n):
+        company = {
+            "company_name": f"Bench Co {i}",
+            "domain": f"bench{i}.example.com",
+            "description": "Benchmark company",
+            "industry": rng.choice(INDUSTRIES),
+            "employee_count": int(rng.lognormvariate(6, 1.5)),
+            "type": rng.choice(TYPES),
+            "location": "Somewhere",
+            "country": "United States",
+            "total_funding": None,
+        }
+        (known if rng.random() < customer_share else non).append(company)
+    return known, non
+
+
+def make_workspace(root, n, seed):
+    raw = root / "data" / "raw"
+    raw.mkdir(parents=True)
+    known, non = generate_companies(n, seed)
+    (raw / "known_customers.json").write_text(json.dumps(known))
+    (raw / "non_customers_176.json").write_text(json.dumps(non))
+    (root / "prompts").mkdir()
+    shutil.copy(PROMPT_TEMPLATE, root / "prompts" / "enrichment_prompt.txt")
+    bin_dir = root / "bin"
+    bin_dir.mkdir()
+    shim = bin_dir / "claude"
+    shim.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_CLAUDE}" "$@"\n')
+    shim.chmod(0o755)
+    return bin_dir
+
+
+def child_main(workspace, concurrency, delay_scale, enrich_args):
+    """Run enrich.main() with every path pointed into `workspace` (runs in the benchmarked process)."""
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    import enrich
+    import retry_policy
+
+    root = Path(workspace)
+    enrich.BASE_DIR = root
+    enrich.DATA_DIR = root / "data"
+    enrich.ENRICHED_DIR = root / "data" / "enriched"
+    enrich.REPLAY_DIR = root / "data" / "enriched_replay"
+    enrich.CACHE_DIR = root / "data" / "cache"
+    enrich.JOURNAL_FILE = root / "data" / "journal.sqlite"
+    enrich.STORE_FILE = root / "data" / "enriched.sqlite"
+    enrich.PROMPT_TEMPLATE = root / "prompts" / "enrichment_prompt.txt"
+    enrich.LOG_FILE = root / "enrichment.log"
+    enrich.EVENTS_FILE = root / "events.jsonl"
+    enrich.PROGRESS_FILE = root / "progress.json"
+    enrich.QUOTA_STATE_FILE = root / "quota.json"
+    enrich.MAX_CONCURRENCY = concurrency
+    enrich.COOLDOWN_SECONDS *= delay_scale
+    enrich.MAX_COOLDOWN_SECONDS *= delay_scale
+    for rule in retry_policy.RETRY_RULES.values():
+        rule["base_delay"] *= delay_scale
+        rule["max_delay"] *= delay_scale
+
+    sys.argv = ["enrich.py", "--metrics-port=0", *enrich_args]
+    started = time.time()
+    asyncio.run(enrich.main())
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak_rss = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    (root / "bench_child.json").write_text(json.dumps({
+        "wall_seconds": time.time() - started,
+        "peak_rss_bytes": peak_rss,
+        "cpu_seconds": usage.ru_utime + usage.ru_stime,
+    }))
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+def summarize(workspace, n):
+    child = json.loads((workspace / "bench_child.json").read_text())
+    durations = []
+    outcomes = Counter()
+    failed_seconds = total_seconds = 0.0
+    saved = failed = 0
+    with open(workspace / "events.jsonl") as f:
+        for line in f:
+            event = json.loads(line)
+            kind = event["event"]
+            if kind in ("attempt", "batch_attempt"):
+                outcomes[event["outcome"]] += 1
+                if event["outcome"] in ("cached", "cancelled", "cache_miss"):
+                    continue
+                durations.append(event["duration_seconds"])
+                total_seconds += event["duration_seconds"]
+                if event.get("error"):
+                    failed_seconds += event["duration_seconds"]
+            elif kind == "company":
+                saved += event["outcome"] == "saved"
+                failed += event["outcome"] == "failed"
+    durations.sort()
+    progress = json.loads((workspace / "progress.json").read_text())
+    wall = child["wall_seconds"]
+    return {
+        "companies": n,
+        "saved": saved,
+        "failed": failed,
+        "wall_seconds": round(wall, 1),
+        "throughput_per_hour": round(saved / wall * 3600) if wall else None,
+        "calls": len(durations),
+        "extra_calls_per_company": round(len(durations) / max(saved + failed, 1) - 1, 3),
+        "failed_call_time_share": round(failed_seconds / total_seconds, 3) if total_seconds else 0,
+        "latency_p50": percentile(durations, 50),
+        "latency_p95": percentile(durations, 95),
+        "latency_p99": percentile(durations, 99),
+        "latency_max": durations[-1] if durations else None,
+        "outcomes": dict(outcomes),
+        "salvage": progress.get("salvage"),
+        "peak_rss_mb": round(child["peak_rss_bytes"] / 2 ** 20, 1),
+        "orchestrator_cpu_seconds": round(child["cpu_seconds"], 1),
+    }
+
+
+def report(result):
+    lines = [
+        f"=== {result['companies']} companies ===",
+        f"Saved / failed:        {result['saved']} / {result['failed']}",
+        f"Wall time:             {result['wall_seconds']}s",
+        f"Throughput:            {result['throughput_per_hour']} companies/hour",
+        f"Call latency (s):      p50={result['latency_p50']} p95={result['latency_p95']} "
+        f"p99={result['latency_p99']} max={result['latency_max']}",
+        f"Retry overhead:        {result['extra_calls_per_company']} extra calls/company, "
+        f"{result['failed_call_time_share']:.1%} of call time on failed attempts",
+        f"Outcomes:              {result['outcomes']}",
+        f"Salvage:               {result['salvage']}",
+        f"Orchestrator:          peak RSS {result['peak_rss_mb']} MB, CPU {result['orchestrator_cpu_seconds']}s",
+    ]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark enrich.py against the fake claude CLI.")
+    parser.add_argument("--sizes", default="200,2000,20000", help="Comma-separated company counts")
+    parser.add_argument("--latency", default="lognormal:0.2,0.5",
+                        help="fixed:S | uniform:A,B | lognormal:MEDIAN,SIGMA (seconds per call)")
+    parser.add_argument("--fail-rate", type=float, default=0.05)
+    parser.add_argument("--exit-codes", default="1,2,137")
+    parser.add_argument("--quota-rate", type=float, default=0.0)
+    parser.add_argument("--truncate-rate", type=float, default=0.02)
+    parser.add_argument("--prose-rate", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, default=10, help="enrich.MAX_CONCURRENCY")
+    parser.add_argument("--delay-scale", type=float, default=0.01,
+                        help="Multiplier for retry backoff and breaker cool-downs (default 0.01)")
+    parser.add_argument("--enrich-args", default="", help='Extra enrich.py flags, e.g. "--batch-size=4"')
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON lines")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch workspaces")
+    parser.add_argument("--child", metavar="WORKSPACE", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_main(args.child, args.concurrency, args.delay_scale, shlex.split(args.enrich_args))
+        return
+
+    for n in (int(s) for s in args.sizes.split(",")):
+        workspace = Path(tempfile.mkdtemp(prefix=f"bench_enrich_{n}_"))
+        bin_dir = make_workspace(workspace, n, args.seed)
+        env = {
+            **os.environ,
+            "PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+            "FAKE_CLAUDE_LATENCY": args.latency,
+            "FAKE_CLAUDE_FAIL_RATE": str(args.fail_rate),
+            "FAKE_CLAUDE_EXIT_CODES": args.exit_codes,
+            "FAKE_CLAUDE_QUOTA_RATE": str(args.quota_rate),
+            "FAKE_CLAUDE_TRUNCATE_RATE": str(args.truncate_rate),
+            "FAKE_CLAUDE_PROSE_RATE": str(args.prose_rate),
+            "FAKE_CLAUDE_SEED": str(args.seed),
+        }
+        cmd = [sys.executable, __file__, "--child", str(workspace), "--concurrency", str(args.concurrency),
+               "--delay-scale", str(args.delay_scale), "--enrich-args", args.enrich_args]
+        with open(workspace / "stdout.log", "w") as out:
+            proc = subprocess.run(cmd, env=env, stdout=out, stderr=subprocess.STDOUT)
+        if proc.returncode != 0:
+            print(f"enrich.py exited with {proc.returncode}; see {workspace / 'stdout.log'}")
+            continue
+        result = summarize(workspace, n)
+        print(json.dumps(result) if args.json else report(result))
+        print()
+        if args.keep:
+            print(f"Workspace kept at {workspace}")
+        else:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
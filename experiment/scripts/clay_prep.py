@@ -1,16 +1,79 @@
 """
 Merge Clay CSV exports, deduplicate, remove known customers,
 and produce a clean combined dataset.
+
+Ingest runs in two stages so multi-million-row exports stay fast and use
+bounded memory:
+
+1. Parse, in parallel. With pyarrow installed (engine "arrow"), each batch
+   file is streamed through Arrow's multithreaded CSV reader in blocks, and
+   employee count (exact count, else size-bucket midpoint) and funding
+   ($, commas, K/M/B suffix) are computed as vectorized column expressions.
+   Without it (engine "python"), a process pool parses the batch files
+   side by side with the row-wise parsers below, each into a JSONL part file.
+2. Select, in file order: domain dedupe (first occurrence wins) and
+   known-customer suppression, then the output writer. Only the set of seen
+   domains grows with the input. Known customers are matched by
+   customer_matcher.CustomerMatcher (normalized, registrable and regional
+   domains, name-token prefixes) in O(1) per row, loaded from --customers
+   (default data/raw/known_customers.json; the built-in lists below if that
+   file does not exist).
+3. Resolve entities (unless --no-resolve): records that are one company
+   under different domains or names (www./regional variants, rebrands) are
+   clustered on registrable domain, LinkedIn slug and normalized name, and
+   each cluster is written as one canonical record with a merged_from list
+   (see entity_resolution.py). Selected rows are spooled to a temp file
+   while the keys are clustered, then streamed back through the merge.
+
+Output is written incrementally, via a temp file renamed into place:
+json (all_companies.json, same layout as before), jsonl, or parquet
+(columnar; needs pyarrow).
+
+Usage:
+    python experiment/scripts/clay_prep.py
+    python experiment/scripts/clay_prep.py --format parquet --output data/raw/all_companies.parquet
+    python experiment/scripts/clay_prep.py --engine python --workers 8 --format jsonl --output all.jsonl
+    python experiment/scripts/clay_prep.py --customers data/raw/customers_crm_export.csv
+    python experiment/scripts/clay_prep.py --no-resolve
 """
+import argparse
 import csv
 import json
 import os
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
 
+from company_source import CSV_COLUMNS, FUNDING_SUFFIXES, SIZE_MIDPOINTS, chunked, clean_row, iter_companies
+from customer_matcher import CustomerMatcher
+from entity_resolution import CANONICAL, KEEP, Resolver
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
 RAW_DIR = Path(__file__).parent.parent / "data" / "raw"
 OUTPUT_FILE = Path(__file__).parent.parent / "data" / "raw" / "all_companies.json"
+CUSTOMERS_FILE = RAW_DIR / "known_customers.json"
+ARROW_BLOCK_BYTES = 16 << 20  # CSV bytes per Arrow record batch
+ROWS_PER_CHUNK = 50_000  # rows per chunk when streaming JSONL part files
+
+FIELD_TYPES = {"employee_count": "int64", "total_funding": "float64", "is_known_customer": "bool_"}
+SCHEMA = pa.schema([(field, getattr(pa, FIELD_TYPES.get(field, "string"))())
+                    for field in [*CSV_COLUMNS, "is_known_customer"]]) if pa else None
+# Entity resolution provenance, set on canonical records that absorbed others
+MERGED_FROM = pa.field("merged_from", pa.list_(pa.struct(
+    [(field, pa.string()) for field in ("domain", "company_name", "source", "rule")]))) if pa else None
+OUTPUT_SCHEMA = SCHEMA.append(MERGED_FROM) if pa else None
 
-# 44 known Glean customers (lowercase domains and names for matching)
+# 44 known Glean customers (lowercase domains and names for matching); the
+# fallback when there is no customer file
 KNOWN_CUSTOMERS = [
     "booking.com", "databricks", "wealthsimple", "confluent", "webflow",
     "super.com", "upside", "grammarly", "cro metrics", "duolingo",
@@ -40,152 +103,402 @@ KNOWN_DOMAINS = [
 ]
 
 
+_default_matcher = None
+
+
+def load_matcher(path=None):
+    """CustomerMatcher from a customer file, or from the built-in lists if there is none."""
+    path = Path(path) if path else CUSTOMERS_FILE
+    if path.exists():
+        return CustomerMatcher.from_file(path)
+    return CustomerMatcher(names=KNOWN_CUSTOMERS, domains=KNOWN_DOMAINS)
+
+
 def is_known_customer(name, domain):
-    name_lower = name.lower().strip()
-    domain_lower = domain.lower().strip() if domain else ""
-
-    # Exact domain match (most reliable)
-    for kd in KNOWN_DOMAINS:
-        if kd == domain_lower:
-            return True
-
-    # Exact name match or name starts with known customer
-    for kc in KNOWN_CUSTOMERS:
-        if name_lower == kc or name_lower.startswith(kc + " ") or kc == name_lower:
-            return True
-        # Also check if known customer name matches start of company name
-        # but only for names longer than 4 chars to avoid false positives
-        if len(kc) > 4 and name_lower == kc:
-            return True
-
-    return False
-
-
-def parse_employee_count(size_str, exact_count):
-    """Try exact count first, fall back to size bucket midpoint."""
-    if exact_count and str(exact_count).strip():
-        try:
-            return int(str(exact_count).strip().replace(",", ""))
-        except ValueError:
-            pass
-
-    if not size_str:
-        return None
-
-    size_str = size_str.strip()
-    midpoints = {
-        "1-10 employees": 5,
-        "11-50 employees": 30,
-        "51-200 employees": 125,
-        "201-500 employees": 350,
-        "501-1,000 employees": 750,
-        "1,001-5,000 employees": 3000,
-        "5,001-10,000 employees": 7500,
-        "10,001+ employees": 15000,
-    }
-    return midpoints.get(size_str)
-
-
-def parse_funding(funding_str):
-    if not funding_str or not funding_str.strip():
-        return None
-    f = funding_str.strip().replace("$", "").replace(",", "")
-    multiplier = 1
-    if f.endswith("B"):
-        multiplier = 1_000_000_000
-        f = f[:-1]
-    elif f.endswith("M"):
-        multiplier = 1_000_000
-        f = f[:-1]
-    elif f.endswith("K"):
-        multiplier = 1_000
-        f = f[:-1]
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = load_matcher()
+    return _default_matcher.match(name, domain) is not None
+
+
+def parse_to_part(csv_file, part_path):
+    """Process-pool worker: parse one batch file into a JSONL part file; returns its path."""
+    with open(csv_file, "r", encoding="utf-8", newline="") as f, open(part_path, "w") as out:
+        for row in csv.DictReader(f):
+            company = clean_row(row)
+            if company["company_name"] and company["domain"]:
+                out.write(json.dumps(company) + "\n")
+    return part_path
+
+
+def iter_python_files(csv_files, workers, part_dir):
+    """(csv_file, chunks of records) in file order; every file is parsed in a process pool up front."""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(parse_to_part, f, Path(part_dir) / f"part{i}.jsonl") for i, f in enumerate(csv_files)]
+        for csv_file, future in zip(csv_files, futures):
+            yield csv_file, _read_part(future.result())
+
+
+def _read_part(part_path):
+    with open(part_path) as f:
+        while True:
+            chunk = [json.loads(line) for line in islice(f, ROWS_PER_CHUNK)]
+            if not chunk:
+                break
+            yield chunk
+    os.unlink(part_path)
+
+
+def _midpoints(size_bucket):
+    return pc.take(pa.array(list(SIZE_MIDPOINTS.values()), pa.int64()),
+                   pc.index_in(size_bucket, value_set=pa.array(list(SIZE_MIDPOINTS))))
+
+
+def arrow_clean(table):
+    """Vectorized clean_row over a table of raw CSV strings; drops rows without a name or domain."""
+    n = table.num_rows
+
+    def text(header):
+        column = table[header] if header in table.column_names else pa.nulls(n, pa.string())
+        return pc.utf8_trim_whitespace(pc.fill_null(column, ""))
+
+    columns = {field: text(header) for field, header in CSV_COLUMNS.items()}
+
+    exact = pc.replace_substring(columns["employee_count"], ",", "")
+    valid = pc.match_substring_regex(exact, r"^[+-]?\d{1,18}$")  # parse_employee_count's rule; fits int64
+    exact = pc.if_else(valid, pc.replace_substring_regex(exact, r"^\+", ""), pa.scalar(None, pa.string()))
+    columns["employee_count"] = pc.coalesce(pc.cast(exact, pa.int64()), _midpoints(columns["size_bucket"]))
+
+    funding = pc.replace_substring(pc.replace_substring(columns["total_funding"], "$", ""), ",", "")
+    parts = pc.extract_regex(funding, r"^\s*(?P<num>[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)\s*(?P<suffix>[KMB]?)$")
+    multiplier = pc.take(pa.array([1.0, *map(float, FUNDING_SUFFIXES.values())]),
+                         pc.index_in(pc.struct_field(parts, "suffix"), value_set=pa.array(["", *FUNDING_SUFFIXES])))
+    columns["total_funding"] = pc.multiply(pc.cast(pc.struct_field(parts, "num"), pa.float64()), multiplier)
+    columns["is_known_customer"] = pc.fill_null(pa.nulls(n, pa.bool_()), False)
+
+    cleaned = pa.table(columns, schema=SCHEMA)
+    return cleaned.filter(pc.and_(pc.not_equal(columns["company_name"], ""), pc.not_equal(columns["domain"], "")))
+
+
+def iter_arrow_files(csv_files):
+    """(csv_file, cleaned Arrow tables) in file order, each file streamed in ARROW_BLOCK_BYTES blocks."""
+    for csv_file in csv_files:
+        with open(csv_file, "r", encoding="utf-8", newline="") as f:
+            header = next(csv.reader(f), [])
+        if not header:
+            yield csv_file, iter(())
+            continue
+        reader = pacsv.open_csv(
+            csv_file,
+            read_options=pacsv.ReadOptions(block_size=ARROW_BLOCK_BYTES, use_threads=True),
+            parse_options=pacsv.ParseOptions(newlines_in_values=True),
+            # Everything as text, like csv.DictReader, so the parsing rules match the python engine
+            convert_options=pacsv.ConvertOptions(column_types={h: pa.string() for h in header},
+                                                 strings_can_be_null=False),
+        )
+        yield csv_file, (arrow_clean(pa.Table.from_batches([batch])) for batch in reader)
+
+
+class Selector:
+    """The sequential stage: domain dedupe (first occurrence wins), known-customer removal, stats.
+
+    With a resolver, every row that survives the domain dedupe (customers
+    included, flagged) is handed to it; customer clusters are dropped and the
+    stats counted by resolve() on the merged output.
+    """
+
+    def __init__(self, matcher, resolver=None):
+        self.matcher = matcher
+        self.resolver = resolver
+        self.source = ""  # batch file being selected, for merge provenance
+        self.seen_domains = set()
+        self.known_found = []
+        self.kept = 0
+        self.size_dist = Counter()
+        self.with_funding = 0
+        self.with_exact_count = 0
+        self.merged = 0
+        self.merge_rules = Counter()
+
+    def keep(self, name, domain, linkedin_url=""):
+        if domain.lower() in self.seen_domains:
+            return False
+        self.seen_domains.add(domain.lower())
+        known = self.matcher.match(name, domain) is not None
+        if known:
+            self.known_found.append(name)
+        else:
+            self.kept += 1
+        if self.resolver is None:
+            return not known
+        # Customers go to the resolver too, so their other domains and rebrands are dropped with them
+        self.resolver.add(name, domain, linkedin_url, self.source, known)
+        return True
+
+    def select_rows(self, rows):
+        rows = [c for c in rows if self.keep(c["company_name"], c["domain"], c["linkedin_url"])]
+        if self.resolver is None:
+            self.count_rows(rows)
+        return rows
+
+    def count_rows(self, rows):
+        for c in rows:
+            self.size_dist[c["size_bucket"] or "Unknown"] += 1
+            self.with_funding += bool(c["total_funding"])
+            self.with_exact_count += (c["employee_count"] is not None
+                                      and c["employee_count"] != SIZE_MIDPOINTS.get(c["size_bucket"]))
+
+    def select_table(self, table):
+        columns = (table[field].to_pylist() for field in ("company_name", "domain", "linkedin_url"))
+        table = table.filter(pa.array([self.keep(*row) for row in zip(*columns)], pa.bool_()))
+        if self.resolver is None:
+            self.count_table(table)
+        return table
+
+    def count_table(self, table):
+        for row in pc.value_counts(table["size_bucket"]).to_pylist():
+            self.size_dist[row["values"] or "Unknown"] += row["counts"]
+        funding, count = table["total_funding"], table["employee_count"]
+        self.with_funding += pc.sum(pc.fill_null(pc.not_equal(funding, 0.0), False)).as_py() or 0
+        from_bucket = pc.fill_null(pc.equal(count, _midpoints(table["size_bucket"])), False)
+        self.with_exact_count += pc.sum(pc.and_(pc.is_valid(count), pc.invert(from_bucket))).as_py() or 0
+
+    def resolve(self, spool, writer):
+        """Cluster the tracked rows and write them, merged, from `spool` (the selected rows, in order)."""
+        resolver = self.resolver
+        self.merge_rules = resolver.resolve()
+        before, self.kept = self.kept, 0
+        if spool.suffix == ".parquet":
+            # Only cluster members are converted to Python; the rest stays columnar
+            offset = 0
+            for batch in pq.ParquetFile(spool).iter_batches(batch_size=ROWS_PER_CHUNK):
+                picks = [j for j in range(batch.num_rows) if resolver.action[offset + j]]
+                if picks:
+                    resolver.collect(zip((offset + j for j in picks), batch.take(picks).to_pylist()))
+                offset += batch.num_rows
+            offset = 0
+            for batch in pq.ParquetFile(spool).iter_batches(batch_size=ROWS_PER_CHUNK):
+                table = _merge_batch(batch, offset, resolver)
+                self.count_table(table)
+                writer.write_table(table)
+                self.kept += table.num_rows
+                offset += batch.num_rows
+        else:
+            resolver.collect((i, c) for i, c in enumerate(iter_companies(spool)) if resolver.action[i])
+            for chunk in chunked(resolver.merge(iter_companies(spool)), ROWS_PER_CHUNK):
+                self.count_rows(chunk)
+                writer.write_rows(chunk)
+                self.kept += len(chunk)
+        self.merged = before - self.kept - len(resolver.customer_duplicates)
+
+
+def _merge_batch(batch, offset, resolver):
+    """A spooled batch with merged-away rows dropped and each cluster's first row replaced by its merged record."""
+    table = pa.Table.from_batches([batch])
+    table = table.append_column(MERGED_FROM, pa.nulls(table.num_rows, MERGED_FROM.type))
+    action = resolver.action[offset:offset + table.num_rows]
+    if not any(action):
+        return table
+    order, canonical = [], []
+    for j, a in enumerate(action):
+        if a == KEEP:
+            order.append(j)
+        elif a == CANONICAL:
+            order.append(table.num_rows + len(canonical))
+            canonical.append(resolver.canonical[offset + j])
+    if canonical:
+        table = pa.concat_tables([table, pa.Table.from_pylist(canonical, schema=OUTPUT_SCHEMA)])
+    return table.take(pa.array(order, pa.int64()))
+
+
+def _umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+OUTPUT_MODE = 0o644 & ~_umask()  # as if written with open(), not mkstemp's 0600
+
+
+class _Output:
+    """Writes to a temp file beside `path`; close() renames it into place."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, self.tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        os.close(fd)
+
+    def write_table(self, table):
+        rows = table.to_pylist()
+        if MERGED_FROM.name in table.column_names:
+            # Only merged records carry provenance in row formats
+            for row in rows:
+                if row[MERGED_FROM.name] is None:
+                    del row[MERGED_FROM.name]
+        self.write_rows(rows)
+
+    def close(self):
+        os.chmod(self.tmp, OUTPUT_MODE)
+        os.replace(self.tmp, self.path)
+
+    def abort(self):
+        Path(self.tmp).unlink(missing_ok=True)
+
+
+class JsonArrayWriter(_Output):
+    """The same bytes json.dump(companies, f, indent=2) writes, one record at a time."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.file = open(self.tmp, "w")
+        self.empty = True
+
+    def write_rows(self, rows):
+        for row in rows:
+            body = json.dumps(row, indent=2).replace("\n", "\n  ")
+            self.file.write(("[\n  " if self.empty else ",\n  ") + body)
+            self.empty = False
+
+    def close(self):
+        self.file.write("[]" if self.empty else "\n]")
+        self.file.close()
+        super().close()
+
+    def abort(self):
+        self.file.close()
+        super().abort()
+
+
+class JsonlWriter(_Output):
+    def __init__(self, path):
+        super().__init__(path)
+        self.file = open(self.tmp, "w")
+
+    def write_rows(self, rows):
+        self.file.writelines(json.dumps(row) + "\n" for row in rows)
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+    def abort(self):
+        self.file.close()
+        super().abort()
+
+
+class ParquetWriter(_Output):
+    def __init__(self, path, schema=None):
+        super().__init__(path)
+        self.schema = schema or OUTPUT_SCHEMA
+        self.writer = pq.ParquetWriter(self.tmp, self.schema)
+
+    def write_rows(self, rows):
+        if rows:
+            self.writer.write_table(pa.Table.from_pylist(rows, schema=self.schema))
+
+    def write_table(self, table):
+        if MERGED_FROM.name in self.schema.names and MERGED_FROM.name not in table.column_names:
+            table = table.append_column(MERGED_FROM, pa.nulls(table.num_rows, MERGED_FROM.type))
+        if table.num_rows:
+            self.writer.write_table(table)
+
+    def close(self):
+        self.writer.close()
+        super().close()
+
+    def abort(self):
+        self.writer.close()
+        super().abort()
+
+
+WRITERS = {"json": JsonArrayWriter, "jsonl": JsonlWriter, "parquet": ParquetWriter}
+
+
+def ingest(csv_files, output, fmt="json", engine="auto", workers=None, matcher=None, resolve=True):
+    """Parse, dedupe, filter and resolve `csv_files` into `output`; returns the Selector with its stats."""
+    if engine == "auto":
+        engine = "arrow" if pa else "python"
+    if (engine == "arrow" or fmt == "parquet") and pa is None:
+        raise SystemExit("--engine arrow and --format parquet need pyarrow: pip install pyarrow")
+
+    selector = Selector(matcher or load_matcher(), Resolver() if resolve else None)
+    writer = WRITERS[fmt](output)
     try:
-        return float(f) * multiplier
-    except ValueError:
-        return None
+        with tempfile.TemporaryDirectory(dir=Path(output).parent) as part_dir:
+            selected = writer
+            if resolve:
+                # Spool the kept rows until every record's keys are known
+                spool_path = Path(part_dir) / ("selected.parquet" if engine == "arrow" else "selected.jsonl")
+                selected = ParquetWriter(spool_path, SCHEMA) if engine == "arrow" else JsonlWriter(spool_path)
+            files = iter_arrow_files(csv_files) if engine == "arrow" else iter_python_files(csv_files, workers, part_dir)
+            for csv_file, batches in files:
+                before = selector.kept
+                selector.source = csv_file.name
+                for batch in batches:
+                    if engine == "arrow":
+                        selected.write_table(selector.select_table(batch))
+                    else:
+                        selected.write_rows(selector.select_rows(batch))
+                print(f"  {csv_file.name}: {selector.kept - before} companies added")
+            if resolve:
+                selected.close()
+                selector.resolve(spool_path, writer)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+    return selector
 
 
 def main():
-    all_companies = []
-    seen_domains = set()
-    known_found = []
+    parser = argparse.ArgumentParser(description="Merge Clay CSV exports into one deduplicated company list.")
+    parser.add_argument("--input-dir", type=Path, default=RAW_DIR, help="Directory holding batch*.csv")
+    parser.add_argument("--output", type=Path, default=OUTPUT_FILE)
+    parser.add_argument("--format", choices=sorted(WRITERS), default="json",
+                        help="json (one indented array, as before), jsonl, or parquet (needs pyarrow)")
+    parser.add_argument("--engine", choices=["auto", "arrow", "python"], default="auto",
+                        help="arrow: vectorized, needs pyarrow; python: process pool (default: arrow if installed)")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size for the python engine")
+    parser.add_argument("--customers", type=Path, default=CUSTOMERS_FILE,
+                        help="Known-customer list (.json, .jsonl, .csv, .parquet with company_name, domain, "
+                             "optional aliases/domains); default data/raw/known_customers.json")
+    parser.add_argument("--no-resolve", action="store_true",
+                        help="Skip entity resolution (exact-domain dedupe only, as before)")
+    args = parser.parse_args()
 
-    csv_files = sorted(RAW_DIR.glob("batch*.csv"))
+    csv_files = sorted(args.input_dir.glob("batch*.csv"))
     print(f"Found {len(csv_files)} batch files")
+    matcher = load_matcher(args.customers)
+    if args.customers.exists():
+        print(f"Loaded {matcher.size} known customers from {args.customers}")
+    else:
+        print(f"No customer file at {args.customers}; using the built-in list of {len(KNOWN_DOMAINS)}")
 
-    for csv_file in csv_files:
-        with open(csv_file, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            count = 0
-            for row in reader:
-                name = row.get("Name", "").strip()
-                domain = row.get("Domain", "").strip()
-
-                if not name or not domain:
-                    continue
-
-                # Deduplicate by domain
-                if domain.lower() in seen_domains:
-                    continue
-                seen_domains.add(domain.lower())
-
-                # Check if known customer
-                if is_known_customer(name, domain):
-                    known_found.append(name)
-                    continue
-
-                employee_count = parse_employee_count(
-                    row.get("Size", ""),
-                    row.get("Employee Count", "")
-                )
-
-                company = {
-                    "company_name": name,
-                    "domain": domain,
-                    "description": row.get("Description", "").strip(),
-                    "industry": row.get("Primary Industry", "").strip(),
-                    "size_bucket": row.get("Size", "").strip(),
-                    "employee_count": employee_count,
-                    "type": row.get("Type", "").strip(),
-                    "location": row.get("Location", "").strip(),
-                    "country": row.get("Country", "").strip(),
-                    "linkedin_url": row.get("LinkedIn URL", "").strip(),
-                    "total_funding": parse_funding(row.get("Total Funds Raised", "")),
-                    "total_funding_raw": row.get("Total Funds Raised", "").strip(),
-                    "founded": row.get("Founded", "").strip(),
-                    "is_known_customer": False,
-                }
-                all_companies.append(company)
-                count += 1
-
-            print(f"  {csv_file.name}: {count} companies added")
-
-    print(f"\nKnown customers found and removed: {len(known_found)}")
-    for kc in known_found:
+    selector = ingest(csv_files, args.output, args.format, args.engine, args.workers, matcher,
+                      resolve=not args.no_resolve)
+
+    print(f"\nKnown customers found and removed: {len(selector.known_found)}")
+    for kc in selector.known_found:
         print(f"  - {kc}")
+    if selector.resolver is not None and selector.resolver.customer_duplicates:
+        print(f"Removed as other domains/names of known customers: {len(selector.resolver.customer_duplicates)}")
+        for name in selector.resolver.customer_duplicates:
+            print(f"  - {name}")
 
-    print(f"\nTotal non-customer companies: {len(all_companies)}")
+    if not args.no_resolve:
+        rules = ", ".join(f"{n} by {rule}" for rule, n in selector.merge_rules.most_common())
+        print(f"\nDuplicate entities merged: {selector.merged}" + (f" ({rules})" if rules else ""))
+
+    print(f"\nTotal non-customer companies: {selector.kept}")
 
-    # Size distribution
-    size_dist = {}
-    for c in all_companies:
-        bucket = c["size_bucket"] or "Unknown"
-        size_dist[bucket] = size_dist.get(bucket, 0) + 1
     print("\nSize distribution:")
-    for bucket, count in sorted(size_dist.items()):
+    for bucket, count in sorted(selector.size_dist.items()):
         print(f"  {bucket}: {count}")
 
-    # Check how many have funding data
-    with_funding = sum(1 for c in all_companies if c["total_funding"])
-    with_exact_count = sum(1 for c in all_companies if c["employee_count"] and c["size_bucket"] not in str(c["employee_count"]))
-    print(f"\nWith funding data: {with_funding}/{len(all_companies)}")
-    print(f"With exact employee count: {with_exact_count}/{len(all_companies)}")
-
-    # Save
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(all_companies, f, indent=2)
-    print(f"\nSaved to {OUTPUT_FILE}")
+    print(f"\nWith funding data: {selector.with_funding}/{selector.kept}")
+    print(f"With exact employee count: {selector.with_exact_count}/{selector.kept}")
+    print(f"\nSaved to {args.output}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,218 @@
+"""
+Streaming company readers for enrich.py.
+
+Company lists are read one record at a time, so a 100k-row list costs no
+more memory than a 200-row one:
+
+- .json: a top-level array of objects (or one object), decoded element by
+  element from a buffered read
+- .jsonl / .ndjson: one object per line, blank lines skipped
+- .csv: one company per row. Columns use the JSON field names
+  (company_name, domain, employee_count, ...), or are a raw Clay export
+  (Name, Domain, Primary Industry, ...), cleaned by clean_row exactly as
+  clay_prep.py does (funding strings, Size-bucket employee midpoints)
+- .parquet: clay_prep.py's columnar output, read one row group at a time
+  (needs pyarrow)
+
+Each source is either a known-customer list or a non-customer list, and its
+records are tagged is_known_customer accordingly. A source given with
+known=None is a mixed list: each record's own is_known_customer field (or a
+CSV column of that name) decides, defaulting to False.
+"""
+import csv
+import json
+from itertools import islice
+from pathlib import Path
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+READ_CHUNK_CHARS = 1 << 16
+
+SIZE_MIDPOINTS = {
+    "1-10 employees": 5,
+    "11-50 employees": 30,
+    "51-200 employees": 125,
+    "201-500 employees": 350,
+    "501-1,000 employees": 750,
+    "1,001-5,000 employees": 3000,
+    "5,001-10,000 employees": 7500,
+    "10,001+ employees": 15000,
+}
+FUNDING_SUFFIXES = {"K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
+MAX_EXACT_COUNT = 10 ** 18  # larger exact counts are junk, and may not fit int64; use the size bucket
+
+# Output field -> Clay CSV header, in output order
+CSV_COLUMNS = {
+    "company_name": "Name",
+    "domain": "Domain",
+    "description": "Description",
+    "industry": "Primary Industry",
+    "size_bucket": "Size",
+    "employee_count": "Employee Count",
+    "type": "Type",
+    "location": "Location",
+    "country": "Country",
+    "linkedin_url": "LinkedIn URL",
+    "total_funding": "Total Funds Raised",
+    "total_funding_raw": "Total Funds Raised",
+    "founded": "Founded",
+}
+CLAY_HEADERS = set(CSV_COLUMNS.values())
+INT_FIELDS = ("employee_count",)
+TRUE_VALUES = ("1", "true", "yes", "y", "t")
+
+
+def iter_json_array(f):
+    """Objects of a top-level JSON array in file `f`, decoded one at a time."""
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    started = eof = False
+    while True:
+        # Skip whitespace and separators between elements
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buf) and not started:
+            started = True
+            if buf[pos] == "[":
+                pos += 1
+                continue
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        if pos < len(buf):
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # A number at the very end of the buffer may continue in the next chunk
+                if end < len(buf) or eof or isinstance(obj, (dict, list)):
+                    yield obj
+                    pos = end
+                    continue
+        if eof:
+            return
+        chunk = f.read(READ_CHUNK_CHARS)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+
+
+def parse_employee_count(size_str, exact_count):
+    """Try exact count first, fall back to size bucket midpoint."""
+    if exact_count and str(exact_count).strip():
+        try:
+            count = int(str(exact_count).strip().replace(",", ""))
+        except ValueError:
+            count = None
+        if count is not None and abs(count) < MAX_EXACT_COUNT:
+            return count
+
+    if not size_str:
+        return None
+
+    return SIZE_MIDPOINTS.get(size_str.strip())
+
+
+def parse_funding(funding_str):
+    if not funding_str or not funding_str.strip():
+        return None
+    f = funding_str.strip().replace("$", "").replace(",", "")
+    multiplier = 1
+    if f[-1:] in FUNDING_SUFFIXES:
+        multiplier = FUNDING_SUFFIXES[f[-1]]
+        f = f[:-1]
+    try:
+        return float(f) * multiplier
+    except ValueError:
+        return None
+
+
+def clean_row(row):
+    """One company record from a raw Clay CSV row (row-wise reference for the Arrow engine)."""
+    def text(field):
+        return (row.get(CSV_COLUMNS[field]) or "").strip()
+
+    company = {field: text(field) for field in CSV_COLUMNS}
+    company["employee_count"] = parse_employee_count(row.get("Size", ""), row.get("Employee Count", ""))
+    company["total_funding"] = parse_funding(row.get("Total Funds Raised", ""))
+    company["is_known_customer"] = False
+    return company
+
+
+def _coerce_row(row):
+    """CSV strings -> the types the JSON lists use (ints, floats, None for blanks).
+
+    A raw Clay export (any CSV_COLUMNS header) goes through clean_row, as in
+    clay_prep.py; other columns use the JSON field names.
+    """
+    clay = not CLAY_HEADERS.isdisjoint(row)
+    company = clean_row(row) if clay else {}
+    for column, value in row.items():
+        if column is None or (clay and column in CLAY_HEADERS):
+            continue
+        value = value.strip() if isinstance(value, str) else value
+        if value == "":
+            value = None
+        elif column in INT_FIELDS:
+            value = parse_employee_count(None, value)
+        elif column == "total_funding":
+            value = parse_funding(value)
+        elif column == "is_known_customer":
+            value = value.lower() in TRUE_VALUES
+        company[column] = value
+    if not clay and company.get("employee_count") is None and company.get("size_bucket"):
+        company["employee_count"] = SIZE_MIDPOINTS.get(company["size_bucket"])
+    return company
+
+
+def iter_companies(path):
+    """Company dicts from one .json, .jsonl/.ndjson, .csv or .parquet file, streamed."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".parquet":
+        if pq is None:
+            raise RuntimeError(f"Reading {path.name} needs pyarrow: pip install pyarrow")
+        for batch in pq.ParquetFile(path).iter_batches():
+            yield from batch.to_pylist()
+        return
+    with open(path, encoding="utf-8", newline="" if suffix == ".csv" else None) as f:
+        if suffix == ".csv":
+            for row in csv.DictReader(f):
+                yield _coerce_row(row)
+        elif suffix in (".jsonl", ".ndjson"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            for obj in iter_json_array(f):
+                if isinstance(obj, dict):
+                    yield obj
+
+
+def iter_sources(sources):
+    """Companies from every (path, is_known_customer) source in order, tagged and with a domain."""
+    for path, known in sources:
+        for company in iter_companies(path):
+            if not company.get("domain"):
+                continue
+            if known is None:
+                company["is_known_customer"] = bool(company.get("is_known_customer"))
+            else:
+                company["is_known_customer"] = known
+            company["company_name"] = company.get("company_name") or company["domain"]
+            yield company
+
+
+def chunked(iterable, size):
+    """Lists of up to `size` consecutive items."""
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
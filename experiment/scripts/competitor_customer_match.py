@@ -3,12 +3,26 @@
 Cross-reference competitor customer lists against our 220-company dataset.
 Produces a standalone JSON file with match results per company.
 Does NOT edit any existing enrichment files.
+
+Names are matched with name_matcher.NameIndex: competitor names are
+normalized and indexed once, and each company is scored only against the
+names that share a blocking key with it.
+
+Usage:
+    python experiment/scripts/competitor_customer_match.py
+    python experiment/scripts/competitor_customer_match.py --competitors scraped_logos.json
+    python experiment/scripts/competitor_customer_match.py --first-word-min 0 --substring-ratio 0.8
+
+--competitors is a JSON object of competitor -> [customer names], used
+instead of the lists below.
 """
 
+import argparse
 import json
-import re
 from pathlib import Path
 
+from name_matcher import FIRST_WORD_MIN, SUBSTRING_RATIO, Name, NameIndex
+
 # Competitor customer lists scraped via WebFetch on 2026-02-18
 COMPETITOR_CUSTOMERS = {
     "Guru": [
@@ -50,54 +64,27 @@ COMPETITOR_CUSTOMERS = {
 }
 
 
-def normalize(name: str) -> str:
-    """Lowercase, strip punctuation/suffixes, collapse whitespace."""
-    s = name.lower().strip()
-    # remove common suffixes
-    for suffix in [", inc.", ", inc", " inc.", " inc", " llc", " ltd", " corp",
-                   " corporation", ".com", ".io", ".ai", ".co"]:
-        if s.endswith(suffix):
-            s = s[: -len(suffix)]
-    # remove punctuation
-    s = re.sub(r"[^a-z0-9\s]", "", s)
-    # collapse whitespace
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+_pair_index = NameIndex()
 
 
 def fuzzy_match(company_name: str, competitor_name: str) -> bool:
     """Check if two names refer to the same company. Conservative to avoid false positives."""
-    a = normalize(company_name)
-    b = normalize(competitor_name)
-
-    # exact match after normalization
-    if a == b:
-        return True
-
-    # space-collapsed match (handles "World Wide Technology" vs "Worldwide Technology")
-    a_nospace = a.replace(" ", "")
-    b_nospace = b.replace(" ", "")
-    if a_nospace == b_nospace:
-        return True
-
-    # first-word match only if the first word is long enough (>=6 chars)
-    # handles "Databricks" matching "Databricks, Inc." etc.
-    a_first = a.split()[0] if a.split() else ""
-    b_first = b.split()[0] if b.split() else ""
-    if len(a_first) >= 6 and len(b_first) >= 6 and a_first == b_first:
-        return True
-
-    # substring match only if the shorter string is >=75% the length of the longer
-    # this prevents "Viva" matching "Conviva" or "Cohere" matching "Coherent Solutions"
-    if len(a) >= 5 and len(b) >= 5:
-        shorter, longer = (a, b) if len(a) <= len(b) else (b, a)
-        if shorter in longer and len(shorter) / len(longer) >= 0.75:
-            return True
-
-    return False
+    return _pair_index.rule(Name(company_name), Name(competitor_name)) is not None
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Match companies against competitor customer lists")
+    parser.add_argument("--competitors", type=Path, help="JSON object of competitor -> [customer names]")
+    parser.add_argument("--first-word-min", type=int, default=FIRST_WORD_MIN,
+                        help=f"Min first-word length for a first-word match, 0 to disable (default {FIRST_WORD_MIN})")
+    parser.add_argument("--substring-ratio", type=float, default=SUBSTRING_RATIO,
+                        help=f"Min shorter/longer length for a substring match, 0 to disable (default {SUBSTRING_RATIO})")
+    args = parser.parse_args()
+
+    competitor_customers = COMPETITOR_CUSTOMERS
+    if args.competitors:
+        competitor_customers = json.loads(args.competitors.read_text())
+
     base = Path(__file__).resolve().parent.parent / "data" / "raw"
     all_companies = json.loads((base / "all_companies.json").read_text())
     known_customers = json.loads((base / "known_customers.json").read_text())
@@ -115,11 +102,16 @@ def main():
 
     # build flat list of (competitor_name, source) pairs
     competitor_entries = []
-    for source, names in COMPETITOR_CUSTOMERS.items():
+    for source, names in competitor_customers.items():
         for name in names:
             competitor_entries.append((name, source))
 
-    total_competitor_names = sum(len(v) for v in COMPETITOR_CUSTOMERS.values())
+    rules = [r for r, on in (("exact", True), ("nospace", True), ("first_word", args.first_word_min > 0),
+                             ("substring", args.substring_ratio > 0)) if on]
+    index = NameIndex((name for name, _ in competitor_entries), first_word_min=args.first_word_min,
+                      substring_ratio=args.substring_ratio, rules=rules)
+
+    total_competitor_names = sum(len(v) for v in competitor_customers.values())
     print(f"Total competitor customer names: {total_competitor_names}")
 
     # match each company
@@ -131,9 +123,9 @@ def main():
         is_customer = co.get("is_known_customer", False)
 
         matches = []
-        for comp_name, source in competitor_entries:
-            if fuzzy_match(company_name, comp_name):
-                matches.append({"competitor": source, "matched_name": comp_name})
+        for i, _ in index.matches(company_name):
+            comp_name, source = competitor_entries[i]
+            matches.append({"competitor": source, "matched_name": comp_name})
 
         # deduplicate by competitor (a company might match multiple names on same page)
         seen_competitors = set()
@@ -186,7 +178,7 @@ def main():
 
     summary = {
         "signal_name": "competitor_km_customer",
-        "sources_scraped": list(COMPETITOR_CUSTOMERS.keys()),
+        "sources_scraped": list(competitor_customers.keys()),
         "total_competitor_names": total_competitor_names,
         "total_companies_checked": len(all_cos),
         "total_matches": match_count,
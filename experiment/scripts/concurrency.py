@@ -0,0 +1,258 @@
+"""
+Adaptive concurrency governor for enrich.py.
+
+Additive-increase / multiplicative-decrease (AIMD) on the in-flight window:
+- Every `limit` successful calls grow the window by one (roughly +1 per round)
+- A failed call shrinks the window by `decrease_factor`, at most once per round
+  (failures from calls started before the last decrease are ignored)
+- Successful but slow calls (over `latency_target`) hold the window steady
+
+A circuit breaker sits in front of the window and is shared by every worker:
+- closed: calls flow
+- open: a streak of failures (shorter for quota/auth errors, a single auth
+  error is enough) stops all new calls for a cool-down that doubles on
+  each consecutive trip
+- half-open: after the cool-down exactly one probe call runs; success closes
+  the breaker (from the minimum window), failure re-opens it
+
+An optional quota schedule (quota_window.QuotaSchedule) gates calls in the
+same way: outside a quota window, or ahead of the window's budget pace, no
+new call starts. Waiting on the schedule is not a failure and does not touch
+the window or the breaker.
+
+Used as `async with governor.slot() as call:` around each CLI call, with
+`call.failed(error_class)` to report why a call failed.
+"""
+import asyncio
+import logging
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Error classes that mean "the API will not serve anyone right now"
+QUOTA = "quota"
+AUTH = "auth"
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=10, quota_threshold=3,
+                 cooldown_seconds=300, max_cooldown_seconds=1800):
+        self.failure_threshold = failure_threshold
+        self.quota_threshold = quota_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.max_cooldown_seconds = max_cooldown_seconds
+
+        self.state = CLOSED
+        self.trips = 0
+        self.open_until = 0.0
+        self.consecutive_failures = 0
+        self.consecutive_quota = 0
+        self.probe_in_flight = False
+        self._next_cooldown = cooldown_seconds
+
+    def seconds_until_probe(self):
+        return max(self.open_until - time.monotonic(), 0) if self.state == OPEN else 0
+
+    def admits(self):
+        """Whether a new call may start now (moves open -> half-open once the cool-down ends)."""
+        if self.state == OPEN and time.monotonic() >= self.open_until:
+            self.state = HALF_OPEN
+            self.probe_in_flight = False
+            logging.info("  [breaker] Cool-down over, sending one probe call")
+        if self.state == HALF_OPEN:
+            return not self.probe_in_flight
+        return self.state == CLOSED
+
+    def on_start(self):
+        """Called when a call is admitted; returns True if it is the half-open probe."""
+        if self.state == HALF_OPEN:
+            self.probe_in_flight = True
+            return True
+        return False
+
+    def on_success(self, probe):
+        self.consecutive_failures = 0
+        self.consecutive_quota = 0
+        if probe or self.state == HALF_OPEN:
+            logging.info("  [breaker] Probe succeeded, closing")
+            self.state = CLOSED
+            self.probe_in_flight = False
+            self._next_cooldown = self.cooldown_seconds
+
+    def on_cancel(self, probe):
+        """A call ended without an outcome; if it was the probe, let another one go (still half-open)."""
+        if probe and self.state == HALF_OPEN:
+            self.probe_in_flight = False
+
+    def on_failure(self, probe, error_class=None):
+        """Count a failure; returns True if this trips (or re-trips) the breaker."""
+        if self.state == OPEN or (self.state == HALF_OPEN and not probe):
+            return False  # calls started before the trip carry no new information
+        self.consecutive_failures += 1
+        self.consecutive_quota = self.consecutive_quota + 1 if error_class in (QUOTA, AUTH) else 0
+        if probe:
+            reason = f"probe failed ({error_class or 'error'})"
+        elif error_class == AUTH:
+            reason = "authentication error"
+        elif self.consecutive_quota >= self.quota_threshold:
+            reason = f"{self.consecutive_quota} consecutive rate-limit/quota errors"
+        elif self.consecutive_failures >= self.failure_threshold:
+            reason = f"{self.consecutive_failures} consecutive failures (likely API limit)"
+        else:
+            return False
+        self._trip(reason)
+        return True
+
+    def _trip(self, reason):
+        cooldown = self._next_cooldown
+        self.state = OPEN
+        self.open_until = time.monotonic() + cooldown
+        self._next_cooldown = min(cooldown * 2, self.max_cooldown_seconds)
+        self.consecutive_failures = 0
+        self.consecutive_quota = 0
+        self.probe_in_flight = False
+        self.trips += 1
+        logging.error(f"  [breaker] Open: {reason}. Pausing all new calls for {cooldown}s, then one probe.")
+
+
+class AIMDGovernor:
+    def __init__(self, min_limit=1, initial_limit=2, max_limit=10,
+                 decrease_factor=0.5, latency_target=240, breaker=None, schedule=None):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+        self.breaker = breaker or CircuitBreaker()
+        self.schedule = schedule
+
+        self.in_flight = 0
+        self.successes = 0
+        self.failures = 0
+        self.closed = False
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    @property
+    def window(self):
+        """Current whole-number in-flight limit."""
+        return max(self.min_limit, int(self.limit))
+
+    def is_paused(self):
+        return self.breaker.state != CLOSED
+
+    def _admits(self):
+        if self.schedule is not None and not self.schedule.admits():
+            return False
+        return self.breaker.admits() and self.in_flight < self.window
+
+    async def acquire(self):
+        """Wait for a free slot; returns (monotonic start time, is the breaker probe)."""
+        async with self._cond:
+            while not self.closed:
+                if self._admits():
+                    break
+                # Wake at least once a second so close(), the end of a cool-down and
+                # the opening of a quota window are noticed
+                try:
+                    await asyncio.wait_for(self._cond.wait(), 1.0)
+                except asyncio.TimeoutError:
+                    pass
+            probe = self.breaker.on_start()
+            if self.schedule is not None and not self.closed:
+                self.schedule.on_start()
+            self.in_flight += 1
+            return time.monotonic(), probe
+
+    async def release(self, started_at, ok, probe=False, error_class=None):
+        """Return a slot and feed the call's outcome into the breaker and the AIMD window.
+
+        `ok=None` returns the slot without an outcome (a cancelled call).
+        """
+        latency = time.monotonic() - started_at
+        async with self._cond:
+            self.in_flight -= 1
+            if ok is None:
+                self.breaker.on_cancel(probe)
+            elif ok:
+                self._on_success(latency, probe)
+            else:
+                self._on_failure(started_at, probe, error_class)
+            self._cond.notify_all()
+
+    def _on_success(self, latency, probe):
+        self.successes += 1
+        self.breaker.on_success(probe)
+        if latency <= self.latency_target and self.limit < self.max_limit:
+            self.limit = min(self.max_limit, self.limit + 1 / self.window)
+
+    def _on_failure(self, started_at, probe, error_class):
+        self.failures += 1
+
+        if started_at >= self._last_decrease:
+            old = self.window
+            self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+            self._last_decrease = time.monotonic()
+            if self.window != old:
+                logging.warning(f"  [governor] Call failed. Concurrency {old} -> {self.window}")
+
+        if self.breaker.on_failure(probe, error_class):
+            # Resume from the minimum window once the probe gets through
+            self.limit = float(self.min_limit)
+
+    async def close(self):
+        """Wake every waiter so a shutdown is not stuck behind a cool-down."""
+        async with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def slot(self):
+        """Async context manager for one CLI call: `async with governor.slot() as call:`."""
+        return _Slot(self)
+
+    @property
+    def pauses(self):
+        return self.breaker.trips
+
+    def snapshot(self):
+        snapshot = {
+            "concurrency_limit": self.window,
+            "in_flight": self.in_flight,
+            "calls_succeeded": self.successes,
+            "calls_failed": self.failures,
+            "breaker_state": self.breaker.state,
+            "pauses": self.breaker.trips,
+            "paused_seconds_remaining": round(self.breaker.seconds_until_probe()),
+        }
+        if self.schedule is not None:
+            snapshot.update(self.schedule.snapshot())
+        return snapshot
+
+
+class _Slot:
+    """One acquired slot. Call `failed(error_class)` before exiting to report a bad outcome."""
+
+    def __init__(self, governor):
+        self.governor = governor
+        self.ok = True
+        self.error_class = None
+        self.started_at = None
+        self.probe = False
+
+    def failed(self, error_class=None):
+        self.ok = False
+        self.error_class = error_class
+
+    async def __aenter__(self):
+        self.started_at, self.probe = await self.governor.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        ok = self.ok and exc_type is None
+        # Cancellation (e.g. shutdown) is not a signal about API capacity either way
+        if exc_type is asyncio.CancelledError:
+            ok = None
+        await self.governor.release(self.started_at, ok, self.probe, self.error_class)
+        return False
@@ -0,0 +1,185 @@
+"""
+Indexed known-customer matching for the Clay ingest (clay_prep.py).
+
+A row is a known customer if, in this order:
+
+1. domain: its normalized host equals a customer's ("https://WWW.Grammarly.com./x"
+   -> "grammarly.com")
+2. registrable: its registrable domain (eTLD+1) equals a customer's, which
+   covers subdomains ("careers.databricks.com")
+3. regional: it sits on a country-code TLD and its brand label equals a
+   customer's ("telekom.de", "samsung.co.uk" for samsung.com). Only brand
+   labels of MIN_BRAND_LABEL+ characters are used, so short generic words
+   ("time", "bill") are not matched across TLDs, and country codes used as
+   generic TLDs (.io, .ai, .co, ...) do not count
+4. name: the customer's name tokens are a prefix of the row's name tokens
+   ("Databricks", "Databricks, Inc.", "Cro Metrics Group"), via a token trie
+
+Every check is a hash lookup or a walk of at most as many trie nodes as
+the row has name tokens, so a row costs the same against 40 customers as
+against 40,000.
+
+Registrable domains come from the Public Suffix List when tldextract is
+installed (its bundled snapshot, no network), else from a built-in
+approximation: the multi-label suffixes listed below (co.uk, com.au, ...)
+plus any "<com|co|org|net|...>.<ccTLD>" (com.sa, co.at, org.br). A bare public suffix is never used as a registrable domain,
+so one customer on someco.org.br does not match every other *.org.br.
+
+Customer files are any list company_source.py reads (.json, .jsonl, .csv,
+.parquet) with company_name and domain fields, plus optional "aliases"
+and "domains" (lists, or ";"-separated strings).
+"""
+import re
+
+from company_source import iter_companies
+
+try:
+    import tldextract
+except ImportError:
+    tldextract = None
+
+MIN_BRAND_LABEL = 5
+MULTI_LABEL_SUFFIXES = {
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "ltd.uk", "plc.uk", "me.uk",
+    "com.au", "net.au", "org.au", "edu.au", "gov.au",
+    "co.nz", "org.nz", "co.jp", "ne.jp", "or.jp", "ac.jp", "co.kr", "or.kr",
+    "com.br", "com.mx", "com.ar", "com.co", "com.pe", "com.cn", "com.hk", "com.sg",
+    "com.tw", "com.my", "com.ph", "com.tr", "com.pl", "com.ua", "com.vn", "com.eg",
+    "co.in", "net.in", "org.in", "co.id", "co.il", "co.za", "co.th", "co.ke",
+}
+
+# Second-level labels that are registries' own suffixes under a country code (com.sa, org.br, ...)
+SECOND_LEVEL_LABELS = {"com", "net", "org", "edu", "gov", "mil", "ac", "co", "or", "ne", "go", "gob", "gv",
+                       "nom", "sch", "ltd", "plc", "biz", "info", "int"}
+GENERIC_COUNTRY_CODES = {"io", "ai", "co", "me", "tv", "ly", "so", "to", "fm", "gg", "sh", "ws", "cc", "vc"}
+
+BARE_HOST = re.compile(r"[a-z0-9-]+(?:\.[a-z0-9-]+)+")
+SCHEME = re.compile(r"^[a-z][a-z0-9+.-]*://")
+WWW = re.compile(r"^www\d*\.")
+TOKEN_PUNCTUATION = ".,;:!?()[]{}\"'"
+_END = None  # trie key marking the end of a customer name
+
+
+def normalize_domain(value):
+    """Bare lowercase host: no scheme, path, port, "www." prefix or trailing dot."""
+    host = (value or "").strip().lower()
+    if BARE_HOST.fullmatch(host) and not host.startswith("www"):
+        return host  # the usual case, already bare
+    host = SCHEME.sub("", host)
+    host = re.split(r"[/?#]", host, maxsplit=1)[0].rsplit("@", 1)[-1].split(":")[0]
+    return WWW.sub("", host.strip("."))
+
+
+_extract = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None) if tldextract else None
+
+
+def public_suffix(host):
+    if _extract is not None:
+        return _extract(host).suffix or host.rsplit(".", 1)[-1]
+    labels = host.split(".")
+    if len(labels) >= 2:
+        two = ".".join(labels[-2:])
+        if two in MULTI_LABEL_SUFFIXES or (labels[-2] in SECOND_LEVEL_LABELS and is_country_code(labels[-1])):
+            return two
+    return labels[-1]
+
+
+def is_public_suffix(host):
+    """True for a bare suffix ("com", "co.uk", "com.sa"), which no company owns."""
+    return public_suffix(host) == host
+
+
+def registrable_domain(host):
+    """eTLD+1 of a normalized host ("jobs.bbc.co.uk" -> "bbc.co.uk")."""
+    suffix = public_suffix(host)
+    rest = host[:-len(suffix)].rstrip(".")
+    return f"{rest.rsplit('.', 1)[-1]}.{suffix}" if rest else host
+
+
+def brand_label(host):
+    """The label left of the public suffix ("samsung.co.uk" -> "samsung")."""
+    suffix = public_suffix(host)
+    return host[:-len(suffix)].rstrip(".").rsplit(".", 1)[-1]
+
+
+def is_country_code(suffix):
+    tld = suffix.rsplit(".", 1)[-1]
+    return len(tld) == 2 and tld not in GENERIC_COUNTRY_CODES
+
+
+def name_tokens(name):
+    """Lowercase whitespace tokens with surrounding punctuation stripped."""
+    tokens = (t.strip(TOKEN_PUNCTUATION) for t in (name or "").lower().split())
+    return [t for t in tokens if t]
+
+
+def _split(value):
+    if not value:
+        return []
+    return value if isinstance(value, list) else [v.strip() for v in value.split(";")]
+
+
+class CustomerMatcher:
+    def __init__(self, names=(), domains=()):
+        self.hosts = set()
+        self.registrable = set()
+        self.brands = set()
+        self.trie = {}
+        self.size = 0
+        for name in names:
+            self.add_name(name)
+        for domain in domains:
+            self.add_domain(domain)
+
+    @classmethod
+    def from_file(cls, path):
+        matcher = cls()
+        for record in iter_companies(path):
+            for name in [record.get("company_name") or record.get("name"), *_split(record.get("aliases"))]:
+                matcher.add_name(name)
+            for domain in [record.get("domain"), *_split(record.get("domains"))]:
+                matcher.add_domain(domain)
+            matcher.size += 1
+        return matcher
+
+    def add_domain(self, domain):
+        host = normalize_domain(domain)
+        if not host or is_public_suffix(host):
+            return
+        self.hosts.add(host)
+        self.registrable.add(registrable_domain(host))
+        brand = brand_label(host)
+        if len(brand) >= MIN_BRAND_LABEL:
+            self.brands.add(brand)
+
+    def add_name(self, name):
+        tokens = name_tokens(name)
+        if not tokens:
+            return
+        node = self.trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[_END] = True
+
+    def match(self, name, domain):
+        """Why a row is a known customer ("domain", "registrable", "regional", "name"), or None."""
+        host = normalize_domain(domain)
+        if host and not is_public_suffix(host):
+            if host in self.hosts:
+                return "domain"
+            if registrable_domain(host) in self.registrable:
+                return "registrable"
+            if is_country_code(public_suffix(host)) and brand_label(host) in self.brands:
+                return "regional"
+        node = self.trie
+        for token in name_tokens(name):
+            node = node.get(token)
+            if node is None:
+                return None
+            if _END in node:
+                return "name"
+        return None
+
+    def __contains__(self, row):
+        """`(name, domain) in matcher`"""
+        return self.match(*row) is not None
@@ -3,55 +3,138 @@ Enrichment pipeline: Loop through all 220 companies, call Claude CLI
 for each, save structured JSON results.
 
 Features:
-- Parallel execution (configurable workers, default 5)
-- Resume support: skips companies that already have valid enrichment files
-- Retry with exponential backoff on failures
-- JSON extraction from messy output
-- Logging to file and stdout
+- Concurrent execution on asyncio subprocesses
+- Adaptive (AIMD) concurrency that backs off and cools down on failure waves
+- Resume support from a crash-safe SQLite run journal (falls back to files)
+- Atomic output writes (temp file + rename), mirrored into the SQLite result store
+- Per-signal rubric versions: only signals whose rubric changed are re-scored
+- Error-classified retries (quota, auth, crash, timeout, parse), each with its own budget and backoff
+- Shared circuit breaker: a quota outage pauses every worker, then probes with one call
+- Content-addressed response cache (offline replay with --replay)
+- Optional batch mode (--batch-size N): N companies per call, failures retried singly
+- Longest-expected-first dispatch, predicted from past journal/log durations
+- Streamed JSON/JSONL/CSV company lists with a bounded in-flight window, so memory stays flat for 100k-row lists
+- Optional shared work queue (--queue): leased tasks, so workers on several hosts split one list
+- Streaming JSON extraction: a call ends as soon as a valid object is complete
+- Salvage of truncated/malformed output: local repair, then a cheap tool-less re-emit call
+- Logging to file and stdout, plus a JSONL event per CLI attempt
+- Live OpenMetrics/JSON endpoint (--metrics-port) with an EWMA throughput/ETA
+- Quota windows (--window): calls only inside daily time windows, paced to each window's call/token budget
 - Graceful Ctrl+C handling
-- Progress tracking with ETA
 """
+import argparse
+import asyncio
+import codecs
+import hashlib
 import json
 import os
-import subprocess
 import sys
-import tempfile
 import time
 import re
 import signal
+import socket
 import logging
-import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import tempfile
 from pathlib import Path
 from datetime import datetime, timedelta
+from functools import partial
+
+from company_source import chunked, iter_sources
+from concurrency import AIMDGovernor, CircuitBreaker
+from enrichment_log import company_durations
+from journal import DONE, RunJournal, journal_key
+from metrics import EventLog, RunMetrics, serve_metrics
+from quota_window import QuotaSchedule, QuotaWindow, estimate_tokens
+from json_repair import repair_json
+from json_stream import JsonObjectScanner, iter_json_objects
+from response_cache import ResponseCache, cache_key
+from retry_policy import CRASH, PARSE, RETRY_RULES, TIMEOUT, RetryBudget, classify
+from result_store import ResultStore
+from scheduler import fit_duration_model, longest_first
+from work_queue import open_queue
+from rubric import build_batch_template, build_partial_template, fingerprint, rubric_fingerprints, split_template, stale_signals
 
 # Paths
 BASE_DIR = Path(__file__).parent.parent
 DATA_DIR = BASE_DIR / "data"
 ENRICHED_DIR = DATA_DIR / "enriched"
+REPLAY_DIR = DATA_DIR / "enriched_replay"
+CACHE_DIR = DATA_DIR / "cache" / "claude_responses"
+JOURNAL_FILE = DATA_DIR / "enrichment_journal.sqlite"
+STORE_FILE = DATA_DIR / "enriched.sqlite"
 PROMPT_TEMPLATE = BASE_DIR / "prompts" / "enrichment_prompt.txt"
 LOG_FILE = BASE_DIR / "enrichment.log"
+EVENTS_FILE = BASE_DIR / "enrichment_events.jsonl"
 PROGRESS_FILE = BASE_DIR / "enrichment_progress.json"
+QUOTA_STATE_FILE = BASE_DIR / "enrichment_quota.json"
 
 # Config
 MODEL = "claude-sonnet-4-6"
 MAX_TURNS = 25
-MAX_RETRIES = 3
-RETRY_BASE_DELAY = 30  # seconds
+TOOLS = ["WebSearch", "WebFetch"]
+MAX_ATTEMPTS = 6  # per company across all error classes (see retry_policy.RETRY_RULES)
 TIMEOUT_SECONDS = 300  # 5 min per company
-MAX_WORKERS = 5  # parallel enrichment calls
-STAGGER_DELAY = 3  # seconds between launching workers to avoid burst
-
-# Thread-safe state
-lock = threading.Lock()
+STREAM_CHUNK_BYTES = 4096  # stdout read size while scanning for the result object
+REPAIR_MAX_TURNS = 2  # tool-less follow-up that only re-emits the JSON
+REPAIR_TIMEOUT_SECONDS = 120
+REPAIR_MAX_CHARS = 20000  # tail of the broken output quoted back to the model
+MIN_CONCURRENCY = 1
+INITIAL_CONCURRENCY = 2  # ramps up additively from here instead of a launch burst
+MAX_CONCURRENCY = 10
+LATENCY_TARGET = 240  # seconds; slower successful calls stop the ramp-up
+PAUSE_AFTER_FAILURES = 10  # consecutive failures of any class before the breaker opens
+QUOTA_ERRORS_TO_TRIP = 3  # consecutive rate-limit/quota errors before it opens (one auth error is enough)
+COOLDOWN_SECONDS = 300  # first cool-down; doubles on each consecutive trip
+MAX_COOLDOWN_SECONDS = 1800
+CACHE_TTL_DAYS = 30
+CACHE_MAX_BYTES = 500 * 1024 * 1024
+METRICS_PORT = 9464  # local /metrics endpoint; --metrics-port 0 turns it off
+METRICS_TICK_SECONDS = 10  # EWMA throughput sample interval
+LEASE_SECONDS = 120  # queue lease; renewed every LEASE_SECONDS / 4 while the task runs
+QUEUE_POLL_SECONDS = 5  # how often an idle worker checks the queue for new or expired tasks
+DISPATCH_LOOKAHEAD = 2000  # companies read ahead and ordered longest-first at a time
+JOBS_PER_SLOT = 2  # jobs alive per governor slot; the rest of the list stays unread
+QUEUE_SEED_CHUNK = 1000  # companies per work-queue seeding transaction
+WINDOW_DRAIN_SECONDS = TIMEOUT_SECONDS  # no new calls this close to a quota window's end
+
+EXPECTED_SIGNALS = [
+    "tool_count", "tool_overlap", "employee_count", "headcount_growth",
+    "distributed_workforce", "km_hiring", "workplace_leadership",
+    "financial_capacity", "enterprise_saas"
+]
+
+# Shared state (only touched from the event loop thread)
 completed_count = 0
 failed_list = []
-consecutive_failures = 0
 shutdown_requested = False
-MAX_CONSECUTIVE_FAILURES = 10  # auto-stop if 10 in a row fail (likely API limit)
+governor = None
+response_cache = None
+journal = None
+result_store = None
+events = None  # EventLog: one JSONL record per CLI attempt and finished company
+metrics = None  # RunMetrics for this run (resumed companies excluded from throughput)
+work_queue = None  # --queue: shared WorkQueue; results commit only while this worker holds the lease
+quota_schedule = None  # --window: QuotaSchedule gating the governor
+worker_id = f"{socket.gethostname()}:{os.getpid()}"
+leases = {}  # journal_key -> lease token, for tasks claimed from work_queue
+failure_reasons = {}  # journal_key -> why enrich_company gave up, for record_failure
+early_exits = 0  # calls ended as soon as a valid object streamed in
+batch_size = 1  # --batch-size; 1 = one company per CLI call
+batch_stats = {"batches": 0, "companies_from_batches": 0, "fallbacks_to_single": 0}
+salvage_stats = {"repaired_locally": 0, "recovered_by_followup": 0, "followup_failed": 0, "parse_retries": 0}
+replay_only = False  # --replay: serve every call from the cache, never run the CLI
 clean_env = {k: v for k, v in os.environ.items() if k != "CLAUDECODE"}
 
 
+class CLIError(RuntimeError):
+    """Non-zero exit from the Claude CLI."""
+
+    def __init__(self, returncode, stderr, stdout_bytes=0):
+        super().__init__(f"Claude CLI exited with code {returncode}: {stderr[:500]}")
+        self.returncode = returncode
+        self.stdout_bytes = stdout_bytes
+
+
 def signal_handler(sig, frame):
     global shutdown_requested
     if shutdown_requested:
@@ -78,28 +161,27 @@ def setup_logging():
     logger.addHandler(sh)
 
 
-def load_companies():
-    """Load both known customers and non-customers into one list."""
-    companies = []
+def company_sources(args):
+    """[(path, is_known_customer)] from the command line, or the two default lists.
+
+    is_known_customer is None for a --companies list (each record says).
+    """
+    sources = ([(Path(p), True) for p in args.known_customers or ()]
+               + [(Path(p), False) for p in args.non_customers or ()]
+               + [(Path(p), None) for p in args.companies or ()])
+    return sources or [(DATA_DIR / "raw" / "known_customers.json", True),
+                       (DATA_DIR / "raw" / "non_customers_176.json", False)]
 
-    known_file = DATA_DIR / "raw" / "known_customers.json"
-    with open(known_file) as f:
-        known = json.load(f)
-        for c in known:
-            c["is_known_customer"] = True
-        companies.extend(known)
-    logging.info(f"Loaded {len(known)} known customers")
 
-    non_cust_file = DATA_DIR / "raw" / "non_customers_176.json"
-    with open(non_cust_file) as f:
-        non_customers = json.load(f)
-        for c in non_customers:
-            c["is_known_customer"] = False
-        companies.extend(non_customers)
-    logging.info(f"Loaded {len(non_customers)} non-customers")
+def load_companies(sources):
+    """Stream known customers and non-customers from `sources`, one company at a time."""
+    return iter_sources(sources)
 
-    logging.info(f"Total companies to enrich: {len(companies)}")
-    return companies
+
+def iter_work(sources, fingerprints):
+    """(company, stale) for every company in `sources`; stale is None (full run), [] (up to date) or signals."""
+    for company in load_companies(sources):
+        yield company, None if replay_only else check_enrichment(company, fingerprints)
 
 
 def get_output_path(company):
@@ -108,22 +190,87 @@ def get_output_path(company):
     return ENRICHED_DIR / f"{safe_name}.json"
 
 
-def is_already_enriched(output_path):
-    """Check if a company already has a valid enrichment file."""
+def _umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+OUTPUT_MODE = 0o644 & ~_umask()  # what open() would give; mkstemp's temp files are 0600
+
+
+def write_json_atomic(path, data):
+    """Write JSON via a temp file and rename, so a kill never leaves a torn file.
+
+    Returns the SHA-256 of the bytes written.
+    """
+    payload = json.dumps(data, indent=2).encode()
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, OUTPUT_MODE)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return hashlib.sha256(payload).hexdigest()
+
+
+def load_enrichment(output_path, fingerprints):
+    """Load a company's enrichment file, or None if it is missing or incomplete.
+
+    Records written before rubric versions existed are stamped with the
+    current fingerprints, i.e. assumed to match the current template.
+    """
     if not output_path.exists():
-        return False
+        return None
     try:
         with open(output_path) as f:
             data = json.load(f)
-        if "signals" in data and len(data["signals"]) >= 9:
-            return True
-        return False
+        if "signals" not in data or len(data["signals"]) < len(EXPECTED_SIGNALS):
+            return None
     except (json.JSONDecodeError, KeyError):
-        return False
+        return None
+
+    if "rubric_versions" not in data:
+        data["rubric_versions"] = {s: fp for s, fp in fingerprints.items() if s in data["signals"]}
+        write_json_atomic(output_path, data)
+    return data
 
 
-def extract_json(text):
-    """Extract JSON object from potentially messy output."""
+def check_enrichment(company, fingerprints):
+    """Work still needed for a company.
+
+    Returns None if the company needs a full enrichment, otherwise the list of
+    signals whose rubric changed since they were scored (empty = up to date).
+    A finished journal entry answers without parsing the file (only a stat);
+    otherwise the file is checked and, if valid, recorded in the journal.
+    """
+    output_path = get_output_path(company)
+    entry = journal.get_state(journal_key(company)) if journal else None
+    # A deleted output file still forces a re-run, as it did before the journal
+    if entry and entry["state"] == DONE and entry["rubric_versions"] is not None and output_path.exists():
+        return stale_signals(entry, fingerprints)
+
+    data = load_enrichment(output_path, fingerprints)
+    if data is None:
+        return None
+    if journal:
+        output_hash = hashlib.sha256(output_path.read_bytes()).hexdigest()
+        journal.mark_done(journal_key(company), company["company_name"], output_path,
+                          output_hash, data["rubric_versions"])
+    return stale_signals(data, fingerprints)
+
+
+def extract_json(text, accept=None):
+    """Extract JSON object from potentially messy output.
+
+    Returns the first candidate object that passes `accept` (if given),
+    otherwise the largest object that parses at all.
+    """
     text = text.strip()
 
     # Try parsing as-is first
@@ -140,40 +287,34 @@ def extract_json(text):
         except json.JSONDecodeError:
             pass
 
-    # Try finding the first { ... } block
-    brace_start = text.find('{')
-    if brace_start != -1:
-        depth = 0
-        for i in range(brace_start, len(text)):
-            if text[i] == '{':
-                depth += 1
-            elif text[i] == '}':
-                depth -= 1
-                if depth == 0:
-                    try:
-                        return json.loads(text[brace_start:i+1])
-                    except json.JSONDecodeError:
-                        break
-
-    return None
+    # Scan every { ... } block (string/escape aware), not just the first
+    best = None
+    for candidate in iter_json_objects(text):
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if accept is not None and accept(data):
+            return data
+        # Without an accepted match, the largest object is the likeliest result
+        if best is None or len(candidate) > best[0]:
+            best = (len(candidate), data)
+    return best[1] if best else None
 
 
-def validate_enrichment(data):
+def validate_enrichment(data, expected_signals=EXPECTED_SIGNALS):
     """Check that enrichment data has the expected structure."""
     if not isinstance(data, dict):
         return False, "Not a dict"
     if "signals" not in data:
         return False, "Missing 'signals' key"
-    expected_signals = [
-        "tool_count", "tool_overlap", "employee_count", "headcount_growth",
-        "distributed_workforce", "km_hiring", "workplace_leadership",
-        "financial_capacity", "enterprise_saas"
-    ]
+    if not isinstance(data["signals"], dict):
+        return False, "'signals' is not an object"
     missing = [s for s in expected_signals if s not in data["signals"]]
     if missing:
         return False, f"Missing signals: {missing}"
     for signal_name, signal_data in data["signals"].items():
-        if "score" not in signal_data:
+        if not isinstance(signal_data, dict) or "score" not in signal_data:
             return False, f"Signal '{signal_name}' missing 'score'"
         if not isinstance(signal_data["score"], (int, float)):
             return False, f"Signal '{signal_name}' score is not numeric"
@@ -182,9 +323,9 @@ def validate_enrichment(data):
     return True, "OK"
 
 
-def build_prompt(company, template):
-    """Build the enrichment prompt for a specific company."""
-    company_data = {
+def company_payload(company):
+    """The company fields shown to the model."""
+    return {
         "company_name": company.get("company_name", ""),
         "domain": company.get("domain", ""),
         "description": company.get("description", ""),
@@ -198,65 +339,197 @@ def build_prompt(company, template):
         "total_funding_raw": company.get("total_funding_raw", ""),
         "founded": company.get("founded", ""),
     }
-    return template.replace("{company_data}", json.dumps(company_data, indent=2))
 
 
-def call_claude(prompt, worker_id):
-    """Call Claude CLI and return the raw output."""
-    # Each worker gets its own temp file to avoid conflicts
-    tmp_prompt = BASE_DIR / "prompts" / f"_prompt_worker_{worker_id}.txt"
-    with open(tmp_prompt, "w") as f:
-        f.write(prompt)
+def build_prompt(company, template):
+    """Build the enrichment prompt for a specific company."""
+    return template.replace("{company_data}", json.dumps(company_payload(company), indent=2))
+
+
+REPAIR_PROMPT = """Your previous answer to a company enrichment task is below. It was cut off or is not valid JSON, so it could not be used.
+
+Do NOT research again. Using only the findings and scores already in that answer, re-emit the complete result as ONE valid JSON object. Fill in anything the answer was cut off before reaching, based on the same findings. Output the JSON only, with no other text.
+
+{output_format}
+
+PREVIOUS ANSWER:
+{previous}
+"""
 
+
+def build_repair_prompt(template, raw_output):
+    """Follow-up prompt asking the model to re-emit its broken output as valid JSON."""
+    _, _, output_format = split_template(template)
+    return REPAIR_PROMPT.format(output_format=output_format.strip(), previous=raw_output[-REPAIR_MAX_CHARS:])
+
+
+def build_batch_prompt(companies, batch_template):
+    """Build one prompt for several companies, each tagged with its batch_id."""
+    company_data = [{"batch_id": journal_key(c), **company_payload(c)} for c in companies]
+    return batch_template.replace("{company_data}", json.dumps(company_data, indent=2))
+
+
+async def call_claude(prompt, accept=None, max_turns=MAX_TURNS, timeout=TIMEOUT_SECONDS, tools=TOOLS):
+    """Call Claude CLI and return the raw output.
+
+    stdout is scanned as it arrives. With `accept` given, the call ends as soon
+    as a complete JSON object passes it: the process is killed and that
+    object's text is returned, instead of waiting out trailing turns.
+    `tools=[]` runs without any tools.
+    """
+    global early_exits
     cmd = [
         "claude", "-p",
         "--model", MODEL,
-        "--max-turns", str(MAX_TURNS),
-        "--tools", "WebSearch,WebFetch",
-        "--allowedTools", "WebSearch,WebFetch",
-        "--output-format", "text",
+        "--max-turns", str(max_turns),
+        "--tools", ",".join(tools),
     ]
+    if tools:
+        cmd += ["--allowedTools", ",".join(tools)]
+    cmd += ["--output-format", "text"]
+
+    # Prompt goes straight to stdin, so no per-worker temp files are needed
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=clean_env,
+    )
+    scanner = JsonObjectScanner()
+    chunks = []
+
+    async def feed_stdin():
+        try:
+            proc.stdin.write(prompt.encode())
+            await proc.stdin.drain()
+            proc.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
 
-    with open(tmp_prompt) as stdin_file:
-        result = subprocess.run(
-            cmd,
-            stdin=stdin_file,
-            capture_output=True,
-            text=True,
-            timeout=TIMEOUT_SECONDS,
-            env=clean_env,
-        )
-
-    if result.returncode != 0:
-        stderr = result.stderr.strip()
+    async def read_stdout():
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        while True:
+            block = await proc.stdout.read(STREAM_CHUNK_BYTES)
+            if not block:
+                chunks.append(decoder.decode(b"", final=True))
+                return None
+            text = decoder.decode(block)
+            chunks.append(text)
+            if accept is None:
+                continue
+            for candidate in scanner.feed(text):
+                try:
+                    data = json.loads(candidate)
+                except json.JSONDecodeError:
+                    continue
+                if accept(data):
+                    return candidate
+
+    def stop():
+        if proc.returncode is None:
+            proc.kill()
+
+    stdin_task = asyncio.create_task(feed_stdin())
+    stderr_task = asyncio.create_task(proc.stderr.read())
+    try:
+        early = await asyncio.wait_for(read_stdout(), timeout=timeout)
+        if early is not None:
+            stop()
+            await proc.wait()
+            early_exits += 1
+            return early
+        stderr_bytes = await stderr_task
+        await proc.wait()
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        stop()
+        await proc.wait()
+        raise
+    finally:
+        stdin_task.cancel()
+        stderr_task.cancel()
+        if quota_schedule:
+            quota_schedule.record_tokens(estimate_tokens(prompt, "".join(chunks)))
+
+    stdout = "".join(chunks).strip()
+    if proc.returncode != 0:
+        stderr = stderr_bytes.decode(errors="replace").strip()
         # Filter out the osgrep hook error (harmless)
-        if "osgrep" in stderr and result.stdout.strip():
-            return result.stdout.strip()
-        raise RuntimeError(f"Claude CLI exited with code {result.returncode}: {stderr[:500]}")
+        if "osgrep" in stderr and stdout:
+            return stdout
+        raise CLIError(proc.returncode, stderr, len(stdout.encode()))
 
-    return result.stdout.strip()
+    return stdout
 
 
-def enrich_company(company, template, worker_id):
-    """Enrich a single company with retries."""
+async def enrich_company(company, template, total, signals=EXPECTED_SIGNALS):
+    """Enrich a single company with retries.
+
+    `template` and `signals` are narrowed for a partial re-score. Only the CLI
+    call itself holds a governor slot; retry backoff happens outside it, so a
+    waiting company never idles a slot.
+    """
     prompt = build_prompt(company, template)
+    key = cache_key(prompt, MODEL, MAX_TURNS, TOOLS)
+    is_customer = "CUSTOMER" if company.get("is_known_customer") else "non-customer"
+    budget = RetryBudget(MAX_ATTEMPTS)
 
-    for attempt in range(1, MAX_RETRIES + 1):
-        if shutdown_requested:
-            return None
+    attempt = 0
+    while not shutdown_requested:
+        attempt += 1
 
+        # Timed from when the CLI call gets a slot; time queued for the slot is reported separately
+        queued = attempt_started = time.time()
+        call_ended = None  # set once the CLI call is over, so salvage time is not counted as call time
+        outcome, error, exit_code, bytes_out, from_cache = "error", None, None, 0, False
         try:
-            raw_output = call_claude(prompt, worker_id)
+            # Only the first attempt may reuse a cached response; a retry means
+            # the cached output was unusable and should be replaced
+            raw_output = response_cache.get(key) if response_cache and attempt == 1 else None
+            from_cache = raw_output is not None
+            if raw_output is None and replay_only:
+                logging.warning(f"  [{company['company_name']}] Not in response cache, skipping (--replay)")
+                outcome = "cache_miss"
+                return None
+            if raw_output is None:
+                async with governor.slot() as call:
+                    attempt_started = time.time()
+                    if shutdown_requested:
+                        outcome = "cancelled"
+                        return None
+                    if attempt == 1:
+                        scope = "" if signals is EXPECTED_SIGNALS else f" (re-scoring {', '.join(signals)})"
+                        logging.info(f"[{completed_count + 1}/{total}] Enriching {company['company_name']} ({company['domain']}) [{is_customer}]{scope}")
+                    try:
+                        raw_output = await call_claude(prompt, accept=lambda d: validate_enrichment(d, signals)[0])
+                    except asyncio.TimeoutError:
+                        call.failed(TIMEOUT)
+                        raise
+                    except CLIError as e:
+                        call.failed(classify("cli_error", str(e)))
+                        raise
+                    if not raw_output:
+                        call.failed(CRASH)
+                call_ended = time.time()
+                if raw_output and response_cache:
+                    response_cache.put(key, raw_output, model=MODEL, domain=company["domain"])
+                exit_code = 0
 
             if not raw_output:
+                outcome = "empty"
                 raise RuntimeError("Empty output from Claude CLI")
+            bytes_out = len(raw_output.encode())
 
-            data = extract_json(raw_output)
+            data = extract_json(raw_output, accept=lambda d: validate_enrichment(d, signals)[0])
+            if data is None or not validate_enrichment(data, signals)[0]:
+                data = await salvage(company, template, raw_output, signals, attempt) or data
             if data is None:
+                outcome = "unparseable"
                 raise RuntimeError(f"Could not extract JSON from output: {raw_output[:200]}...")
 
-            valid, reason = validate_enrichment(data)
+            valid, reason = validate_enrichment(data, signals)
             if not valid:
+                outcome = "invalid"
                 raise RuntimeError(f"Invalid enrichment structure: {reason}")
 
             # Add metadata
@@ -264,173 +537,729 @@ def enrich_company(company, template, worker_id):
             data["enriched_at"] = datetime.now().isoformat()
             data["model"] = MODEL
 
+            outcome = "cached" if from_cache else "ok"
             return data
 
-        except subprocess.TimeoutExpired:
-            logging.warning(f"  [{company['company_name']}] Timeout on attempt {attempt}/{MAX_RETRIES}")
+        except asyncio.TimeoutError:
+            outcome, error = "timeout", f"Timed out after {TIMEOUT_SECONDS}s"
+            logging.warning(f"  [{company['company_name']}] Timeout on attempt {attempt}/{MAX_ATTEMPTS}")
+        except CLIError as e:
+            outcome, error, exit_code, bytes_out = "cli_error", str(e)[:500], e.returncode, e.stdout_bytes
+            logging.warning(f"  [{company['company_name']}] Error on attempt {attempt}/{MAX_ATTEMPTS}: {e}")
         except RuntimeError as e:
-            logging.warning(f"  [{company['company_name']}] Error on attempt {attempt}/{MAX_RETRIES}: {e}")
+            error = str(e)[:500]
+            logging.warning(f"  [{company['company_name']}] Error on attempt {attempt}/{MAX_ATTEMPTS}: {e}")
         except Exception as e:
-            logging.warning(f"  [{company['company_name']}] Unexpected error on attempt {attempt}/{MAX_RETRIES}: {type(e).__name__}: {e}")
-
-        if attempt < MAX_RETRIES:
-            delay = RETRY_BASE_DELAY * (2 ** (attempt - 1))
-            logging.info(f"  [{company['company_name']}] Retrying in {delay}s...")
-            time.sleep(delay)
+            error = f"{type(e).__name__}: {e}"[:500]
+            logging.warning(f"  [{company['company_name']}] Unexpected error on attempt {attempt}/{MAX_ATTEMPTS}: {type(e).__name__}: {e}")
+        finally:
+            record_attempt(company, attempt, attempt_started, outcome, error, exit_code, bytes_out,
+                           ended=call_ended, scope="full" if signals is EXPECTED_SIGNALS else "partial",
+                           wait_seconds=round(attempt_started - queued, 1))
+
+        if replay_only:
+            return None
+        error_class = classify(outcome, error)
+        delay = budget.next_delay(error_class)
+        if delay is None:
+            failure_reasons[journal_key(company)] = f"Failed after {attempt} attempts ({budget.summary()})"
+            return None
+        if error_class == PARSE:
+            salvage_stats["parse_retries"] += 1
+        logging.info(f"  [{company['company_name']}] Retrying in {delay:.0f}s "
+                     f"({error_class} retry {budget.used[error_class]}/{RETRY_RULES[error_class]['retries']})")
+        await interruptible_sleep(delay)
 
     return None
 
 
-def process_company(company, template, worker_id, total):
-    """Process a single company (called by thread pool)."""
-    global completed_count, failed_list, consecutive_failures, shutdown_requested
+async def interruptible_sleep(seconds):
+    """Sleep, but return within a second of a Ctrl+C (quota backoff can run to minutes)."""
+    deadline = time.monotonic() + seconds
+    while not shutdown_requested:
+        left = deadline - time.monotonic()
+        if left <= 0:
+            return
+        await asyncio.sleep(min(left, 1))
 
-    if shutdown_requested:
-        return
 
+async def salvage(company, template, raw_output, signals, attempt):
+    """Recover a valid record from output that did not parse or validate, without re-researching.
+
+    Tries local repair first, then one tool-less follow-up call that asks the
+    model to re-emit or complete its JSON. Returns the record or None.
+    """
     name = company["company_name"]
-    domain = company["domain"]
-    output_path = get_output_path(company)
-    is_customer = "CUSTOMER" if company.get("is_known_customer") else "non-customer"
 
-    with lock:
-        current = completed_count + 1
-    logging.info(f"[{current}/{total}] Enriching {name} ({domain}) [{is_customer}]")
+    def accept(d):
+        return validate_enrichment(d, signals)[0]
+
+    data = repair_json(raw_output, accept)
+    if data is not None and accept(data):
+        salvage_stats["repaired_locally"] += 1
+        logging.info(f"  [{name}] Repaired malformed output locally")
+        return data
+    if not raw_output.strip():
+        return None
+
+    prompt = build_repair_prompt(template, raw_output)
+    key = cache_key(prompt, MODEL, REPAIR_MAX_TURNS, [])
+    reply = response_cache.get(key) if response_cache else None
+    if reply is None and replay_only:
+        return None
+    queued = started = time.time()
+    outcome, error, exit_code = "repair_failed", None, None
+    try:
+        if reply is None:
+            async with governor.slot() as call:
+                started = time.time()
+                if shutdown_requested:
+                    outcome = "cancelled"
+                    return None
+                logging.info(f"  [{name}] Output unusable, asking the model to re-emit its JSON")
+                try:
+                    reply = await call_claude(prompt, accept, max_turns=REPAIR_MAX_TURNS,
+                                              timeout=REPAIR_TIMEOUT_SECONDS, tools=[])
+                    exit_code = 0
+                except asyncio.TimeoutError:
+                    call.failed(TIMEOUT)
+                    error = f"Repair call timed out after {REPAIR_TIMEOUT_SECONDS}s"
+                    return None
+                except CLIError as e:
+                    call.failed(classify("cli_error", str(e)))
+                    error, exit_code = str(e)[:500], e.returncode
+                    return None
+            if reply and response_cache:
+                response_cache.put(key, reply, model=MODEL, domain=company["domain"], repair=True)
+
+        data = extract_json(reply or "", accept)
+        if data is None or not accept(data):
+            data = repair_json(reply or "", accept)
+        if data is not None and accept(data):
+            outcome = "repair_ok"
+            salvage_stats["recovered_by_followup"] += 1
+            logging.info(f"  [{name}] Recovered by re-emit follow-up")
+            return data
+        error = "Follow-up reply still not a valid enrichment"
+        return None
+    finally:
+        if outcome == "repair_failed":
+            salvage_stats["followup_failed"] += 1
+        record_attempt(company, attempt, started, outcome, error, exit_code,
+                       len(reply.encode()) if reply else 0, scope="repair", wait_seconds=round(started - queued, 1))
+
+
+def record_attempt(company, attempt, started, outcome, error=None, exit_code=None, bytes_out=0, ended=None,
+                   **fields):
+    """Journal one CLI attempt, emit its event and feed the live metrics."""
+    ended = ended or time.time()
+    duration = round(ended - started, 1)
+    if journal:
+        journal.record_attempt(journal_key(company), attempt, datetime.fromtimestamp(started).isoformat(),
+                               duration, outcome, error)
+    if metrics:
+        metrics.observe_attempt(outcome, ended - started, bytes_out)
+    if events:
+        events.emit("attempt", domain=company["domain"], company_name=company["company_name"],
+                    attempt=attempt, started_at=datetime.fromtimestamp(started).isoformat(),
+                    ended_at=datetime.fromtimestamp(ended).isoformat(), duration_seconds=duration,
+                    outcome=outcome, error_class=classify(outcome, error) if error else None,
+                    exit_code=exit_code, bytes_out=bytes_out, error=error, **fields)
+
+
+def save_result(company, data, started):
+    """Persist a finished enrichment: file, result store, journal."""
+    global completed_count
+    name = company["company_name"]
+    output_path = get_output_path(company)
+    duration = round(time.time() - started, 1)
+    if work_queue:
+        token = leases.pop(journal_key(company), None)
+        if token is None or not work_queue.commit(journal_key(company), token, worker_id, data):
+            logging.warning(f"  [{name}] Lease lost to another worker, discarding this result")
+            return
+    output_hash = write_json_atomic(output_path, data)
+    if result_store:
+        result_store.upsert(output_path.stem, data)
+    if journal:
+        journal.mark_done(journal_key(company), name, output_path, output_hash, data["rubric_versions"], duration)
+    completed_count += 1
+    if metrics:
+        metrics.company_finished(ok=True)
+    if events:
+        events.emit("company", domain=company["domain"], company_name=name, outcome="saved",
+                    duration_seconds=duration, output=output_path.name)
+    logging.info(f"  [{name}] Saved to {output_path.name}")
+
+
+def record_failure(company, started):
+    name = company["company_name"]
+    duration = round(time.time() - started, 1)
+    reason = failure_reasons.pop(journal_key(company), "Failed")
+    failed_list.append({"company_name": name, "domain": company["domain"]})
+    if journal:
+        journal.mark_failed(journal_key(company), name, reason, duration)
+    if work_queue and journal_key(company) in leases:
+        work_queue.fail(journal_key(company), leases.pop(journal_key(company)), reason)
+    if metrics:
+        metrics.company_finished(ok=False)
+    if events:
+        events.emit("company", domain=company["domain"], company_name=name, outcome="failed",
+                    duration_seconds=duration)
+    logging.error(f"  [{name}] FAILED: {reason}")
+
+
+async def process_company(company, template, fingerprints, total, stale=None):
+    """Process a single company (one asyncio task per company).
+
+    With `stale` set, only those signals are re-scored and merged into the
+    existing enrichment file.
+    """
+    if shutdown_requested:
+        return
 
-    data = enrich_company(company, template, worker_id)
+    started = time.time()
+    if journal:
+        journal.mark_in_flight(journal_key(company), company["company_name"])
+
+    if stale:
+        data = await enrich_company(company, build_partial_template(template, stale), total, stale)
+        if data:
+            with open(get_output_path(company)) as f:
+                existing = json.load(f)
+            existing["signals"].update({s: data["signals"][s] for s in stale})
+            existing.setdefault("rubric_versions", {}).update({s: fingerprints[s] for s in stale})
+            existing["rescored_at"] = data["enriched_at"]
+            data = existing
+    else:
+        data = await enrich_company(company, template, total)
+        if data:
+            data["rubric_versions"] = {s: fingerprints[s] for s in EXPECTED_SIGNALS if s in fingerprints}
 
     if data:
-        with open(output_path, "w") as f:
-            json.dump(data, f, indent=2)
-        with lock:
-            completed_count += 1
-            consecutive_failures = 0
-        logging.info(f"  [{name}] Saved to {output_path.name}")
-    else:
-        with lock:
-            failed_list.append({"company_name": name, "domain": domain})
-            consecutive_failures += 1
-            if consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
-                shutdown_requested = True
-                logging.error(f"  [{name}] FAILED. {MAX_CONSECUTIVE_FAILURES} consecutive failures hit. Likely API limit. Auto-stopping.")
-                return
-        logging.error(f"  [{name}] FAILED after {MAX_RETRIES} attempts (consecutive: {consecutive_failures})")
+        save_result(company, data, started)
+    elif not shutdown_requested:
+        record_failure(company, started)
+
+
+async def enrich_batch(batch, batch_template, total):
+    """One CLI call for several companies. Returns {journal_key: validated record}.
+
+    There are no retries here: anything missing or invalid in the response is
+    left out, and the caller falls back to single-company calls for it.
+    """
+    prompt = build_batch_prompt(batch, batch_template)
+    max_turns = MAX_TURNS * len(batch)
+    timeout = TIMEOUT_SECONDS * len(batch)
+    key = cache_key(prompt, MODEL, max_turns, TOOLS)
+    by_key = {journal_key(c): c for c in batch}
+
+    def complete(d):
+        return isinstance(d.get("results"), list) and len(d["results"]) >= len(batch)
+
+    started = time.time()
+    raw_output = response_cache.get(key) if response_cache else None
+    from_cache = raw_output is not None
+    if raw_output is None:
+        if replay_only:
+            return {}
+        async with governor.slot() as call:
+            started = time.time()
+            if shutdown_requested:
+                return {}
+            names = ", ".join(c["company_name"] for c in batch)
+            logging.info(f"[{completed_count + 1}/{total}] Enriching batch of {len(batch)}: {names}")
+            try:
+                raw_output = await call_claude(prompt, accept=complete, max_turns=max_turns, timeout=timeout)
+            except (asyncio.TimeoutError, RuntimeError) as e:
+                call.failed(TIMEOUT if isinstance(e, asyncio.TimeoutError) else classify("cli_error", str(e)))
+                logging.warning(f"  [batch of {len(batch)}] Call failed, falling back to single calls: {e or 'timeout'}")
+                record_batch_attempt(batch, started, "timeout" if isinstance(e, asyncio.TimeoutError) else "cli_error",
+                                     error=str(e)[:500] or None, exit_code=getattr(e, "returncode", None),
+                                     bytes_out=getattr(e, "stdout_bytes", 0))
+                return {}
+            if not raw_output:
+                call.failed(CRASH)
+                record_batch_attempt(batch, started, "empty", exit_code=0)
+                return {}
+        if response_cache:
+            response_cache.put(key, raw_output, model=MODEL, batch=sorted(by_key))
+    batch_stats["batches"] += 1
+
+    data = extract_json(raw_output, accept=complete) or repair_json(raw_output, accept=complete) or {}
+    results = {}
+    entries = data.get("results") if isinstance(data.get("results"), list) else []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        entry_key = str(entry.pop("batch_id", "") or entry.get("domain", "")).lower().rstrip(".")
+        company = by_key.get(entry_key)
+        if company is None or entry_key in results:
+            continue
+        valid, reason = validate_enrichment(entry)
+        if not valid:
+            logging.warning(f"  [{company['company_name']}] Invalid batch result ({reason}), will retry singly")
+            continue
+        entry["is_known_customer"] = company.get("is_known_customer", False)
+        entry["enriched_at"] = datetime.now().isoformat()
+        entry["model"] = MODEL
+        results[entry_key] = entry
+
+    record_batch_attempt(batch, started, "cached" if from_cache else "ok", exit_code=None if from_cache else 0,
+                         bytes_out=len(raw_output.encode()), results=results)
+    return results
+
+
+def record_batch_attempt(batch, started, outcome, error=None, exit_code=None, bytes_out=0, results=None):
+    """One event and metrics sample for the batch call; journal rows per company as attempt 0."""
+    ended = time.time()
+    results = results or {}
+    if journal:
+        duration = round(ended - started, 1)
+        for company in batch:
+            k = journal_key(company)
+            journal.record_attempt(k, 0, datetime.fromtimestamp(started).isoformat(), duration,
+                                   "batch_ok" if k in results else "batch_miss", error)
+    if metrics:
+        metrics.observe_attempt(f"batch_{outcome}", ended - started, bytes_out)
+    if events:
+        events.emit("batch_attempt", domains=[c["domain"] for c in batch],
+                    started_at=datetime.fromtimestamp(started).isoformat(),
+                    ended_at=datetime.fromtimestamp(ended).isoformat(),
+                    duration_seconds=round(ended - started, 1), outcome=outcome, exit_code=exit_code,
+                    bytes_out=bytes_out, error=error, valid_results=len(results))
+
+
+async def process_batch(batch, template, batch_template, fingerprints, total):
+    """Enrich `batch` in one call, then fall back to single calls for the misses."""
+    if shutdown_requested:
+        return
 
+    started = time.time()
+    if journal:
+        for company in batch:
+            journal.mark_in_flight(journal_key(company), company["company_name"])
+
+    results = await enrich_batch(batch, batch_template, total)
+    versions = {s: fingerprints[s] for s in EXPECTED_SIGNALS if s in fingerprints}
+    fallbacks = []
+    for company in batch:
+        data = results.get(journal_key(company))
+        if data:
+            data["rubric_versions"] = versions
+            save_result(company, data, started)
+            batch_stats["companies_from_batches"] += 1
+        else:
+            fallbacks.append(company)
+
+    batch_stats["fallbacks_to_single"] += len(fallbacks)
+    await asyncio.gather(*(process_company(c, template, fingerprints, total) for c in fallbacks))
 
-def save_progress(total, start_time):
-    """Save progress to a JSON file for monitoring."""
-    with lock:
-        done = completed_count
-        fails = list(failed_list)
 
+def update_gauges():
+    """Copy governor, cache and batch state into the live metrics."""
+    if governor:
+        for name, value in governor.snapshot().items():
+            metrics.set_gauge(name, value)
+    if response_cache:
+        metrics.set_gauge("cache_hits", response_cache.hits)
+        metrics.set_gauge("cache_misses", response_cache.misses)
+    metrics.set_gauge("early_exits", early_exits)
+    for name, value in salvage_stats.items():
+        metrics.set_gauge(f"salvage_{name}", value)
+    if batch_size > 1:
+        for name, value in batch_stats.items():
+            metrics.set_gauge(f"batch_{name}", value)
+
+
+def save_progress(total, start_time):
+    """Write the run summary JSON (live numbers are served by the metrics endpoint)."""
     elapsed = time.time() - start_time
-    avg_per_company = elapsed / max(done, 1)
-    # With parallel workers, effective rate is faster
-    effective_rate = elapsed / max(done, 1) / MAX_WORKERS if done > MAX_WORKERS else avg_per_company
-    remaining = total - done - len(fails)
-    eta_seconds = remaining * effective_rate
+    update_gauges()
+    live = metrics.snapshot()
+    # Only companies finished in this run count towards the per-company average
+    finished = metrics.completed + metrics.failed
 
     progress = {
-        "completed": done,
-        "failed": len(fails),
-        "failed_companies": fails,
+        "completed": completed_count,
+        "failed": len(failed_list),
+        "failed_companies": list(failed_list),
         "total": total,
-        "remaining": remaining,
-        "workers": MAX_WORKERS,
+        **live,
+        "batch_size": batch_size,
+        "batch": batch_stats if batch_size > 1 else None,
+        "salvage": salvage_stats,
         "elapsed_seconds": round(elapsed),
         "elapsed_human": str(timedelta(seconds=round(elapsed))),
-        "avg_seconds_per_company": round(avg_per_company, 1),
-        "eta_seconds": round(max(eta_seconds, 0)),
-        "eta_human": str(timedelta(seconds=round(max(eta_seconds, 0)))),
+        "avg_seconds_per_company": round(elapsed / finished, 1) if finished else None,
+        "eta_human": str(timedelta(seconds=live["eta_seconds"])) if live["eta_seconds"] is not None else None,
         "updated_at": datetime.now().isoformat(),
     }
-    with open(PROGRESS_FILE, "w") as f:
-        json.dump(progress, f, indent=2)
+    write_json_atomic(PROGRESS_FILE, progress)
+
+
+def start_governor():
+    global governor
+    governor = AIMDGovernor(
+        min_limit=MIN_CONCURRENCY,
+        initial_limit=INITIAL_CONCURRENCY,
+        max_limit=MAX_CONCURRENCY,
+        latency_target=LATENCY_TARGET,
+        breaker=CircuitBreaker(
+            failure_threshold=PAUSE_AFTER_FAILURES,
+            quota_threshold=QUOTA_ERRORS_TO_TRIP,
+            cooldown_seconds=COOLDOWN_SECONDS,
+            max_cooldown_seconds=MAX_COOLDOWN_SECONDS,
+        ),
+        schedule=quota_schedule,
+    )
+
+
+async def monitor():
+    """Feed the live metrics until shutdown, then release anything waiting on the governor.
+
+    Polls once a second so a Ctrl+C also releases companies stuck in a cool-down.
+    The progress file is rewritten on every metrics tick.
+    """
+    ticks = 0
+    while not shutdown_requested:
+        ticks += 1
+        if ticks % METRICS_TICK_SECONDS == 0:
+            metrics.tick()
+            save_progress(metrics.total, metrics.started)  # updates the gauges too
+        else:
+            update_gauges()
+        await asyncio.sleep(1)
+    await governor.close()
 
 
-def main():
-    global completed_count
+def predicted_seconds(duration_model, company, stale=None):
+    if duration_model is None:
+        return 0
+    seconds = duration_model.predict(company)
+    return seconds * len(stale) / len(EXPECTED_SIGNALS) if stale else seconds
+
 
+async def run_one(company, template, fingerprints, total, stale):
+    try:
+        await process_company(company, template, fingerprints, total, stale)
+    except Exception as e:
+        logging.error(f"  [{company['company_name']}] Worker exception: {e}")
+
+
+async def run_batch(batch, template, batch_template, fingerprints, total):
+    try:
+        await process_batch(batch, template, batch_template, fingerprints, total)
+    except Exception as e:
+        logging.error(f"  [batch of {len(batch)}] Worker exception: {e}")
+
+
+def plan_jobs(chunk, template, fingerprints, total, duration_model=None):
+    """Jobs for a chunk of (company, stale) work, in dispatch order.
+
+    Returns [(predicted seconds, job factory)]; calling a factory makes the
+    coroutine, so a job costs nothing until it is started. Full enrichments
+    are grouped into batches; partial re-scores always run singly. With a
+    `duration_model` the jobs are ordered longest-predicted-first, otherwise
+    they keep file order.
+    """
+    def predicted(company, stale=None):
+        return predicted_seconds(duration_model, company, stale)
+
+    jobs = [(predicted(c, stale), partial(run_one, c, template, fingerprints, total, stale))
+            for c, stale in chunk if stale or batch_size == 1]
+    if batch_size > 1:
+        batch_template = build_batch_template(template, batch_size)
+        full = [c for c, stale in chunk if not stale]
+        if duration_model is not None:
+            # Similar-length companies share a batch, so one slow company does not hold up fast ones
+            full = longest_first(full, predicted)
+        for i in range(0, len(full), batch_size):
+            batch = full[i:i + batch_size]
+            jobs.append((sum(predicted(c) for c in batch),
+                         partial(run_batch, batch, template, batch_template, fingerprints, total)))
+    if duration_model is not None:
+        jobs.sort(key=lambda job: job[0], reverse=True)
+        predicted_work = sum(seconds for seconds, _ in jobs)
+        logging.info(f"Dispatching {len(jobs)} jobs longest-first; predicted work "
+                     f"{timedelta(seconds=round(predicted_work))} "
+                     f"(~{timedelta(seconds=round(predicted_work / MAX_CONCURRENCY))} at full concurrency)")
+    return jobs
+
+
+async def run_workers(pending, template, fingerprints, total, duration_model=None):
+    """Run every remaining company, with the governor deciding how many CLI calls are in flight.
+
+    `pending` yields (company, stale) and is read lazily, DISPATCH_LOOKAHEAD
+    companies at a time (see plan_jobs for the order within a chunk). At most
+    JOBS_PER_SLOT jobs per governor slot exist at once, so a job waiting for
+    a slot or sleeping in a retry backoff does not leave a slot idle, and the
+    rest of the list stays on disk. A finished job is dropped right away, so
+    nothing is kept per company once its result is committed.
+    """
+    start_governor()
+    active = set()
+    monitor_task = asyncio.create_task(monitor())
+    try:
+        for chunk in chunked(pending, DISPATCH_LOOKAHEAD):
+            for _, job in plan_jobs(chunk, template, fingerprints, total, duration_model):
+                while len(active) >= governor.window * JOBS_PER_SLOT:
+                    _, active = await asyncio.wait(active, return_when=asyncio.FIRST_COMPLETED)
+                if shutdown_requested:
+                    break
+                active.add(asyncio.create_task(job()))
+            if shutdown_requested:
+                break
+        if active:
+            await asyncio.gather(*active)
+    finally:
+        monitor_task.cancel()
+
+
+async def run_queue_workers(template, fingerprints, total):
+    """Claim leased tasks from the shared queue until it is drained.
+
+    Claims only as many companies as the governor can run (times the batch
+    size), heartbeats every held lease, and hands unstarted tasks back on
+    Ctrl+C. Tasks stay in priority order (longest-predicted-first) across
+    all workers. The loop exits once nothing is pending or leased anywhere.
+    """
+    start_governor()
+    batch_template = build_batch_template(template, batch_size) if batch_size > 1 else None
+    active = set()
+
+    async def heartbeat_loop():
+        while True:
+            await asyncio.sleep(LEASE_SECONDS / 4)
+            if leases:
+                work_queue.heartbeat(set(leases.values()), LEASE_SECONDS)
+
+    def start(tasks):
+        full = []
+        for task in tasks:
+            company = task["company"]
+            leases[task["key"]] = task["token"]
+            # A partial re-score needs this host's copy of the record; otherwise redo it in full
+            stale = task["stale"] if task["stale"] and get_output_path(company).exists() else None
+            if stale or batch_size == 1:
+                active.add(asyncio.create_task(run_one(company, template, fingerprints, total, stale)))
+            else:
+                full.append(company)
+        for i in range(0, len(full), batch_size):
+            active.add(asyncio.create_task(
+                run_batch(full[i:i + batch_size], template, batch_template, fingerprints, total)))
+
+    monitor_task = asyncio.create_task(monitor())
+    heartbeat_task = asyncio.create_task(heartbeat_loop())
+    try:
+        while not shutdown_requested:
+            capacity = governor.window * batch_size - len(leases)
+            tasks = work_queue.claim(worker_id, capacity, LEASE_SECONDS)
+            start(tasks)
+            if not active:
+                if not tasks and work_queue.outstanding() == 0:
+                    break
+                # Everything left is leased by other workers; wait for them or for a lease to expire
+                await asyncio.sleep(QUEUE_POLL_SECONDS)
+                continue
+            done, active_left = await asyncio.wait(active, timeout=QUEUE_POLL_SECONDS,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+            active.intersection_update(active_left)
+            metrics.set_gauge("queue_outstanding", work_queue.outstanding())
+        if active:
+            await asyncio.gather(*active)
+    finally:
+        heartbeat_task.cancel()
+        monitor_task.cancel()
+        for key, token in list(leases.items()):
+            work_queue.release(key, token)
+        if leases:
+            logging.info(f"Returned {len(leases)} unfinished tasks to the queue")
+        leases.clear()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Enrich companies with the Claude CLI.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always call the CLI; do not read or write the response cache")
+    parser.add_argument("--batch-size", type=int, default=1, metavar="N",
+                        help="Companies per CLI call (default 1). Invalid batch entries fall back to single calls")
+    parser.add_argument("--file-order", action="store_true",
+                        help="Dispatch companies in file order instead of longest-predicted-first")
+    parser.add_argument("--replay", action="store_true",
+                        help=f"Re-run extraction/validation for every company from cached responses only, "
+                             f"writing to {REPLAY_DIR.relative_to(BASE_DIR)}/ (never calls the CLI)")
+    parser.add_argument("--queue", metavar="URL",
+                        help="Pull work from a shared leased queue (path, sqlite:///path or postgresql://...) "
+                             "so several workers/hosts can split the list; each worker seeds what it finds missing")
+    parser.add_argument("--known-customers", action="append", metavar="PATH",
+                        help="Known-customer list (.json array, .jsonl, .csv or .parquet); repeatable. "
+                             "Giving any list replaces the default data/raw files")
+    parser.add_argument("--non-customers", action="append", metavar="PATH",
+                        help="Non-customer list (.json, .jsonl, .csv or .parquet); repeatable")
+    parser.add_argument("--companies", action="append", metavar="PATH",
+                        help="Mixed list whose records carry their own is_known_customer; repeatable")
+    parser.add_argument("--window", action="append", metavar="SPEC",
+                        help="Only call the CLI inside this daily quota window, paced to its budget: "
+                             "NAME=HH:MM-HH:MM[,calls=N][,tokens=N]; repeatable. Outside every window "
+                             "the run waits and resumes when the next one opens")
+    parser.add_argument("--window-drain", type=int, default=WINDOW_DRAIN_SECONDS, metavar="SECONDS",
+                        help=f"Stop starting calls this long before a window ends (default {WINDOW_DRAIN_SECONDS})")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT, metavar="PORT",
+                        help=f"Serve /metrics (OpenMetrics) and /progress (JSON) on 127.0.0.1:PORT "
+                             f"(default {METRICS_PORT}; 0 disables)")
+    return parser.parse_args()
+
+
+async def main():
+    global completed_count, response_cache, replay_only, journal, result_store, batch_size, events, metrics, work_queue, quota_schedule, ENRICHED_DIR
+
+    args = parse_args()
     setup_logging()
     logging.info("=" * 60)
-    logging.info(f"ENRICHMENT PIPELINE STARTING ({MAX_WORKERS} parallel workers)")
+    logging.info(f"ENRICHMENT PIPELINE STARTING (adaptive concurrency {MIN_CONCURRENCY}-{MAX_CONCURRENCY})")
     logging.info("=" * 60)
 
+    batch_size = max(1, args.batch_size)
+    if batch_size > 1:
+        logging.info(f"BATCH MODE: {batch_size} companies per call")
+    if args.replay:
+        replay_only = True
+        ENRICHED_DIR = REPLAY_DIR
+        logging.info(f"REPLAY MODE: cached responses only, writing to {ENRICHED_DIR}")
+    if not args.no_cache:
+        response_cache = ResponseCache(CACHE_DIR, ttl_seconds=CACHE_TTL_DAYS * 86400, max_bytes=CACHE_MAX_BYTES)
+        evicted = response_cache.evict()
+        logging.info(f"Response cache at {CACHE_DIR} ({evicted} entries evicted)")
+    elif args.replay:
+        logging.error("--replay needs the response cache; drop --no-cache")
+        return
+    if args.replay and args.queue:
+        logging.error("--replay runs locally from the cache; drop --queue")
+        return
+    if args.window and not args.replay:
+        try:
+            windows = [QuotaWindow.parse(spec) for spec in args.window]
+        except ValueError as e:
+            logging.error(f"--window: {e}")
+            return
+        quota_schedule = QuotaSchedule(windows, QUOTA_STATE_FILE, drain_seconds=args.window_drain)
+        logging.info(f"QUOTA WINDOWS: {'; '.join(str(w) for w in windows)} "
+                     f"(usage saved to {QUOTA_STATE_FILE.name})")
+
     ENRICHED_DIR.mkdir(parents=True, exist_ok=True)
+    if not replay_only:
+        journal = RunJournal(JOURNAL_FILE)
+        logging.info(f"Run journal at {JOURNAL_FILE} ({journal.count()} companies recorded)")
+        result_store = ResultStore(STORE_FILE)
+        result_store.sync_dir(ENRICHED_DIR)  # results saved before the store existed are never re-saved
 
     # Load template
     with open(PROMPT_TEMPLATE) as f:
         template = f.read()
-    logging.info(f"Loaded prompt template ({len(template)} chars)")
-
-    # Load companies
-    companies = load_companies()
-
-    # Check what's already done
-    skipped = 0
-    to_process = []
-    for c in companies:
-        output_path = get_output_path(c)
-        if is_already_enriched(output_path):
+    fingerprints = rubric_fingerprints(template)
+    logging.info(f"Loaded prompt template ({len(template)} chars, {len(fingerprints)} signal rubrics)")
+
+    duration_model = None
+    if not args.file_order:
+        log_durations = company_durations(LOG_FILE) if LOG_FILE.exists() else ()
+        duration_model = fit_duration_model(
+            journal_rows=journal.finished_durations() if journal else (),
+            log_durations=log_durations,
+        )
+        logging.info(f"Duration model fitted on {len(duration_model)} past company runs")
+
+    # Survey the company lists (streamed; nothing is kept per company)
+    sources = company_sources(args)
+    known = non_customers = skipped = rescoring = 0
+    for c, stale in iter_work(sources, fingerprints):
+        known += c["is_known_customer"]
+        non_customers += not c["is_known_customer"]
+        if duration_model is not None:
+            duration_model.attach(c)
+        if stale == []:
             skipped += 1
-        else:
-            to_process.append(c)
+        elif stale:
+            rescoring += 1
+    total = known + non_customers
+    remaining = total - skipped
+    logging.info(f"Loaded {known} known customers")
+    logging.info(f"Loaded {non_customers} non-customers")
+    logging.info(f"Total companies to enrich: {total}")
 
     completed_count = skipped
     logging.info(f"Already enriched: {skipped}")
-    logging.info(f"Remaining to process: {len(to_process)}")
+    logging.info(f"Remaining to process: {remaining} ({rescoring} partial re-scores for changed rubrics)")
 
-    if not to_process:
+    if args.queue:
+        work_queue = open_queue(args.queue)
+        logging.info(f"Work queue at {args.queue} (worker {worker_id})")
+    elif not remaining:
         logging.info("All companies already enriched. Nothing to do.")
+        if journal:
+            journal.close()
+            result_store.close()
         return
 
-    total = len(companies)
     start_time = time.time()
-
-    # Progress saver thread
-    def progress_loop():
-        while not shutdown_requested:
-            save_progress(total, start_time)
-            time.sleep(10)
-        save_progress(total, start_time)
-
-    progress_thread = threading.Thread(target=progress_loop, daemon=True)
-    progress_thread.start()
-
-    # Process with thread pool
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {}
-        for i, company in enumerate(to_process):
-            if shutdown_requested:
-                break
-            # Stagger launches to avoid burst
-            if i > 0 and i % MAX_WORKERS == 0:
-                time.sleep(STAGGER_DELAY)
-            worker_id = i % MAX_WORKERS
-            future = executor.submit(process_company, company, template, worker_id, total)
-            futures[future] = company
-
-        # Wait for all to complete
-        for future in as_completed(futures):
-            if shutdown_requested:
-                break
-            try:
-                future.result()
-            except Exception as e:
-                company = futures[future]
-                logging.error(f"  [{company['company_name']}] Worker exception: {e}")
+    metrics = RunMetrics(total, resumed=skipped)
+    events = EventLog(EVENTS_FILE)
+    events.emit("run_start", total=total, resumed=skipped, to_process=remaining, batch_size=batch_size)
+    server = None
+    if args.metrics_port:
+        try:
+            server = await serve_metrics(metrics, args.metrics_port)
+        except OSError as e:
+            logging.warning(f"Metrics endpoint disabled: cannot bind port {args.metrics_port} ({e})")
+
+    if work_queue:
+        version = fingerprint(json.dumps(fingerprints, sort_keys=True))
+        for chunk in chunked(iter_work(sources, fingerprints), QUEUE_SEED_CHUNK):
+            work_queue.seed([(journal_key(c), c, stale, predicted_seconds(duration_model, c, stale))
+                             for c, stale in chunk if stale != []], version)
+            work_queue.seed_done([journal_key(c) for c, stale in chunk if stale == []], version)
+        counts = work_queue.counts()
+        logging.info(f"Queue: {counts.get('pending', 0)} pending, {counts.get('leased', 0)} leased, "
+                     f"{counts.get('done', 0)} done, {counts.get('failed', 0)} failed")
+        await run_queue_workers(template, fingerprints, total)
+    else:
+        pending = ((c, stale) for c, stale in iter_work(sources, fingerprints) if stale != [])
+        await run_workers(pending, template, fingerprints, total, duration_model)
 
     # Final progress save
+    metrics.tick()
     save_progress(total, start_time)
+    events.emit("run_end", completed=metrics.completed, failed=metrics.failed,
+                elapsed_seconds=round(time.time() - start_time, 1))
+    events.close()
+    if server:
+        server.close()
+        await server.wait_closed()
+    if work_queue:
+        work_queue.close()
+    if journal:
+        journal.close()
+        result_store.close()
 
     # Summary
     elapsed = time.time() - start_time
     logging.info("=" * 60)
     logging.info("ENRICHMENT COMPLETE")
-    logging.info(f"  Workers: {MAX_WORKERS}")
+    logging.info(f"  Final concurrency: {governor.window if governor else 0} (max {MAX_CONCURRENCY}), cool-downs: {governor.pauses if governor else 0}")
     logging.info(f"  Total time: {timedelta(seconds=round(elapsed))}")
     logging.info(f"  Completed: {completed_count}/{total}")
     logging.info(f"  Failed: {len(failed_list)}")
+    if batch_size > 1:
+        logging.info(f"  Batches: {batch_stats['batches']} x {batch_size}, "
+                     f"{batch_stats['companies_from_batches']} companies from batches, "
+                     f"{batch_stats['fallbacks_to_single']} fell back to single calls")
+    logging.info(f"  Calls ended early on a complete result: {early_exits}")
+    logging.info(f"  Salvaged outputs: {salvage_stats['repaired_locally']} repaired locally, "
+                 f"{salvage_stats['recovered_by_followup']} by re-emit follow-up "
+                 f"({salvage_stats['followup_failed']} follow-ups failed); "
+                 f"{salvage_stats['parse_retries']} parse failures re-researched")
+    if response_cache:
+        logging.info(f"  Response cache: {response_cache.hits} hits, {response_cache.misses} misses")
     if failed_list:
         logging.info("  Failed companies:")
         for f_company in failed_list:
@@ -439,4 +1268,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -0,0 +1,313 @@
+"""
+Streaming parser and run analytics for experiment/enrichment.log.
+
+Reads the log line by line (constant memory) and turns the interleaved
+records written by enrich.py into events:
+
+    ("run_start", ts, {"label"})
+    ("start",     ts, {"name", "domain", "is_customer"})
+    ("error",     ts, {"name", "attempt", "max_attempts", "message"})
+    ("timeout",   ts, {"name", "attempt", "max_attempts"})
+    ("retry",     ts, {"name", "delay"})
+    ("saved",     ts, {"name", "file"})
+    ("failed",    ts, {"name"})
+    ("run_end",   ts, {})
+
+Result lines without a company name (error, timeout, retry, saved, failed
+in the very first, serial run) are credited to the one company in
+progress. If none or several are open, the line cannot be attributed and the
+run's report shows effective concurrency as n/a.
+
+Run as a script for a per-run report: call latency percentiles, attempts
+per company, error classes, effective concurrency over time and time spent
+in retry backoff. Percentiles come from 1-second histograms and only
+in-flight companies are held, so memory stays flat for any log size.
+
+Usage:
+    python experiment/scripts/enrichment_log.py [LOG] [--run N] [--timeline-minutes M]
+"""
+import argparse
+import heapq
+import re
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+LOG_FILE = Path(__file__).parent.parent / "enrichment.log"
+
+LINE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) \[(\w+)\]\s+(.*)$")
+PATTERNS = [
+    ("run_start", re.compile(r"^ENRICHMENT PIPELINE STARTING ?(?P<label>.*)$")),
+    ("run_end", re.compile(r"^ENRICHMENT COMPLETE")),
+    ("start", re.compile(r"^\[\d+/\d+\] Enriching (?P<name>.+) \((?P<domain>[^()\s]+)\) \[(?P<kind>CUSTOMER|non-customer)\]")),
+    ("error", re.compile(r"^(?:\[(?P<name>.+?)\] )?(?:Unexpected error|Error) on attempt (?P<attempt>\d+)/(?P<max>\d+): (?P<message>.*)$")),
+    ("timeout", re.compile(r"^(?:\[(?P<name>.+?)\] )?Timeout on attempt (?P<attempt>\d+)/(?P<max>\d+)")),
+    ("retry", re.compile(r"^(?:\[(?P<name>.+?)\] )?Retrying in (?P<delay>[\d.]+)s")),
+    ("saved", re.compile(r"^(?:\[(?P<name>.+?)\] )?Saved to (?P<file>\S+)")),
+    ("failed", re.compile(r"^(?:\[(?P<name>.+?)\] )?FAILED")),
+]
+
+
+COMPLETIONS = ("error", "timeout", "retry", "saved", "failed")
+
+
+def parse_ts(text):
+    return datetime.strptime(text, "%Y-%m-%d %H:%M:%S,%f")
+
+
+def iter_events(path):
+    """Yield (kind, timestamp, fields) for every recognised log line."""
+    with open(path, errors="replace") as f:
+        for line in f:
+            m = LINE.match(line.rstrip("\n"))
+            if not m:
+                continue
+            message = m.group(3)
+            for kind, pattern in PATTERNS:
+                pm = pattern.match(message)
+                if not pm:
+                    continue
+                fields = pm.groupdict()
+                if kind == "start":
+                    fields["is_customer"] = fields.pop("kind") == "CUSTOMER"
+                elif kind in ("error", "timeout"):
+                    fields["attempt"] = int(fields["attempt"])
+                    fields["max_attempts"] = int(fields.pop("max"))
+                elif kind == "retry":
+                    fields["delay"] = float(fields["delay"])
+                yield kind, parse_ts(m.group(1)), fields
+                break
+
+
+def resolve_name(kind, fields, open_names):
+    """The company a line is about. Result lines of the serial pipeline carry no name:
+    they belong to the one company in progress, or to none (None) if more are open.
+    """
+    name = fields.get("name")
+    if name is None and kind in COMPLETIONS and len(open_names) == 1:
+        return next(iter(open_names))
+    return name
+
+
+def company_durations(path):
+    """Yield (domain, seconds) for every company saved in the log.
+
+    Duration runs from the "Enriching" line to "Saved to" within one run, so it
+    includes retries and backoff.
+    """
+    open_companies = {}  # name -> (domain, start ts)
+    for kind, ts, fields in iter_events(path):
+        name = resolve_name(kind, fields, open_companies)
+        if kind == "run_start":
+            open_companies = {}
+        elif kind == "start":
+            open_companies[name] = (fields["domain"], ts)
+        elif kind == "saved" and name in open_companies:
+            domain, started = open_companies.pop(name)
+            yield domain, (ts - started).total_seconds()
+        elif kind == "failed":
+            open_companies.pop(name, None)
+
+
+def classify_error(message):
+    """Bucket an attempt error message into a coarse error class."""
+    m = re.match(r"Claude CLI exited with code (-?\d+)", message)
+    if m:
+        return f"exit code {m.group(1)}"
+    lowered = message.lower()
+    if lowered.startswith("empty output"):
+        return "empty output"
+    if lowered.startswith("could not extract json"):
+        return "unparseable JSON"
+    if lowered.startswith("invalid enrichment structure"):
+        return "schema invalid"
+    return "other"
+
+
+def percentile(histogram, q):
+    """q-th percentile (0-100) from a {seconds: count} histogram."""
+    total = sum(histogram.values())
+    if not total:
+        return None
+    rank = q / 100 * (total - 1)
+    seen = 0
+    for value in sorted(histogram):
+        seen += histogram[value]
+        if seen > rank:
+            return value
+    return max(histogram)
+
+
+class RunStats:
+    """Aggregates for one pipeline run, fed event by event."""
+
+    def __init__(self, index, started, label, timeline_minutes=10):
+        self.index = index
+        self.started = started
+        self.ended = started
+        self.label = label.strip("()") or "serial"
+        self.timeline_seconds = timeline_minutes * 60
+
+        self.ok_latency = Counter()  # whole seconds -> count
+        self.all_latency = Counter()
+        self.attempts_per_company = Counter()  # attempts used -> companies
+        self.error_classes = Counter()
+        self.saved = 0
+        self.failed = 0
+        self.backoff_seconds = 0.0
+        self.busy_seconds = 0.0  # integral of in-flight calls over time
+        self.peak_in_flight = 0
+        self.untracked = False  # a nameless result line could not be tied to one company
+        self.timeline = Counter()  # bucket index -> call-seconds
+
+        self.in_flight = 0
+        self.last_ts = started
+        self.open = {}  # name -> {"attempt_start", "attempts"}
+        self.pending_starts = []  # heap of (ts, name) for retries after backoff
+
+    def _advance(self, ts):
+        """Integrate in-flight calls up to `ts`, starting retries whose backoff ended."""
+        while self.pending_starts and self.pending_starts[0][0] <= ts:
+            start_ts, name = heapq.heappop(self.pending_starts)
+            self._integrate(start_ts)
+            if name in self.open:
+                self.open[name]["attempt_start"] = start_ts
+                self._set_in_flight(self.in_flight + 1)
+        self._integrate(ts)
+
+    def _integrate(self, ts):
+        if ts <= self.last_ts:
+            return
+        t = self.last_ts
+        while t < ts:
+            bucket = int((t - self.started).total_seconds() // self.timeline_seconds)
+            bucket_end = self.started + timedelta(seconds=(bucket + 1) * self.timeline_seconds)
+            step_end = min(ts, bucket_end)
+            call_seconds = self.in_flight * (step_end - t).total_seconds()
+            self.timeline[bucket] += call_seconds
+            self.busy_seconds += call_seconds
+            t = step_end
+        self.last_ts = ts
+
+    def _set_in_flight(self, n):
+        self.in_flight = max(n, 0)
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _end_attempt(self, name, ts, ok):
+        entry = self.open.get(name)
+        if entry is None or entry["attempt_start"] is None:
+            return None
+        latency = int((ts - entry["attempt_start"]).total_seconds())
+        self.all_latency[latency] += 1
+        if ok:
+            self.ok_latency[latency] += 1
+        entry["attempt_start"] = None
+        self._set_in_flight(self.in_flight - 1)
+        return entry
+
+    def feed(self, kind, ts, fields):
+        self._advance(ts)
+        self.ended = max(self.ended, ts)
+        name = resolve_name(kind, fields, self.open)
+        if name is None and kind in COMPLETIONS:
+            self.untracked = True
+        if kind == "start":
+            self.open[name] = {"attempt_start": ts, "attempts": 1}
+            self._set_in_flight(self.in_flight + 1)
+        elif kind in ("error", "timeout"):
+            entry = self._end_attempt(name, ts, ok=False)
+            self.error_classes["timeout" if kind == "timeout" else classify_error(fields["message"])] += 1
+            if entry is not None:
+                entry["attempts"] = fields["attempt"]
+        elif kind == "retry":
+            self.backoff_seconds += fields["delay"]
+            if name in self.open:
+                heapq.heappush(self.pending_starts, (ts + timedelta(seconds=fields["delay"]), name))
+                self.open[name]["attempts"] += 1
+        elif kind == "saved":
+            entry = self._end_attempt(name, ts, ok=True)
+            self.saved += 1
+            if entry is not None:
+                self.attempts_per_company[entry["attempts"]] += 1
+                del self.open[name]
+        elif kind == "failed":
+            self.failed += 1
+            entry = self.open.pop(name, None)
+            if entry is not None:
+                self.attempts_per_company["failed"] += 1
+
+    def finish(self):
+        self._advance(self.ended)
+
+    def report(self):
+        wall = max((self.ended - self.started).total_seconds(), 1)
+        lines = [
+            f"=== RUN {self.index}: {self.started:%Y-%m-%d %H:%M:%S} ({self.label}) ===",
+            f"Wall time:            {timedelta(seconds=round(wall))}",
+            f"Saved / failed:       {self.saved} / {self.failed}",
+            f"Throughput:           {self.saved / wall * 3600:.1f} companies/hour",
+            (f"Effective concurrency: avg {self.busy_seconds / wall:.2f}, peak {self.peak_in_flight}"
+             if not self.untracked else "Effective concurrency: n/a (result lines without company names)"),
+            f"Time in backoff:      {timedelta(seconds=round(self.backoff_seconds))} (summed across companies)",
+            "",
+            "--- CALL LATENCY (seconds) ---",
+        ]
+        for label, hist in (("successful", self.ok_latency), ("all attempts", self.all_latency)):
+            if hist:
+                p50, p95, p99 = (percentile(hist, q) for q in (50, 95, 99))
+                lines.append(f"  {label:<14s} n={sum(hist.values()):<5d} p50={p50:<5d} p95={p95:<5d} p99={p99:<5d} max={max(hist)}")
+        lines.append("")
+        lines.append("--- ATTEMPTS PER COMPANY ---")
+        for attempts in sorted(self.attempts_per_company, key=str):
+            lines.append(f"  {str(attempts):>7s}: {self.attempts_per_company[attempts]}")
+        if self.error_classes:
+            lines.append("")
+            lines.append("--- ERROR CLASSES ---")
+            for cls, count in self.error_classes.most_common():
+                lines.append(f"  {cls:<20s} {count}")
+        if self.timeline:
+            lines.append("")
+            lines.append(f"--- EFFECTIVE CONCURRENCY ({self.timeline_seconds // 60}-min buckets) ---")
+            for bucket in range(max(self.timeline) + 1):
+                avg = self.timeline.get(bucket, 0) / self.timeline_seconds
+                offset = timedelta(seconds=bucket * self.timeline_seconds)
+                lines.append(f"  +{str(offset):>8s}  {avg:5.2f}  {'#' * round(avg * 4)}")
+        return "\n".join(lines)
+
+
+def iter_runs(path, timeline_minutes=10):
+    """Yield a finished RunStats for each pipeline run in the log, in order."""
+    run = None
+    index = 0
+    for kind, ts, fields in iter_events(path):
+        if kind == "run_start":
+            if run is not None:
+                run.finish()
+                yield run
+            index += 1
+            run = RunStats(index, ts, fields.get("label", ""), timeline_minutes)
+            continue
+        if run is None:
+            continue
+        run.feed(kind, ts, fields)
+    if run is not None:
+        run.finish()
+        yield run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-run performance report for enrichment.log.")
+    parser.add_argument("log", nargs="?", default=LOG_FILE, type=Path)
+    parser.add_argument("--run", type=int, help="Only report run N (1-based)")
+    parser.add_argument("--timeline-minutes", type=int, default=10,
+                        help="Bucket size for the concurrency timeline (default 10)")
+    args = parser.parse_args()
+
+    for run in iter_runs(args.log, args.timeline_minutes):
+        if args.run is None or run.index == args.run:
+            print(run.report())
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Entity resolution for the Clay ingest (clay_prep.py): finds records that
+are the same company under different domains or names, so each company
+reaches enrich.py (and costs a `claude -p` call) once.
+
+Runs after clay_prep's exact-domain dedupe. Two records are linked when
+they share:
+
+1. domain: the registrable domain (as customer_matcher computes it), so
+   "www.acme.com", "acme.com" and "careers.acme.com" are one company
+2. linkedin: the LinkedIn company slug (linkedin.com/company/<slug>), which
+   survives rebrands and domain moves
+3. name: a brand label and a matching name. Records are blocked on their
+   domain's brand label ("telekom" for telekom.de and telekom.com), and
+   within a block a sorted-neighborhood pass compares each record with the
+   next NAME_WINDOW - 1 in name order under name_matcher's rules ("Deutsche
+   Telekom" / "Deutsche Telekom AG"). A name alone never links two records
+
+Keys 1-2 are exact blocks. Sites on shared hosting domains (github.io,
+myshopify.com, ...) are keyed by their full host instead, a domain that is
+itself a public suffix ("com.sa", "org.br") gives no domain or brand key,
+and a key shared by more than MAX_BLOCK records (a placeholder LinkedIn
+URL) is skipped rather than allowed to merge unrelated companies. Links are merged with
+union-find; the whole stage is near-linear and holds only the keys in
+memory (domain, brand and LinkedIn keys as 64-bit hashes).
+
+Records flagged as known customers are clustered too, and a cluster that
+contains one is dropped whole, so a customer's regional site or pre-rebrand
+domain is removed along with it.
+
+Each remaining cluster becomes one canonical record at its first member's
+position: the first member's fields, blanks filled from later members, plus
+a merged_from list with each other member's domain, company_name, source
+file and linking rule.
+
+The caller streams the records twice after resolve(): collect() gets only
+the records whose action is not KEEP (cluster members), then merge() (or
+the caller's own columnar equivalent, using `action` and `canonical`) emits
+the output.
+"""
+import re
+from array import array
+from collections import Counter
+
+from customer_matcher import normalize_domain, public_suffix
+from name_matcher import Name, NameIndex, normalize
+
+NAME_WINDOW = 5
+MAX_BLOCK = 20
+SHARED_HOSTS = {"github.io", "gitlab.io", "myshopify.com", "wixsite.com", "squarespace.com", "wordpress.com",
+                "blogspot.com", "webflow.io", "business.site", "carrd.co", "netlify.app", "vercel.app",
+                "herokuapp.com", "notion.site", "substack.com", "medium.com", "linktr.ee"}
+LINKEDIN_SLUG = re.compile(r"linkedin\.com/(?:company|school|showcase)/([^/?#\s]+)", re.IGNORECASE)
+
+# Per-record actions after resolve()
+KEEP = 0  # not merged with anything: written as is
+DROP = 1  # merged into an earlier record, or clustered with a known customer
+CANONICAL = 2  # first record of a merged cluster: replaced by the merged record
+
+_names = NameIndex()  # the default name rules
+
+
+def linkedin_slug(url):
+    m = LINKEDIN_SLUG.search(url or "")
+    return m.group(1).lower() if m else ""
+
+
+def domain_keys(domain):
+    """(registrable-domain key, brand label) for a record's domain; full host on shared hosting."""
+    host = normalize_domain(domain)
+    if not host:
+        return "", ""
+    # registrable_domain() and brand_label(), sharing one public_suffix() lookup
+    suffix = public_suffix(host)
+    brand = host[:-len(suffix)].rstrip(".").rsplit(".", 1)[-1]
+    if not brand:  # the host is a bare public suffix, which no company owns
+        return "", ""
+    registrable = f"{brand}.{suffix}"
+    if registrable in SHARED_HOSTS:
+        return host, ""
+    return registrable, brand
+
+
+def _key(value):
+    return hash(value) if value else 0
+
+
+def _blank(value):
+    return value is None or value == ""
+
+
+class Resolver:
+    """Collects each record's keys in order; resolve() clusters them."""
+
+    def __init__(self, window=NAME_WINDOW, max_block=MAX_BLOCK):
+        self.window = window
+        self.max_block = max_block
+        self.registrable = array("q")
+        self.brands = array("q")
+        self.slugs = array("q")
+        self.names = []
+        self.sources = []
+        self.known = bytearray()
+
+        self.parent = None
+        self.rule = None
+        self.roots = None
+        self.action = None
+        self.canonical = {}  # root -> merged record, filled by collect()
+        self.customer_duplicates = []  # names dropped for clustering with a known customer
+
+    def add(self, name, domain, linkedin_url="", source="", known=False):
+        registrable, brand = domain_keys(domain)
+        self.registrable.append(_key(registrable))
+        self.brands.append(_key(brand))
+        self.slugs.append(_key(linkedin_slug(linkedin_url)))
+        self.names.append(normalize(name or ""))
+        self.sources.append(source)
+        self.known.append(known)
+
+    def __len__(self):
+        return len(self.names)
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def _union(self, i, j, rule):
+        ri, rj = self.find(i), self.find(j)
+        if ri == rj:
+            return
+        if rj < ri:
+            ri, rj = rj, ri
+        self.parent[rj] = ri  # the root is always the cluster's first record
+        for k in (rj, max(i, j)):
+            if self.rule[k] is None:
+                self.rule[k] = rule
+
+    def _block(self, keys, rule):
+        counts = Counter(keys)
+        first = {}
+        for i, key in enumerate(keys):
+            if key and 1 < counts[key] <= self.max_block:
+                j = first.setdefault(key, i)
+                if j != i:
+                    self._union(j, i, rule)
+
+    def _neighborhood(self):
+        names, brands = self.names, self.brands
+        counts = Counter(brands)
+        blocks = {}
+        for i, brand in enumerate(brands):
+            if brand and counts[brand] > 1 and names[i]:
+                blocks.setdefault(brand, []).append(i)
+        for block in blocks.values():
+            order = sorted(block, key=names.__getitem__)
+            for pos, i in enumerate(order):
+                for j in order[pos + 1:pos + self.window]:
+                    if self.find(i) != self.find(j) and _names.rule(Name(None, names[i]), Name(None, names[j])):
+                        self._union(i, j, "name")
+
+    def resolve(self):
+        """Cluster the records and set `action`; returns {rule: records merged by it}, customer clusters aside."""
+        n = len(self)
+        self.parent = list(range(n))
+        self.rule = [None] * n
+        self._block(self.registrable, "domain")
+        self._block(self.slugs, "linkedin")
+        self._neighborhood()
+
+        roots = self.roots = [self.find(i) for i in range(n)]
+        sizes = Counter(roots)
+        known_roots = {roots[i] for i in range(n) if self.known[i]}
+        self.action = bytearray(n)
+        merged = Counter()
+        for i, root in enumerate(roots):
+            if root in known_roots:
+                self.action[i] = DROP
+            elif sizes[root] > 1:
+                self.action[i] = CANONICAL if i == root else DROP
+                if i != root:
+                    merged[self.rule[i]] += 1
+        return merged
+
+    def collect(self, records):
+        """Build the merged records from (index, record) for every record whose action is not KEEP, in order."""
+        for i, record in records:
+            root = self.roots[i]
+            if self.action[root] == DROP:  # a known customer's cluster
+                if not self.known[i]:
+                    self.customer_duplicates.append(record.get("company_name"))
+            elif i == root:
+                record["merged_from"] = []
+                self.canonical[root] = record
+            else:
+                canonical = self.canonical[root]
+                for field, value in record.items():
+                    if field != "merged_from" and _blank(canonical.get(field)) and not _blank(value):
+                        canonical[field] = value
+                canonical["merged_from"].append({
+                    "domain": record.get("domain"),
+                    "company_name": record.get("company_name"),
+                    "source": self.sources[i],
+                    "rule": self.rule[i],
+                })
+
+    def merge(self, records):
+        """The output records, given all `records` again in order (after collect())."""
+        for i, record in enumerate(records):
+            action = self.action[i]
+            if action == KEEP:
+                yield record
+            elif action == CANONICAL:
+                yield self.canonical[i]
@@ -0,0 +1,243 @@
+"""
+Export the enrichment results as static JSON for the experiment pages
+(app/experiment/components/*Panel.tsx), so their numbers come from the data
+instead of being copied by hand from quick_analysis.py output.
+
+Reads the results once (result store or data/enriched, as quick_analysis.py
+does), scores them under quick_analysis.WEIGHTS and writes to public/
+experiment-data/:
+
+- manifest.json: the current file names below plus counts. The only file
+  that is not content-hashed, so it is the one to fetch uncached
+- summary.<hash>.json: what the panels show up front. Top-quartile and
+  top-decile hit rates with their lift over random, average scores, the
+  score distribution, per-signal separations with their weighted
+  contribution (weight x separation), and the top --top non-customer
+  prospects with a one-line note (their strongest signal's reasoning cut to
+  --note-chars)
+- ranked.<hash>.json: every company in score order as parallel columns
+  (name, domain, score, customer flag, signal scores as one digit string)
+- details/<n>.<hash>.json: full reasoning per signal for --shard-size
+  companies each, in ranked order, loaded only when a company is opened.
+  The ranked list's shard column says which one holds each company
+
+ResultsPanel, SignalAnalysisPanel and ProspectListPanel read the summary
+through app/experiment/components/useExperimentSummary.ts and keep their
+built-in numbers until it loads (or when nothing has been exported).
+
+Bundles are written compactly (no whitespace, UTF-8) and named by a hash of
+their content, so unchanged data keeps its file names and every bundle can
+be cached forever. Files from earlier exports that the new manifest no
+longer lists are removed.
+
+Usage:
+    python experiment/scripts/export_bundle.py
+    python experiment/scripts/export_bundle.py --top 50 --shard-size 100 --out /tmp/experiment-data
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from quick_analysis import WEIGHTS, load_all, score_all
+
+OUT_DIR = Path(__file__).parent.parent.parent / "public" / "experiment-data"
+TOP_PROSPECTS = 25
+SHARD_SIZE = 50
+NOTE_CHARS = 140
+HASH_CHARS = 12
+BRACKETS = [(0, 20), (21, 40), (41, 60), (61, 80), (81, 100)]
+BUNDLE_NAME = re.compile(r"^(summary|ranked|\d+)\.[0-9a-f]+\.json$")
+
+SIGNAL_LABELS = {
+    "km_hiring": "KM Hiring",
+    "competitor_km_customer": "Competitor Tool",
+    "enterprise_saas": "Enterprise SaaS",
+}
+
+
+def signal_label(signal):
+    return SIGNAL_LABELS.get(signal, signal.replace("_", " ").title())
+
+
+def truncate(text, limit):
+    """`text` cut at a word boundary to at most `limit` characters, with an ellipsis if cut."""
+    text = " ".join((text or "").split())
+    if len(text) <= limit:
+        return text
+    cut = text[:limit - 1].rsplit(" ", 1)[0].rstrip(" ,.;:")
+    return cut + "…"
+
+
+def _umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+FILE_MODE = 0o644 & ~_umask()  # mkstemp creates 0600; the web server must be able to read the bundles
+
+
+def encode(data):
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def write_atomic(path, payload):
+    """Write via a temp file and rename, so a reader never sees a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.chmod(tmp, FILE_MODE)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def write_bundle(out_dir, stem, data):
+    """Write `data` as <stem>.<content hash>.json under `out_dir`; returns the path relative to it."""
+    payload = encode(data)
+    name = f"{stem}.{hashlib.sha256(payload).hexdigest()[:HASH_CHARS]}.json"
+    path = out_dir / name
+    if not path.exists():  # same hash, same content
+        write_atomic(path, payload)
+    return path.relative_to(out_dir).as_posix()
+
+
+def top_hits(ranked, share):
+    """(companies, customers among them) in the top `share` of the ranked list."""
+    cutoff = max(1, int(len(ranked) * share))
+    return cutoff, sum(1 for r in ranked[:cutoff] if r["customer"])
+
+
+def note(record):
+    """The reasoning of the record's highest-weighted signal score, truncated."""
+    signals = record["signals"]
+    best = max(WEIGHTS, key=lambda s: signals.get(s, {}).get("score", 0) * WEIGHTS[s])
+    return signals.get(best, {}).get("reasoning") or ""
+
+
+def build(customers, non_customers, top=TOP_PROSPECTS, shard_size=SHARD_SIZE, note_chars=NOTE_CHARS):
+    """(summary, ranked, shards) bundles from the loaded records."""
+    cust_scores, non_scores, signal_avgs = score_all(customers, non_customers)
+    scored = ([(r, s, True) for r, s in zip(customers, cust_scores)]
+              + [(r, s, False) for r, s in zip(non_customers, non_scores)])
+    scored.sort(key=lambda x: x[1], reverse=True)  # stable: customers first on ties, as in the report
+    ranked = [{"record": r, "score": s, "customer": c} for r, s, c in scored]
+    total = len(ranked)
+    random_rate = len(customers) / total if total else 0
+
+    def hit_block(share):
+        companies, hits = top_hits(ranked, share)
+        rate = hits / companies if total else 0
+        return {"companies": companies, "customers": hits, "hitRate": round(rate * 100, 1),
+                "lift": round(rate / random_rate, 2) if random_rate else None}
+
+    customer_avg = round(sum(cust_scores) / len(cust_scores), 1) if cust_scores else 0
+    non_customer_avg = round(sum(non_scores) / len(non_scores), 1) if non_scores else 0
+    signals = []
+    for signal, weight in WEIGHTS.items():
+        cust_avg, non_cust_avg = signal_avgs[signal]
+        separation = round(cust_avg - non_cust_avg, 2)
+        signals.append({"signal": signal, "label": signal_label(signal), "weight": weight,
+                        "customerAvg": cust_avg, "nonCustomerAvg": non_cust_avg,
+                        "separation": separation, "contribution": round(separation * weight, 2)})
+    signals.sort(key=lambda s: s["contribution"], reverse=True)
+
+    prospects = []
+    for rank, row in enumerate(ranked, 1):
+        if len(prospects) >= top:
+            break
+        if not row["customer"]:
+            record = row["record"]
+            prospects.append({"rank": rank, "company": record["company_name"], "domain": record.get("domain"),
+                              "score": row["score"], "note": truncate(note(record), note_chars),
+                              "shard": (rank - 1) // shard_size})
+
+    summary = {
+        "companies": total,
+        "customers": len(customers),
+        "nonCustomers": len(non_customers),
+        "randomRate": round(random_rate * 100, 1),
+        "topQuartile": hit_block(0.25),
+        "topDecile": hit_block(0.10),
+        "customerAvg": customer_avg,
+        "nonCustomerAvg": non_customer_avg,
+        "separation": round(customer_avg - non_customer_avg, 1),
+        "scoreDistribution": [
+            {"range": f"{low}-{high}",
+             "customers": sum(1 for s in cust_scores if low <= s <= high),
+             "nonCustomers": sum(1 for s in non_scores if low <= s <= high)}
+            for low, high in BRACKETS
+        ],
+        "signals": signals,
+        "topProspects": prospects,
+    }
+
+    ranked_bundle = {
+        "signals": list(WEIGHTS),
+        "company": [r["record"]["company_name"] for r in ranked],
+        "domain": [r["record"].get("domain") for r in ranked],
+        "score": [r["score"] for r in ranked],
+        "customer": [int(r["customer"]) for r in ranked],
+        "signalScores": ["".join(str(int(r["record"]["signals"].get(s, {}).get("score", 0))) for s in WEIGHTS)
+                         for r in ranked],
+        "shardSize": shard_size,
+    }
+
+    shards = []
+    for start in range(0, total, shard_size):
+        shards.append([
+            {"company": r["record"]["company_name"], "domain": r["record"].get("domain"),
+             "signals": {s: r["record"]["signals"][s].get("reasoning") or ""
+                         for s in WEIGHTS if s in r["record"]["signals"]}}
+            for r in ranked[start:start + shard_size]
+        ])
+    return summary, ranked_bundle, shards
+
+
+def export(out_dir=OUT_DIR, top=TOP_PROSPECTS, shard_size=SHARD_SIZE, note_chars=NOTE_CHARS):
+    """Write the bundles and manifest to `out_dir`; returns the manifest."""
+    out_dir = Path(out_dir)
+    customers, non_customers = load_all(with_reasoning=True)
+    summary, ranked, shards = build(customers, non_customers, top, shard_size, note_chars)
+    manifest = {
+        "companies": summary["companies"],
+        "summary": write_bundle(out_dir, "summary", summary),
+        "ranked": write_bundle(out_dir, "ranked", ranked),
+        "details": [write_bundle(out_dir, f"details/{i}", shard) for i, shard in enumerate(shards)],
+    }
+    write_atomic(out_dir / "manifest.json", encode(manifest))
+
+    keep = {manifest["summary"], manifest["ranked"], *manifest["details"]}
+    for path in [*out_dir.glob("*.json"), *out_dir.glob("details/*.json")]:
+        name = path.relative_to(out_dir).as_posix()
+        if BUNDLE_NAME.match(path.name) and name not in keep:
+            path.unlink()
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export precomputed experiment data for the Next.js panels.")
+    parser.add_argument("--out", type=Path, default=OUT_DIR, help=f"Output directory (default {OUT_DIR})")
+    parser.add_argument("--top", type=int, default=TOP_PROSPECTS,
+                        help=f"Non-customer prospects in the summary (default {TOP_PROSPECTS})")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE,
+                        help=f"Companies per details shard (default {SHARD_SIZE})")
+    parser.add_argument("--note-chars", type=int, default=NOTE_CHARS,
+                        help=f"Prospect note length in the summary (default {NOTE_CHARS})")
+    args = parser.parse_args()
+
+    manifest = export(args.out, args.top, args.shard_size, args.note_chars)
+    print(f"Exported {manifest['companies']} companies to {args.out}")
+    for name in [manifest["summary"], manifest["ranked"], *manifest["details"]]:
+        print(f"  {name:40s} {(args.out / name).stat().st_size:>9,d} bytes")
+
+
+if __name__ == "__main__":
+    main()
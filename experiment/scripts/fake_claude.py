@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Drop-in stand-in for the `claude` CLI, for benchmarking enrich.py offline.
+
+Reads the prompt on stdin like `claude -p` and prints an enrichment result.
+It understands single-company, partial re-score, batch and re-emit (repair)
+prompts: the signals and companies it scores come from the prompt itself.
+Command-line flags are accepted and ignored. Put it on PATH as `claude`
+(bench_enrich.py writes a shim that does this).
+
+Behaviour is set with environment variables:
+
+    FAKE_CLAUDE_LATENCY        fixed:S | uniform:A,B | lognormal:MEDIAN,SIGMA   (default fixed:0)
+    FAKE_CLAUDE_FAIL_RATE      probability of a non-zero exit               (default 0)
+    FAKE_CLAUDE_EXIT_CODES     comma list to draw the exit code from        (default 1)
+    FAKE_CLAUDE_QUOTA_RATE     probability of a rate-limit error (exit 1)   (default 0)
+    FAKE_CLAUDE_TRUNCATE_RATE  probability the JSON is cut off mid-object   (default 0)
+    FAKE_CLAUDE_PROSE_RATE     probability of stray prose around the JSON   (default 0)
+    FAKE_CLAUDE_DROP_RATE      per-company probability a batch result is left out (default 0)
+    FAKE_CLAUDE_TRAILING       seconds to keep running after printing       (default 0)
+    FAKE_CLAUDE_RESPONSES      directory of canned <domain>.json responses
+    FAKE_CLAUDE_SEED           seed, for reproducible runs
+
+Latency is slept before the output is written, so it looks like research time.
+"""
+import json
+import os
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+SECTION_START = re.compile(r"^([a-z][a-z_]*) - ", re.MULTILINE)
+
+
+def env_float(name, default=0.0):
+    return float(os.environ.get(name, default))
+
+
+def draw_latency(spec):
+    kind, _, args = spec.partition(":")
+    params = [float(x) for x in args.split(",") if x]
+    if kind == "fixed":
+        return params[0] if params else 0.0
+    if kind == "uniform":
+        return random.uniform(params[0], params[1])
+    if kind == "lognormal":
+        median, sigma = params
+        return random.lognormvariate(0, sigma) * median
+    raise SystemExit(f"fake_claude: unknown latency spec {spec!r}")
+
+
+def record(company, signals):
+    """A plausible enrichment record, or the canned response for this domain if there is one."""
+    canned_dir = os.environ.get("FAKE_CLAUDE_RESPONSES")
+    if canned_dir:
+        canned = Path(canned_dir) / f"{company.get('domain', '')}.json"
+        if canned.exists():
+            return json.loads(canned.read_text())
+    return {
+        "company_name": company.get("company_name", ""),
+        "domain": company.get("domain", ""),
+        "signals": {
+            s: {"score": random.randint(0, 3),
+                "reasoning": f"Found {{{random.randint(1, 9)}}} \"public\" sources on {company.get('company_name', '')}."}
+            for s in signals
+        },
+    }
+
+
+def respond(prompt):
+    if "PREVIOUS ANSWER:" in prompt:
+        # Re-emit follow-up: the output format block names the signals
+        fmt = prompt[prompt.index("{", prompt.index("OUTPUT FORMAT")):prompt.index("PREVIOUS ANSWER:")]
+        signals = list(json.loads(fmt)["signals"])
+        previous = prompt[prompt.index("PREVIOUS ANSWER:"):]
+        domain = re.search(r'"domain": "([^"]*)"', previous)
+        return record({"domain": domain.group(1) if domain else ""}, signals), False
+
+    signals = SECTION_START.findall(prompt[prompt.index("SIGNAL SCORING RUBRICS"):])
+    data_text = prompt[prompt.index("COMPANY DATA:") + len("COMPANY DATA:"):prompt.index("SIGNAL SCORING RUBRICS")]
+    companies = json.loads(data_text)
+    if isinstance(companies, list):
+        drop = env_float("FAKE_CLAUDE_DROP_RATE")
+        results = [{"batch_id": c["batch_id"], **record(c, signals)} for c in companies if random.random() >= drop]
+        return {"results": results}, True
+    return record(companies, signals), True
+
+
+def main():
+    seed = os.environ.get("FAKE_CLAUDE_SEED")
+    if seed is not None:
+        random.seed(f"{seed}:{os.getpid()}")
+    prompt = sys.stdin.read()
+    time.sleep(draw_latency(os.environ.get("FAKE_CLAUDE_LATENCY", "fixed:0")))
+
+    if random.random() < env_float("FAKE_CLAUDE_QUOTA_RATE"):
+        sys.stderr.write("API Error: 429 rate limit exceeded, please try again later\n")
+        sys.exit(1)
+    if random.random() < env_float("FAKE_CLAUDE_FAIL_RATE"):
+        codes = [int(c) for c in os.environ.get("FAKE_CLAUDE_EXIT_CODES", "1").split(",")]
+        sys.stderr.write("Error: process crashed\n")
+        sys.exit(random.choice(codes))
+
+    data, research = respond(prompt)
+    out = json.dumps(data, indent=2)
+    if research and random.random() < env_float("FAKE_CLAUDE_TRUNCATE_RATE"):
+        out = out[:random.randint(len(out) // 2, len(out) - 2)]
+    if research and random.random() < env_float("FAKE_CLAUDE_PROSE_RATE"):
+        out = f"Here is the {{research}} summary:\n```json\n{out}\n```\nLet me know if you need {{anything}} else."
+    sys.stdout.write(out)
+    sys.stdout.flush()
+    time.sleep(env_float("FAKE_CLAUDE_TRAILING"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Crash-safe run journal for enrich.py (SQLite in WAL mode).
+
+One row per company with its current state, plus an append-only log of every
+CLI attempt:
+
+    companies(domain PK, company_name, state, attempts, last_error,
+              duration_seconds, output_path, output_hash, rubric_versions,
+              updated_at)
+    attempts(id, domain, attempt, started_at, duration_seconds, outcome, error)
+
+States: pending -> in_flight -> done | failed. A row left in_flight by a
+crash or kill is simply picked up again on the next run.
+
+Resume checks a company with one primary-key lookup (get_state) instead of
+opening and parsing its enrichment file. No per-company state is held in
+memory, so very large lists resume as cheaply as small ones.
+"""
+import json
+import sqlite3
+from datetime import datetime
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS companies (
+    domain TEXT PRIMARY KEY,
+    company_name TEXT,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    duration_seconds REAL,
+    output_path TEXT,
+    output_hash TEXT,
+    rubric_versions TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS companies_state ON companies(state);
+CREATE INDEX IF NOT EXISTS companies_updated ON companies(updated_at);
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    domain TEXT NOT NULL,
+    attempt INTEGER NOT NULL,
+    started_at TEXT NOT NULL,
+    duration_seconds REAL,
+    outcome TEXT NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS attempts_domain ON attempts(domain);
+"""
+
+
+def journal_key(company):
+    """Key a company by its normalized domain (same basis as its output file)."""
+    return company["domain"].lower().rstrip(".")
+
+
+def _state(state, attempts, output_hash, versions):
+    return {
+        "state": state,
+        "attempts": attempts,
+        "output_hash": output_hash,
+        "rubric_versions": json.loads(versions) if versions else None,
+    }
+
+
+class RunJournal:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def load_states(self):
+        """{domain: {"state", "attempts", "output_hash", "rubric_versions"}} in one query."""
+        rows = self.conn.execute(
+            "SELECT domain, state, attempts, output_hash, rubric_versions FROM companies"
+        )
+        return {domain: _state(*row) for domain, *row in rows}
+
+    def get_state(self, domain):
+        """One company's {"state", "attempts", "output_hash", "rubric_versions"}, or None."""
+        row = self.conn.execute(
+            "SELECT state, attempts, output_hash, rubric_versions FROM companies WHERE domain = ?", (domain,)
+        ).fetchone()
+        return _state(*row) if row else None
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM companies").fetchone()[0]
+
+    def _upsert(self, domain, company_name, state, **fields):
+        fields["updated_at"] = datetime.now().isoformat()
+        cols = ["domain", "company_name", "state", *fields]
+        updates = ", ".join(f"{c} = excluded.{c}" for c in cols[2:])
+        self.conn.execute(
+            f"INSERT INTO companies ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))}) "
+            f"ON CONFLICT(domain) DO UPDATE SET {updates}",
+            [domain, company_name, state, *fields.values()],
+        )
+
+    def mark_in_flight(self, domain, company_name):
+        self._upsert(domain, company_name, IN_FLIGHT)
+
+    def record_attempt(self, domain, attempt, started_at, duration_seconds, outcome, error=None):
+        self.conn.execute(
+            "INSERT INTO attempts (domain, attempt, started_at, duration_seconds, outcome, error) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (domain, attempt, started_at, duration_seconds, outcome, error),
+        )
+        self.conn.execute(
+            "UPDATE companies SET attempts = attempts + 1 WHERE domain = ?", (domain,)
+        )
+
+    def mark_done(self, domain, company_name, output_path, output_hash, rubric_versions,
+                  duration_seconds=None):
+        self._upsert(
+            domain, company_name, DONE,
+            output_path=str(output_path),
+            output_hash=output_hash,
+            rubric_versions=json.dumps(rubric_versions, sort_keys=True),
+            duration_seconds=duration_seconds,
+            last_error=None,
+        )
+
+    def mark_failed(self, domain, company_name, error, duration_seconds=None):
+        self._upsert(domain, company_name, FAILED, last_error=error, duration_seconds=duration_seconds)
+
+    def finished_durations(self):
+        """(domain, duration_seconds) for every finished company with a timing."""
+        return self.conn.execute(
+            "SELECT domain, duration_seconds FROM companies "
+            "WHERE state = ? AND duration_seconds IS NOT NULL", (DONE,)
+        ).fetchall()
+
+    def finished_since(self, updated_at=""):
+        """(output_path, output_hash, updated_at) of companies marked done at or after `updated_at`, oldest first."""
+        return self.conn.execute(
+            "SELECT output_path, output_hash, updated_at FROM companies "
+            "WHERE updated_at >= ? AND state = ? ORDER BY updated_at", (updated_at, DONE)
+        ).fetchall()
+
+    def attempt_history(self):
+        """Every recorded attempt as (domain, attempt, started_at, duration_seconds, outcome)."""
+        return self.conn.execute(
+            "SELECT domain, attempt, started_at, duration_seconds, outcome FROM attempts ORDER BY id"
+        ).fetchall()
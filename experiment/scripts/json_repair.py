@@ -0,0 +1,147 @@
+"""
+Local structural repair for enrichment output that almost parsed.
+
+The CLI sometimes stops mid-object (max turns, a killed process) or wraps the
+result in something json.loads rejects. The research behind it is still good,
+so before a retry throws it away we try, in order:
+
+- the text as-is, with code fences removed
+- trailing commas dropped ({"a": 1,} -> {"a": 1})
+- curly quotes straightened, or a single-quoted (Python-style) dict converted
+- a truncated object closed: an unterminated string is ended, a dangling key
+  or comma dropped, and every open object/array closed. If that still does
+  not parse, the text is cut back to each of the last few commas in turn,
+  which drops the half-written member
+
+Numeric scores that came back as strings ("2") are coerced to numbers.
+"""
+import json
+import math
+import re
+
+from json_stream import iter_json_objects
+
+FENCE = re.compile(r"```(?:json)?")
+TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+DANGLING_KEY = re.compile(r'[{,]\s*"(?:[^"\\]|\\.)*"\s*:?\s*$')
+PARTIAL_LITERAL = re.compile(r"[:\[,]\s*(?:t|tr|tru|f|fa|fal|fals|n|nu|nul|-|-?\d+\.|-?\d+(?:\.\d+)?[eE][-+]?)$")
+MAX_CUTS = 8
+
+
+def _strip_dangling(text):
+    """Drop an incomplete trailing member: a partial literal, a key with no value, a comma."""
+    text = text.rstrip()
+    m = PARTIAL_LITERAL.search(text)
+    if m:
+        text = text[:m.start() + 1].rstrip()
+    if text.endswith(":"):
+        text = text[:-1].rstrip()
+    m = DANGLING_KEY.search(text)
+    if m:
+        # Keep the opening brace, drop the comma
+        text = text[:m.start() + 1] if text[m.start()] == "{" else text[:m.start()]
+    return text.rstrip().rstrip(",")
+
+
+def close_truncated(text):
+    """Candidate completions of a JSON object cut off mid-stream, best first.
+
+    Returns [] if there is no "{", or just the first balanced object if the
+    text is not actually truncated.
+    """
+    start = text.find("{")
+    if start < 0:
+        return []
+    stack = []  # closer for each open object/array
+    cuts = []  # (offset of a comma outside strings, closers needed there)
+    in_string = escape = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                return [text[start:i + 1]]
+        elif ch == ",":
+            cuts.append((i, "".join(reversed(stack))))
+
+    tail = text[start:]
+    if in_string:
+        tail = (tail[:-1] if escape else tail) + '"'
+    candidates = [_strip_dangling(tail) + "".join(reversed(stack))]
+    for pos, closers in reversed(cuts[-MAX_CUTS:]):
+        candidates.append(_strip_dangling(text[start:pos]) + closers)
+    return candidates
+
+
+def coerce_scores(data):
+    """Turn numeric-string signal scores into numbers, in place.
+
+    "2" and "2.0" become 2, "2.5" stays 2.5 rather than being truncated.
+    Anything else ("high", "inf", "nan") is left as the string, so the
+    record still fails validation instead of getting a made-up score.
+    """
+    signals = data.get("signals") if isinstance(data, dict) else None
+    if isinstance(signals, dict):
+        for entry in signals.values():
+            if isinstance(entry, dict) and isinstance(entry.get("score"), str):
+                try:
+                    value = float(entry["score"].strip())
+                    if math.isfinite(value):
+                        entry["score"] = int(value) if value.is_integer() else value
+                except (ValueError, OverflowError):
+                    pass
+    return data
+
+
+def _variants(text):
+    text = FENCE.sub("", text)
+    yield text
+    yield TRAILING_COMMA.sub(r"\1", text)
+    straightened = text.translate(SMART_QUOTES)
+    if straightened != text:
+        yield straightened
+    if '"' not in straightened and "'" in straightened:
+        yield straightened.replace("'", '"')
+
+
+def repair_json(text, accept=None):
+    """Best-effort parse of damaged output.
+
+    Returns the first repaired object that passes `accept` (if given),
+    otherwise the largest repaired object, or None.
+    """
+    best = None
+    seen = set()
+    for variant in _variants(text):
+        # Largest balanced objects first: the result wraps the nested signal objects
+        candidates = sorted(iter_json_objects(variant), key=len, reverse=True)[:MAX_CUTS]
+        candidates += close_truncated(variant)
+        for candidate in candidates:
+            if candidate in seen:
+                continue
+            seen.add(candidate)
+            try:
+                data = coerce_scores(json.loads(candidate))
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(data, dict):
+                continue
+            if accept is not None and accept(data):
+                return data
+            if best is None or len(candidate) > best[0]:
+                best = (len(candidate), data)
+    return best[1] if best else None
@@ -0,0 +1,60 @@
+"""
+Incremental, string- and escape-aware scanner for JSON objects in a text stream.
+
+Feed it chunks of CLI stdout as they arrive; it hands back the text of every
+balanced {...} object the moment its closing brace is seen, innermost first.
+Braces inside JSON strings (and escaped quotes inside those strings) are
+ignored, so reasoning text like "uses {Slack}" cannot end an object early.
+
+Objects are reported at every nesting depth, not just the outermost. That
+way a stray "{" in prose before the real result (which leaves the outer
+level open forever) cannot hide the result object nested after it. Callers
+decide which candidate they want, e.g. the first that validates.
+"""
+
+
+class JsonObjectScanner:
+    def __init__(self):
+        self.text = []  # chars since the outermost still-open brace
+        self.stack = []  # offsets into self.text of each open brace
+        self.in_string = False
+        self.escape = False
+
+    def feed(self, chunk):
+        """Consume `chunk`; return the texts of objects completed within it."""
+        completed = []
+        for ch in chunk:
+            if not self.stack:
+                if ch == "{":
+                    self.text = ["{"]
+                    self.stack = [0]
+                continue
+
+            self.text.append(ch)
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == "{":
+                self.stack.append(len(self.text) - 1)
+            elif ch == "}":
+                start = self.stack.pop()
+                completed.append("".join(self.text[start:]))
+                if not self.stack:
+                    self.text = []
+        return completed
+
+    def pending(self):
+        """Text from the outermost brace still open at end of stream (e.g. truncated output)."""
+        return "".join(self.text) if self.stack else ""
+
+
+def iter_json_objects(text):
+    """Every balanced {...} candidate in `text`, innermost first."""
+    scanner = JsonObjectScanner()
+    yield from scanner.feed(text)
@@ -0,0 +1,321 @@
+"""
+Live version of quick_analysis.py: the viability numbers for an enrichment
+run, refreshed as enrich.py writes results, so a bad rubric can be stopped
+early instead of after the full run.
+
+Aggregates are updated one company at a time instead of recomputed from
+every file:
+
+- per-signal score sums and counts, split by is_known_customer
+- a Fenwick tree over the 0-100 score values for all companies and one for
+  customers: the top-quartile cutoff, the customers above it and the score
+  brackets are O(log 101) rank queries
+- per-score buckets of companies, walked from either end for the ranked
+  list
+
+Adding, replacing or removing a company only touches its own entries, so an
+update costs O(signals + log n) however many companies are loaded. Ties rank
+customers first, then by file name, as in quick_analysis.py, so once the run
+is finished the numbers match its report.
+
+New and changed results are found by polling (no extra dependencies):
+
+- journal (default, when enrich.py's run journal exists): the rows marked
+  done since the last poll, one indexed query. A row whose output hash is
+  the one already loaded is skipped without reading the file
+- directory (--no-journal, or no journal yet): a stat of each
+  data/enriched/*.json, parsing only files whose size or mtime changed, and
+  dropping companies whose file is gone
+
+Either way data/enriched is loaded in full once at startup.
+
+Usage:
+    python experiment/scripts/live_analysis.py                 # refresh every 10s while results land
+    python experiment/scripts/live_analysis.py --interval 30 --no-journal
+    python experiment/scripts/live_analysis.py --once          # one summary from the running aggregates
+"""
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from journal import RunJournal
+from quick_analysis import ENRICHED_DIR, WEIGHTS
+
+JOURNAL_FILE = ENRICHED_DIR.parent / "enrichment_journal.sqlite"
+MAX_SIGNAL_SCORE = 3
+SCORE_VALUES = 101  # scores are rounded to 0-100
+BRACKETS = [(0, 20), (21, 40), (41, 60), (61, 80), (81, 100)]
+POLL_INTERVAL = 10
+
+
+class Fenwick:
+    """Counts per value 0..size-1 with O(log size) updates, prefix sums and k-th smallest."""
+
+    def __init__(self, size):
+        self.tree = [0] * (size + 1)
+
+    def add(self, value, delta):
+        i = value + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, value):
+        """Count of values below `value`."""
+        total = 0
+        i = value
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def count(self, low, high):
+        """Count of values in low..high inclusive."""
+        return self.prefix(high + 1) - self.prefix(low)
+
+    def kth(self, k):
+        """The k-th smallest value (1-based)."""
+        pos = 0
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            if pos + step < len(self.tree) and self.tree[pos + step] < k:
+                pos += step
+                k -= self.tree[pos]
+            step >>= 1
+        return pos
+
+
+class LiveAnalysis:
+    def __init__(self, weights=WEIGHTS):
+        self.weights = weights
+        self.max_score = MAX_SIGNAL_SCORE * sum(weights.values())
+        self.entries = {}  # key -> (is_customer, score, {signal: score}, content hash, company name)
+        self.updates = 0
+        self.groups = Counter()  # is_customer -> companies
+        self.score_sums = Counter()  # is_customer -> sum of scores
+        self.signal_sums = {True: Counter(), False: Counter()}
+        self.signal_counts = {True: Counter(), False: Counter()}
+        self.ranks = Fenwick(SCORE_VALUES)
+        self.customer_ranks = Fenwick(SCORE_VALUES)
+        self.buckets = {}  # score -> sorted [(not is_customer, key)], the report's tie order
+
+    def __len__(self):
+        return len(self.entries)
+
+    def score(self, signals):
+        raw = sum(signals.get(signal, 0) * weight for signal, weight in self.weights.items())
+        return round(raw / self.max_score * 100)
+
+    def _apply(self, key, entry, sign):
+        is_customer, score, signals = entry[:3]
+        self.updates += 1
+        self.groups[is_customer] += sign
+        self.score_sums[is_customer] += sign * score
+        for signal, value in signals.items():
+            self.signal_sums[is_customer][signal] += sign * value
+            self.signal_counts[is_customer][signal] += sign
+        self.ranks.add(score, sign)
+        if is_customer:
+            self.customer_ranks.add(score, sign)
+        bucket = self.buckets.setdefault(score, [])
+        item = (not is_customer, key)
+        if sign > 0:
+            bisect.insort(bucket, item)
+        else:
+            del bucket[bisect.bisect_left(bucket, item)]
+
+    def update(self, key, record, digest=None):
+        """Add or replace one company's enrichment record."""
+        signals = {s: v["score"] for s, v in record.get("signals", {}).items() if s in self.weights}
+        entry = (bool(record.get("is_known_customer")), self.score(signals), signals, digest,
+                 record.get("company_name") or key)
+        self.remove(key)
+        self.entries[key] = entry
+        self._apply(key, entry, 1)
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self._apply(key, entry, -1)
+
+    def load_file(self, path, digest=None):
+        """Load one enrichment file unless its content hash is already loaded. False if unreadable."""
+        path = Path(path)
+        entry = self.entries.get(path.stem)
+        if digest is not None and entry is not None and entry[3] == digest:
+            return True
+        try:
+            payload = path.read_bytes()
+            record = json.loads(payload)
+        except (OSError, ValueError):
+            return False
+        if "signals" in record:
+            self.update(path.stem, record, hashlib.sha256(payload).hexdigest())
+        return True
+
+    # Queries
+
+    def average_score(self, is_customer):
+        n = self.groups[is_customer]
+        return round(self.score_sums[is_customer] / n, 1) if n else 0
+
+    def signal_average(self, signal, is_customer):
+        n = self.signal_counts[is_customer][signal]
+        return round(self.signal_sums[is_customer][signal] / n, 1) if n else 0
+
+    def top_quartile(self):
+        """(cutoff, customers in the top `cutoff` companies)."""
+        n = len(self)
+        cutoff = max(1, n // 4)
+        if not n:
+            return cutoff, 0
+        threshold = self.ranks.kth(n - cutoff + 1)  # the cutoff-th highest score
+        above = self.ranks.count(threshold + 1, SCORE_VALUES - 1)
+        customers_above = self.customer_ranks.count(threshold + 1, SCORE_VALUES - 1)
+        customers_tied = self.customer_ranks.count(threshold, threshold)
+        return cutoff, customers_above + min(customers_tied, cutoff - above)  # ties: customers first
+
+    def bracket_counts(self, low, high):
+        """(customers, non-customers) scoring low..high."""
+        customers = self.customer_ranks.count(low, high)
+        return customers, self.ranks.count(low, high) - customers
+
+    def ranked(self, reverse=False):
+        """(company name, score, is_customer) from the highest score down (lowest up with reverse=True)."""
+        scores = range(SCORE_VALUES) if reverse else range(SCORE_VALUES - 1, -1, -1)
+        for score in scores:
+            bucket = self.buckets.get(score, ())
+            for not_customer, key in (reversed(bucket) if reverse else bucket):
+                yield self.entries[key][4], score, not not_customer
+
+
+class JournalFeed:
+    """Enrichment files marked done in the run journal since the last poll."""
+
+    def __init__(self, path):
+        self.journal = RunJournal(path)
+        self.since = ""
+
+    def poll(self):
+        rows = self.journal.finished_since(self.since)
+        if rows:
+            self.since = rows[-1][2]  # rows at this timestamp come back once more; their hashes match
+        return [(Path(path), digest) for path, digest, _ in rows if path], []
+
+    def close(self):
+        self.journal.close()
+
+
+class DirectoryFeed:
+    """Enrichment files created, changed or deleted since the last poll, by size and mtime."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.seen = {}  # file name -> (size, mtime_ns)
+
+    def poll(self):
+        changed = []
+        current = {}
+        if self.directory.exists():
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".json") and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    current[entry.name] = (stat.st_size, stat.st_mtime_ns)
+                    if self.seen.get(entry.name) != current[entry.name]:
+                        changed.append((Path(entry.path), None))
+        removed = [Path(name).stem for name in self.seen.keys() - current.keys()]
+        self.seen = current
+        return changed, removed
+
+    def close(self):
+        pass
+
+
+def print_summary(analysis, new):
+    customers, non_customers = analysis.groups[True], analysis.groups[False]
+    print(f"=== LIVE ANALYSIS {datetime.now():%H:%M:%S} ({len(analysis)} companies enriched, {new:+d}) ===")
+    print(f"Known customers: {customers}   Non-customers: {non_customers}")
+    if not len(analysis):
+        print()
+        return
+    cust_avg, non_avg = analysis.average_score(True), analysis.average_score(False)
+    print(f"Avg customer score: {cust_avg}   Avg non-customer score: {non_avg}   "
+          f"Separation: {cust_avg - non_avg:.1f} points")
+    cutoff, hits = analysis.top_quartile()
+    print(f"Top quartile: {hits}/{cutoff} customers, hit rate {hits / cutoff * 100:.0f}% "
+          f"(random {customers / len(analysis) * 100:.0f}%)")
+    print()
+
+    print(f"{'Signal':<25s} {'Cust Avg':>10s} {'Non-Cust Avg':>13s} {'Separation':>12s}")
+    rows = []
+    for signal in analysis.weights:
+        c, n = analysis.signal_average(signal, True), analysis.signal_average(signal, False)
+        rows.append((signal, c, n, round(c - n, 2)))
+    for signal, c, n, sep in sorted(rows, key=lambda r: r[3], reverse=True):
+        indicator = "***" if sep > 0.5 else "**" if sep > 0.3 else "*" if sep > 0.1 else ""
+        print(f"  {signal:<23s} {c:>8.1f}   {n:>10.1f}   {sep:>+10.2f}  {indicator}")
+    print()
+
+    print("Score brackets: " + "  ".join(
+        f"{low}-{high}: {c}/{n}" for (low, high), (c, n) in
+        ((b, analysis.bracket_counts(*b)) for b in BRACKETS)) + "  (customers/non-customers)")
+    print("Top 10:")
+    for i, (name, score, is_customer) in enumerate(analysis.ranked(), 1):
+        if i > 10:
+            break
+        print(f"  {i:2}. {name:40s} {score:3d}  {'CUSTOMER' if is_customer else ''}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep quick_analysis numbers up to date during an enrichment run.")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL,
+                        help=f"Seconds between polls (default {POLL_INTERVAL})")
+    parser.add_argument("--no-journal", action="store_true",
+                        help="Poll the enriched directory instead of the run journal")
+    parser.add_argument("--once", action="store_true", help="Print one summary and exit")
+    args = parser.parse_args()
+
+    analysis = LiveAnalysis(WEIGHTS)
+    directory = DirectoryFeed(ENRICHED_DIR)
+    use_journal = not args.no_journal and JOURNAL_FILE.exists()
+    feed = JournalFeed(JOURNAL_FILE) if use_journal else directory
+    print(f"Watching {JOURNAL_FILE if use_journal else ENRICHED_DIR} every {args.interval:g}s (Ctrl-C to stop)")
+    print()
+
+    if use_journal:
+        feed.poll()  # everything done so far is loaded by the directory scan below
+    pending = {}  # files not readable yet -> journal hash, retried next poll
+    poll = directory.poll
+    shown = -1
+    try:
+        while True:
+            changed, removed = poll()
+            count = len(analysis)
+            for key in removed:
+                analysis.remove(key)
+            pending.update(changed)
+            for path, digest in list(pending.items()):
+                if analysis.load_file(path, digest):
+                    del pending[path]
+            if analysis.updates != shown:
+                print_summary(analysis, len(analysis) - count)
+                shown = analysis.updates
+            if args.once:
+                break
+            poll = feed.poll
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        feed.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Run metrics for enrich.py: a JSONL attempt event stream, live counters and
+histograms, an EWMA throughput/ETA model, and a tiny local HTTP endpoint.
+
+    GET /metrics   OpenMetrics text (counters, call-duration histogram, gauges)
+    GET /progress  JSON snapshot (same numbers plus ETA)
+
+Throughput only counts companies finished in this run, so resumed work no
+longer makes the rate look faster than it is. The rate is an exponentially
+weighted moving average over fixed ticks, so one burst of completions does
+not swing the ETA.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import Counter
+from datetime import datetime
+
+DURATION_BUCKETS = (5, 15, 30, 60, 90, 120, 180, 240, 300, 600)
+
+
+class EventLog:
+    """Append-only JSONL file, one object per line, flushed per event."""
+
+    def __init__(self, path):
+        self.file = open(path, "a", buffering=1)
+
+    def emit(self, event, **fields):
+        record = {"event": event, "ts": datetime.now().isoformat(), **fields}
+        self.file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class RunMetrics:
+    def __init__(self, total, resumed, ewma_alpha=0.2):
+        self.total = total
+        self.resumed = resumed
+        self.ewma_alpha = ewma_alpha
+        self.started = time.time()
+
+        self.attempts = Counter()  # outcome -> count
+        self.duration_buckets = Counter()  # upper bound -> count (non-cumulative)
+        self.duration_sum = 0.0
+        self.duration_count = 0
+        self.bytes_out = 0
+        self.completed = 0  # this run only
+        self.failed = 0
+        self.gauges = {}
+
+        self.rate = None  # companies/second, EWMA
+        self._last_tick = self.started
+        self._completed_at_tick = 0
+
+    def observe_attempt(self, outcome, duration, bytes_out=0):
+        self.attempts[outcome] += 1
+        self.bytes_out += bytes_out
+        if outcome.endswith("cached"):
+            return
+        self.duration_sum += duration
+        self.duration_count += 1
+        bucket = next((b for b in DURATION_BUCKETS if duration <= b), float("inf"))
+        self.duration_buckets[bucket] += 1
+
+    def company_finished(self, ok):
+        if ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+
+    def set_gauge(self, name, value):
+        self.gauges[name] = value
+
+    def tick(self, now=None):
+        """Fold completions since the last tick into the EWMA rate."""
+        now = now or time.time()
+        interval = now - self._last_tick
+        if interval <= 0:
+            return
+        instant = (self.completed - self._completed_at_tick) / interval
+        if self.rate is None:
+            if self.completed:
+                # Seed from the whole run so far rather than one noisy interval
+                self.rate = self.completed / (now - self.started)
+        else:
+            self.rate = self.ewma_alpha * instant + (1 - self.ewma_alpha) * self.rate
+        self._last_tick = now
+        self._completed_at_tick = self.completed
+
+    @property
+    def remaining(self):
+        return max(self.total - self.resumed - self.completed - self.failed, 0)
+
+    def eta_seconds(self):
+        if not self.rate:
+            return None
+        return self.remaining / self.rate
+
+    def snapshot(self):
+        eta = self.eta_seconds()
+        return {
+            "completed_this_run": self.completed,
+            "resumed": self.resumed,
+            "failed": self.failed,
+            "remaining": self.remaining,
+            "throughput_per_hour": round(self.rate * 3600, 1) if self.rate else None,
+            "eta_seconds": round(eta) if eta is not None else None,
+            "attempts": dict(self.attempts),
+            "bytes_out": self.bytes_out,
+            **self.gauges,
+        }
+
+    def openmetrics(self):
+        lines = [
+            "# TYPE enrich_attempts counter",
+            "# HELP enrich_attempts CLI attempts by outcome.",
+        ]
+        for outcome, count in sorted(self.attempts.items()):
+            lines.append(f'enrich_attempts_total{{outcome="{outcome}"}} {count}')
+        lines += [
+            "# TYPE enrich_call_duration_seconds histogram",
+            "# UNIT enrich_call_duration_seconds seconds",
+        ]
+        cumulative = 0
+        for bound in (*DURATION_BUCKETS, float("inf")):
+            cumulative += self.duration_buckets.get(bound, 0)
+            le = "+Inf" if bound == float("inf") else str(bound)
+            lines.append(f'enrich_call_duration_seconds_bucket{{le="{le}"}} {cumulative}')
+        lines.append(f"enrich_call_duration_seconds_sum {self.duration_sum:.3f}")
+        lines.append(f"enrich_call_duration_seconds_count {self.duration_count}")
+        lines += [
+            "# TYPE enrich_output_bytes counter",
+            f"enrich_output_bytes_total {self.bytes_out}",
+            "# TYPE enrich_companies counter",
+            f'enrich_companies_total{{result="completed"}} {self.completed}',
+            f'enrich_companies_total{{result="failed"}} {self.failed}',
+            "# TYPE enrich_companies_remaining gauge",
+            f"enrich_companies_remaining {self.remaining}",
+            "# TYPE enrich_throughput_per_hour gauge",
+            f"enrich_throughput_per_hour {self.rate * 3600 if self.rate else 0:.3f}",
+        ]
+        eta = self.eta_seconds()
+        if eta is not None:
+            lines += ["# TYPE enrich_eta_seconds gauge", f"enrich_eta_seconds {eta:.0f}"]
+        for name, value in sorted(self.gauges.items()):
+            if isinstance(value, (int, float)):
+                lines += [f"# TYPE enrich_{name} gauge", f"enrich_{name} {value}"]
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+async def serve_metrics(metrics, port, host="127.0.0.1"):
+    """Start the /metrics and /progress endpoint; returns the asyncio server."""
+
+    async def handle(reader, writer):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode(errors="replace").split()
+            path = parts[1] if len(parts) > 1 else "/"
+            if path.startswith("/metrics"):
+                status = "200 OK"
+                ctype = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+                body = metrics.openmetrics()
+            elif path in ("/", "/progress"):
+                status = "200 OK"
+                ctype = "application/json"
+                body = json.dumps(metrics.snapshot(), indent=2)
+            else:
+                status, ctype, body = "404 Not Found", "text/plain", "not found\n"
+            payload = body.encode()
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {ctype}\r\n"
+                f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode() + payload
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logging.info(f"Metrics endpoint at http://{host}:{port}/metrics (JSON at /progress)")
+    return server
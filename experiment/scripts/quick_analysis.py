@@ -2,10 +2,28 @@
 Quick analysis of enrichment data we have so far.
 Check signal distributions, customer vs non-customer separation,
 and whether the experiment looks viable.
+
+With numpy installed, scores come from score_engine.SignalMatrix, which
+also powers the weight sweep: every combination of --values per signal
+(or the configurations in a --weights file) is scored in bulk and the best
+are listed by top-quartile hit rate or separation. --stats adds bootstrap
+confidence intervals and permutation p-values for the separation, the
+top-quartile hit rate and each signal (see resampling.py).
+
+Usage:
+    python experiment/scripts/quick_analysis.py
+    python experiment/scripts/quick_analysis.py --stats --resamples 20000 --seed 7
+    python experiment/scripts/quick_analysis.py --sweep --values 0,1,2,3 --rank-by separation --show 30
+    python experiment/scripts/quick_analysis.py --weights candidate_weights.json
 """
+import argparse
 import json
+import time
 from pathlib import Path
-from collections import defaultdict
+
+from resampling import CONFIDENCE, RESAMPLES, Resampler
+from result_store import STORE_FILE, ResultStore
+from score_engine import RANK_METRICS, SignalMatrix, np, weight_grid
 
 ENRICHED_DIR = Path(__file__).parent.parent / "data" / "enriched"
 
@@ -23,12 +41,26 @@ WEIGHTS = {
 }
 MAX_SCORE = 3 * sum(WEIGHTS.values())  # 57
 
-def load_all():
-    customers = []
-    non_customers = []
+def load_records(with_reasoning=False):
+    """All enriched records, from the result store if there is one, else the JSON files."""
+    if STORE_FILE.exists():
+        store = ResultStore(STORE_FILE)
+        if ENRICHED_DIR.exists():
+            store.sync_dir(ENRICHED_DIR)  # files the store has not seen, or has outlived
+        records = store.load_records(signals=list(WEIGHTS), with_reasoning=with_reasoning)
+        store.close()
+        if records:
+            return records
+    records = []
     for f in sorted(ENRICHED_DIR.glob("*.json")):
         with open(f) as fh:
-            data = json.load(fh)
+            records.append(json.load(fh))
+    return records
+
+def load_all(with_reasoning=False):
+    customers = []
+    non_customers = []
+    for data in load_records(with_reasoning):
         if data.get("is_known_customer"):
             customers.append(data)
         else:
@@ -44,7 +76,105 @@ def compute_score(company):
 def avg(lst):
     return round(sum(lst) / len(lst), 1) if lst else 0
 
+def score_all(customers, non_customers):
+    """(customer scores, non-customer scores, {signal: (customer avg, non-customer avg)}) under WEIGHTS."""
+    if np is None:
+        signal_avgs = {signal: (avg([c["signals"][signal]["score"] for c in customers]),
+                                avg([c["signals"][signal]["score"] for c in non_customers]))
+                       for signal in WEIGHTS}
+        return [compute_score(c) for c in customers], [compute_score(c) for c in non_customers], signal_avgs
+    matrix = SignalMatrix(customers + non_customers, WEIGHTS)
+    scores = matrix.score(WEIGHTS)[0].astype(int).tolist()
+    cust_means, non_means = matrix.signal_means()
+    signal_avgs = {signal: (round(float(c), 1), round(float(n), 1))
+                   for signal, c, n in zip(WEIGHTS, cust_means, non_means)}
+    return scores[:len(customers)], scores[len(customers):], signal_avgs
+
+def format_weights(weights, signals):
+    return " ".join(f"{s}={w:g}" for s, w in zip(signals, weights) if w)
+
+def sweep(args):
+    """Score many weight configurations at once and list the best."""
+    if np is None:
+        raise SystemExit("--sweep and --weights need numpy: pip install numpy")
+    customers, non_customers = load_all()
+    matrix = SignalMatrix(customers + non_customers, WEIGHTS)
+    if args.weights:
+        configs = json.loads(Path(args.weights).read_text())
+        chunks = [matrix.weight_matrix(configs if isinstance(configs, list) else [configs])]
+        source = str(args.weights)
+    else:
+        values = [int(v) for v in args.values.split(",")]
+        chunks = weight_grid(len(WEIGHTS), values)
+        source = f"weights {values} per signal"
+    print(f"=== WEIGHT SWEEP ({len(matrix)} companies, {int(matrix.is_customer.sum())} customers; {source}) ===")
+    if matrix.missing:
+        print(f"Missing signal scores (counted as 0): {matrix.missing}")
+
+    started = time.time()
+    best, count = matrix.sweep(chunks, rank_by=args.rank_by, keep=args.show)
+    elapsed = time.time() - started
+    print(f"Evaluated {count:,} configurations in {elapsed:.2f}s ({count / max(elapsed, 1e-9):,.0f}/s)")
+    if not count:
+        return
+    baseline = matrix.evaluate(WEIGHTS)
+    cutoff = baseline["cutoff"]
+    print(f"Current WEIGHTS: hit rate {baseline['hit_rate'][0] * 100:.0f}% "
+          f"({baseline['top_quartile_hits'][0]}/{cutoff}), separation {baseline['separation'][0]:.1f}")
+    print()
+
+    print(f"--- BEST {len(best['weights'])} BY {args.rank_by.upper().replace('_', ' ')} ---")
+    print(f"{'#':>3s} {'Hit rate':>9s} {'Top 25%':>8s} {'Separation':>11s} {'Top 10 cust':>12s}  Weights")
+    for i in range(len(best["weights"])):
+        in_top_10 = int(matrix.is_customer[best["top"][i]].sum())
+        print(f"{i + 1:3d} {best['hit_rate'][i] * 100:8.0f}% {best['top_quartile_hits'][i]:>4d}/{cutoff:<3d} "
+              f"{best['separation'][i]:>+11.1f} {in_top_10:>12d}  {format_weights(best['weights'][i], WEIGHTS)}")
+    print()
+
+    print("--- TOP 10 UNDER THE BEST CONFIGURATION ---")
+    scores = matrix.score(best["weights"][:1])[0]
+    for rank, j in enumerate(best["top"][0], 1):
+        label = "CUSTOMER" if matrix.is_customer[j] else ""
+        print(f"  {rank:2}. {matrix.names[j]:40s} {int(scores[j]):3d}  {label}")
+
+def print_stats(customers, non_customers, args):
+    """Bootstrap CIs and permutation p-values for the separation metrics under WEIGHTS."""
+    if np is None:
+        raise SystemExit("--stats needs numpy: pip install numpy")
+    resampler = Resampler(SignalMatrix(customers + non_customers, WEIGHTS), WEIGHTS)
+    started = time.time()
+    stats = resampler.summary(args.resamples, seed=args.seed)
+    elapsed = time.time() - started
+    print(f"--- RESAMPLING ({args.resamples:,} stratified bootstraps + {args.resamples:,} label permutations, "
+          f"{elapsed:.2f}s) ---")
+    print(f"{'Metric':<25s} {'Estimate':>10s} {f'{CONFIDENCE:.0%} CI':>20s} {'p':>9s}")
+    print("-" * 70)
+    for metric, row in stats.items():
+        scale, label = (100, "hit rate lift (pts)") if metric == "hit_lift" else (1, metric)
+        low, high = row["low"] * scale, row["high"] * scale
+        print(f"  {label:<23s} {row['estimate'] * scale:>+10.2f}   [{low:>+7.2f}, {high:>+7.2f}]   {row['p']:>7.4f}")
+    print()
+    print(f"  CI = stratified bootstrap percentile interval; p = two-sided permutation test "
+          f"(smallest possible {1 / (args.resamples + 1):.1g})")
+    print()
+
 def main():
+    parser = argparse.ArgumentParser(description="Score the enriched set and check customer separation.")
+    parser.add_argument("--sweep", action="store_true", help="Evaluate every weight combination from --values")
+    parser.add_argument("--values", default="0,1,2,3", help="Weights to try per signal in --sweep (default 0,1,2,3)")
+    parser.add_argument("--weights", metavar="FILE", help="JSON list of {signal: weight} configurations to compare")
+    parser.add_argument("--rank-by", choices=RANK_METRICS, default="hit_rate")
+    parser.add_argument("--show", type=int, default=20, help="Configurations to list (default 20)")
+    parser.add_argument("--stats", action="store_true",
+                        help="Add bootstrap CIs and permutation p-values for the separation metrics")
+    parser.add_argument("--resamples", type=int, default=RESAMPLES,
+                        help=f"Bootstrap and permutation resamples for --stats (default {RESAMPLES})")
+    parser.add_argument("--seed", type=int, help="Random seed for --stats (default: unseeded)")
+    args = parser.parse_args()
+    if args.sweep or args.weights:
+        sweep(args)
+        return
+
     customers, non_customers = load_all()
     print(f"=== EARLY ANALYSIS ({len(customers) + len(non_customers)} companies enriched) ===")
     print(f"Known customers: {len(customers)}")
@@ -52,8 +182,9 @@ def main():
     print()
 
     # Score everyone
-    cust_scores = [(c["company_name"], compute_score(c)) for c in customers]
-    non_cust_scores = [(c["company_name"], compute_score(c)) for c in non_customers]
+    cust_score_list, non_cust_score_list, signal_avgs = score_all(customers, non_customers)
+    cust_scores = [(c["company_name"], s) for c, s in zip(customers, cust_score_list)]
+    non_cust_scores = [(c["company_name"], s) for c, s in zip(non_customers, non_cust_score_list)]
 
     all_scores = [(name, score, True) for name, score in cust_scores] + \
                  [(name, score, False) for name, score in non_cust_scores]
@@ -102,10 +233,7 @@ def main():
 
     signal_separations = []
     for signal in WEIGHTS:
-        cust_vals = [c["signals"][signal]["score"] for c in customers]
-        non_cust_vals = [c["signals"][signal]["score"] for c in non_customers]
-        cust_avg = avg(cust_vals)
-        non_cust_avg = avg(non_cust_vals)
+        cust_avg, non_cust_avg = signal_avgs[signal]
         sep = round(cust_avg - non_cust_avg, 2)
         signal_separations.append((signal, cust_avg, non_cust_avg, sep, WEIGHTS[signal]))
 
@@ -118,6 +246,9 @@ def main():
     print("  *** = strong separation (>0.5)  ** = moderate (>0.3)  * = weak (>0.1)")
     print()
 
+    if args.stats:
+        print_stats(customers, non_customers, args)
+
     # Score distribution
     print(f"--- SCORE DISTRIBUTION ---")
     brackets = [(0, 20), (21, 40), (41, 60), (61, 80), (81, 100)]
@@ -0,0 +1,237 @@
+"""
+Quota-window scheduling for enrich.py (replaces run_at_3am.sh / run_enrichment.sh).
+
+A window is a daily local-time span with an optional budget of CLI calls
+and/or tokens, e.g. the hours after the API quota resets:
+
+    night=23:30-05:00,calls=400,tokens=3000000
+
+Windows may cross midnight, and their budgets reset at every occurrence.
+The schedule gates the governor the same way the circuit breaker does:
+
+- outside every window no call starts; the run waits, then resumes on its
+  own when the next window opens
+- inside a window, calls are paced so the budget is spent evenly: by a
+  given point in the window at most that share of the budget (plus a small
+  burst allowance) has been used
+- no new call starts in the last `drain_seconds` of a window, so calls in
+  flight can finish before it closes. Nothing is killed, so the journal
+  stays intact
+- a spent budget closes the window early
+
+Usage is saved to a small JSON state file after each call, so a restart in
+the middle of a window does not get a fresh budget.
+
+Token usage is an estimate: `--output-format text` reports no usage, so each
+call is charged (prompt + output characters) / CHARS_PER_TOKEN. Tool-use
+tokens (web search results) are not visible, so set token budgets with
+headroom, or budget by calls.
+
+Usage (from the repo root; the process waits for the window itself, on any OS):
+    nohup python3 experiment/scripts/enrich.py --window night=03:00-09:00 > experiment/enrichment_stdout.log 2>&1 &
+    python3 experiment/scripts/enrich.py --window late=23:30-04:30,calls=400 --window early=04:30-09:00,tokens=2000000
+    python3 experiment/scripts/enrich.py --window night=23:30-05:00 --queue postgresql://host/db
+"""
+import json
+import logging
+import os
+import re
+import tempfile
+from datetime import datetime, time as dtime, timedelta
+from pathlib import Path
+
+CHARS_PER_TOKEN = 4
+PACING_BURST = 0.05  # share of a window's budget that may run ahead of the even pace
+WINDOW_SPEC = re.compile(r"^(?P<name>[\w-]+)=(?P<start>\d{1,2}:\d{2})-(?P<end>\d{1,2}:\d{2})(?P<opts>(?:,\w+=\d+)*)$")
+
+
+def estimate_tokens(prompt, output):
+    return (len(prompt) + len(output or "")) // CHARS_PER_TOKEN
+
+
+def _parse_clock(text):
+    hour, minute = (int(x) for x in text.split(":"))
+    if hour == 24 and minute == 0:
+        return dtime(23, 59, 59)
+    return dtime(hour, minute)
+
+
+class QuotaWindow:
+    def __init__(self, name, start, end, calls=None, tokens=None):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.calls = calls
+        self.tokens = tokens
+
+    @classmethod
+    def parse(cls, spec):
+        """QuotaWindow from NAME=HH:MM-HH:MM[,calls=N][,tokens=N]; raises ValueError."""
+        m = WINDOW_SPEC.match(spec.strip())
+        if not m:
+            raise ValueError(f"bad window {spec!r}; expected NAME=HH:MM-HH:MM[,calls=N][,tokens=N]")
+        budgets = {}
+        for opt in filter(None, m["opts"].split(",")):
+            key, value = opt.split("=")
+            if key not in ("calls", "tokens"):
+                raise ValueError(f"unknown window budget {key!r} in {spec!r} (use calls= or tokens=)")
+            budgets[key] = int(value)
+        start, end = _parse_clock(m["start"]), _parse_clock(m["end"])
+        if start == end:
+            raise ValueError(f"window {spec!r} is empty")
+        return cls(m["name"], start, end, **budgets)
+
+    @property
+    def length(self):
+        start = datetime.combine(datetime.min, self.start)
+        end = datetime.combine(datetime.min, self.end)
+        return (end - start) % timedelta(days=1)
+
+    def occurrence(self, now):
+        """(start, end) datetimes of the occurrence containing `now`, or None."""
+        for day in (now.date() - timedelta(days=1), now.date()):
+            start = datetime.combine(day, self.start)
+            if start <= now < start + self.length:
+                return start, start + self.length
+        return None
+
+    def next_start(self, now):
+        start = datetime.combine(now.date(), self.start)
+        return start if start > now else start + timedelta(days=1)
+
+    def __str__(self):
+        budget = ", ".join(f"{n} {k}" for k, n in (("calls", self.calls), ("tokens", self.tokens)) if n)
+        return f"{self.name} {self.start:%H:%M}-{self.end:%H:%M}" + (f" ({budget})" if budget else "")
+
+
+class QuotaSchedule:
+    def __init__(self, windows, state_path=None, drain_seconds=0, burst=PACING_BURST, clock=datetime.now):
+        self.windows = windows
+        self.state_path = Path(state_path) if state_path else None
+        self.drain_seconds = drain_seconds
+        self.burst = burst
+        self.clock = clock
+
+        self.active = None  # (window, start, end) currently open
+        self.calls = 0  # used in the active occurrence
+        self.tokens = 0
+        self.tokens_per_call = None  # running mean, to reserve tokens before a call
+        self._charged_calls = 0
+        self._announced = None  # last wait reason logged, so each is logged once
+        self._saved = self._load()
+
+    def _load(self):
+        if not self.state_path or not self.state_path.exists():
+            return None
+        try:
+            return json.loads(self.state_path.read_text())
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _save(self):
+        if not self.state_path or not self.active:
+            return
+        window, start, _ = self.active
+        state = {"window": window.name, "occurrence": start.isoformat(),
+                 "calls": self.calls, "tokens": self.tokens, "updated_at": self.clock().isoformat()}
+        fd, tmp = tempfile.mkstemp(dir=self.state_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp, self.state_path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def _current(self, now):
+        for window in self.windows:
+            span = window.occurrence(now)
+            if span:
+                return window, *span
+        return None
+
+    def _enter(self, current):
+        window, start, end = current
+        self.active = current
+        self.calls = self.tokens = 0
+        saved = self._saved
+        if saved and saved.get("window") == window.name and saved.get("occurrence") == start.isoformat():
+            self.calls, self.tokens = saved.get("calls", 0), saved.get("tokens", 0)
+        self._announced = None
+        logging.info(f"  [schedule] Window {window} open until {end:%H:%M}"
+                     + (f"; resuming with {self.calls} calls / {self.tokens} tokens used" if self.calls else ""))
+
+    def _allowance(self, budget, now):
+        """Budget usable by `now`: an even share of the window so far plus the burst allowance."""
+        _, start, end = self.active
+        usable = (end - start).total_seconds() - self.drain_seconds
+        share = min((now - start).total_seconds() / usable, 1.0) if usable > 0 else 1.0
+        return min(budget, budget * share + max(1, budget * self.burst))
+
+    def next_open(self, now=None):
+        now = now or self.clock()
+        return min(((w.next_start(now), w) for w in self.windows), key=lambda p: p[0]) if self.windows else None
+
+    def admits(self):
+        """Whether a new call may start now (opens and closes windows as the clock moves)."""
+        now = self.clock()
+        current = self._current(now)
+        if current and (self.active is None or current[:2] != self.active[:2]):
+            self._enter(current)
+        elif current is None and self.active:
+            logging.info(f"  [schedule] Window {self.active[0].name} closed "
+                         f"({self.calls} calls, {self.tokens} tokens used)")
+            self.active = None
+        if self.active is None:
+            self._announce_wait(now)
+            return False
+
+        window, _, end = self.active
+        if (end - now).total_seconds() < self.drain_seconds or self.exhausted():
+            if self._announced != window:
+                self._announced = window
+                reason = "budget spent" if self.exhausted() else "draining before the window ends"
+                logging.info(f"  [schedule] Window {window.name}: {reason}; no new calls until the next window")
+            return False
+        if window.calls is not None and self.calls >= self._allowance(window.calls, now):
+            return False
+        if window.tokens is not None and self.tokens + (self.tokens_per_call or 0) > self._allowance(window.tokens, now):
+            return False
+        return True
+
+    def _announce_wait(self, now):
+        upcoming = self.next_open(now)
+        if upcoming and self._announced != upcoming[0]:
+            self._announced = upcoming[0]
+            start, window = upcoming
+            logging.info(f"  [schedule] Outside every window; waiting until {start:%Y-%m-%d %H:%M} ({window})")
+
+    def exhausted(self):
+        """True once the active window's whole budget is spent."""
+        if not self.active:
+            return False
+        window = self.active[0]
+        return ((window.calls is not None and self.calls >= window.calls)
+                or (window.tokens is not None and self.tokens >= window.tokens))
+
+    def on_start(self):
+        self.calls += 1
+        self._save()
+
+    def record_tokens(self, tokens):
+        """Charge a finished call's (estimated) tokens to the active window."""
+        self.tokens += tokens
+        self._charged_calls += 1
+        mean = self.tokens_per_call or tokens
+        self.tokens_per_call = mean + (tokens - mean) / min(self._charged_calls, 20)
+        self._save()
+
+    def snapshot(self):
+        now = self.clock()
+        upcoming = None if self.active else self.next_open(now)
+        return {
+            "window": self.active[0].name if self.active else None,
+            "window_calls_used": self.calls if self.active else 0,
+            "window_tokens_used": self.tokens if self.active else 0,
+            "seconds_until_window": round((upcoming[0] - now).total_seconds()) if upcoming else 0,
+        }
@@ -0,0 +1,112 @@
+"""
+On-disk, content-addressed cache of raw `claude -p` stdout.
+
+Keyed by a SHA-256 of everything that determines the response: the built
+prompt, model, max turns and tool list. Each entry is one small JSON file
+under a two-character shard directory:
+
+    <root>/ab/ab12...ef.json  ->  {"stdout": ..., "created_at": ..., "model": ..., ...}
+
+File mtime doubles as "last used" so size-based eviction is LRU. Writes go
+through a temp file and os.replace, so a crash never leaves a torn entry.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+
+def cache_key(prompt, model, max_turns, tools):
+    """Stable hash of one CLI request."""
+    payload = json.dumps(
+        {"prompt": prompt, "model": model, "max_turns": max_turns, "tools": sorted(tools)},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, root, ttl_seconds=None, max_bytes=None):
+        self.root = Path(root)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key):
+        """Return cached stdout for `key`, or None on a miss or expired entry."""
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+        if self.ttl_seconds is not None and time.time() - entry.get("created_ts", 0) > self.ttl_seconds:
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        # Touch for LRU eviction
+        os.utime(path)
+        self.hits += 1
+        return entry["stdout"]
+
+    def put(self, key, stdout, **meta):
+        """Store stdout for `key` atomically. Extra keyword args are kept as metadata."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "stdout": stdout,
+            "created_at": datetime.now().isoformat(),
+            "created_ts": time.time(),
+            **meta,
+        }
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def evict(self):
+        """Drop expired entries, then least-recently-used ones until under max_bytes.
+
+        Returns the number of entries removed.
+        """
+        if not self.root.exists():
+            return 0
+        now = time.time()
+        entries = []
+        removed = 0
+        for path in self.root.glob("*/*.json"):
+            st = path.stat()
+            # mtime (last use) is never older than creation, so an entry
+            # untouched for longer than the TTL is certainly expired
+            if self.ttl_seconds is not None and now - st.st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                removed += 1
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        if self.max_bytes is not None:
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+        return removed
+
+    def stats(self):
+        return {"cache_hits": self.hits, "cache_misses": self.misses}
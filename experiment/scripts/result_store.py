@@ -0,0 +1,206 @@
+"""
+Single-file result store for enriched companies (SQLite).
+
+    companies(key PK, domain, company_name, is_known_customer, enriched_at, model, extra)
+    signals(key, signal, score, reasoning, rubric_version)  PK (key, signal)
+
+`key` is the enrichment file stem (the sanitized input domain), so it matches
+data/enriched/<key>.json even when the model reports a different domain.
+
+`extra` holds every other top-level field of the record as JSON, so
+load_records() round-trips what enrich.py wrote. Reads only touch the
+columns asked for: load_records(with_reasoning=False) never reads the
+reasoning text, and `signals=` restricts which signal rows are scanned.
+
+Usage:
+    python experiment/scripts/result_store.py import            # backfill from data/enriched/*.json
+    python experiment/scripts/result_store.py export --parquet DIR  # needs pyarrow
+"""
+import argparse
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+ENRICHED_DIR = DATA_DIR / "enriched"
+STORE_FILE = DATA_DIR / "enriched.sqlite"
+
+CORE_FIELDS = {"company_name", "domain", "is_known_customer", "enriched_at", "model", "signals", "rubric_versions"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS companies (
+    key TEXT PRIMARY KEY,
+    domain TEXT,
+    company_name TEXT NOT NULL,
+    is_known_customer INTEGER NOT NULL,
+    enriched_at TEXT,
+    model TEXT,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS signals (
+    key TEXT NOT NULL,
+    signal TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    reasoning TEXT,
+    rubric_version TEXT,
+    PRIMARY KEY (key, signal)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS signals_by_signal ON signals(signal, key, score);
+"""
+
+
+def read_record(path):
+    """An enrichment file's record, or None if it is unreadable or not shaped like one.
+
+    Torn or malformed files are left for enrich.py to re-enrich rather than
+    stopping an import.
+    """
+    try:
+        with open(path) as fh:
+            record = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    signals = record.get("signals") if isinstance(record, dict) else None
+    if not isinstance(signals, dict):
+        return None
+    for signal in signals.values():
+        if not isinstance(signal, dict) or isinstance(signal.get("score"), bool) \
+                or not isinstance(signal.get("score"), (int, float)):
+            return None
+    return record
+
+
+class ResultStore:
+    def __init__(self, path=STORE_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def upsert(self, key, record):
+        """Insert or replace one enrichment record and all of its signals."""
+        versions = record.get("rubric_versions", {})
+        extra = {k: v for k, v in record.items() if k not in CORE_FIELDS}
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO companies VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, record.get("domain", ""), record.get("company_name", ""), int(bool(record.get("is_known_customer"))),
+                 record.get("enriched_at"), record.get("model"), json.dumps(extra)),
+            )
+            self.conn.execute("DELETE FROM signals WHERE key = ?", (key,))
+            self.conn.executemany(
+                "INSERT INTO signals VALUES (?, ?, ?, ?, ?)",
+                [(key, name, s["score"], s.get("reasoning"), versions.get(name))
+                 for name, s in record.get("signals", {}).items()],
+            )
+
+    def import_dir(self, enriched_dir=ENRICHED_DIR):
+        """Backfill from per-domain JSON files. Returns the number imported."""
+        count = 0
+        for f in sorted(Path(enriched_dir).glob("*.json")):
+            record = read_record(f)
+            if record is not None:
+                self.upsert(f.stem, record)
+                count += 1
+        return count
+
+    def sync_dir(self, enriched_dir=ENRICHED_DIR):
+        """Import enrichment files missing from the store and drop records whose file is gone.
+
+        enrich.py only upserts what it saves, so files from before the store
+        existed (or skipped as already done) are picked up here. Returns
+        (imported, removed).
+        """
+        files = {f.stem: f for f in Path(enriched_dir).glob("*.json")}
+        stored = {key for (key,) in self.conn.execute("SELECT key FROM companies")}
+        imported = 0
+        for key in sorted(files.keys() - stored):
+            record = read_record(files[key])
+            if record is not None:
+                self.upsert(key, record)
+                imported += 1
+        removed = [(key,) for key in sorted(stored - files.keys())]
+        with self.conn:
+            self.conn.executemany("DELETE FROM companies WHERE key = ?", removed)
+            self.conn.executemany("DELETE FROM signals WHERE key = ?", removed)
+        return imported, len(removed)
+
+    def load_records(self, signals=None, with_reasoning=False, with_extra=False):
+        """Records shaped like the enrichment JSON, reading only the requested columns."""
+        cols = "key, domain, company_name, is_known_customer, enriched_at, model"
+        if with_extra:
+            cols += ", extra"
+        records = {}
+        for row in self.conn.execute(f"SELECT {cols} FROM companies ORDER BY key"):
+            key, domain, name, is_cust, enriched_at, model = row[:6]
+            record = {"company_name": name, "domain": domain, "is_known_customer": bool(is_cust),
+                      "enriched_at": enriched_at, "model": model, "signals": {}}
+            if with_extra and row[6]:
+                record.update(json.loads(row[6]))
+            records[key] = record
+
+        sig_cols = "key, signal, score" + (", reasoning" if with_reasoning else "")
+        query = f"SELECT {sig_cols} FROM signals"
+        params = []
+        if signals is not None:
+            query += f" WHERE signal IN ({', '.join('?' * len(signals))})"
+            params = list(signals)
+        for row in self.conn.execute(query, params):
+            entry = {"score": row[2]}
+            if with_reasoning:
+                entry["reasoning"] = row[3]
+            records[row[0]]["signals"][row[1]] = entry
+        return list(records.values())
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM companies").fetchone()[0]
+
+    def export_parquet(self, out_dir):
+        """Write companies.parquet and signals.parquet (requires pyarrow)."""
+        if pa is None:
+            raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow")
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for table in ("companies", "signals"):
+            cur = self.conn.execute(f"SELECT * FROM {table}")
+            names = [d[0] for d in cur.description]
+            columns = list(zip(*cur.fetchall())) or [[] for _ in names]
+            arrow_table = pa.table({n: list(col) for n, col in zip(names, columns)})
+            pq.write_table(arrow_table, out_dir / f"{table}.parquet")
+        return out_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the enriched-company result store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("import", help=f"Backfill from {ENRICHED_DIR}")
+    export = sub.add_parser("export", help="Export tables to Parquet")
+    export.add_argument("--parquet", required=True, metavar="DIR")
+    args = parser.parse_args()
+
+    store = ResultStore()
+    if args.command == "import":
+        n = store.import_dir()
+        print(f"Imported {n} records into {STORE_FILE} ({store.count()} companies total)")
+    elif args.command == "export":
+        try:
+            out = store.export_parquet(args.parquet)
+        except RuntimeError as e:
+            print(e)
+            sys.exit(1)
+        print(f"Exported companies.parquet and signals.parquet to {out}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Error-classified retry policy for enrich.py.
+
+Every failed attempt is assigned one class, and each class has its own retry
+budget and backoff:
+
+    quota    rate-limit / usage-limit / overloaded errors from the CLI
+    auth     not logged in or bad credentials (never retried)
+    crash    any other non-zero exit, a killed process, empty output
+    timeout  no complete result within the call timeout
+    parse    output arrived but held no valid enrichment object
+
+Quota and auth errors also feed the governor's circuit breaker, which stops
+every worker at once during an outage. The per-company quota budget only
+limits how many outages one company waits through.
+"""
+import random
+import re
+from collections import Counter
+
+from concurrency import AUTH, QUOTA
+
+CRASH = "crash"
+TIMEOUT = "timeout"
+PARSE = "parse"
+
+QUOTA_PATTERN = re.compile(
+    r"rate.?limit|usage limit|too many requests|quota|overloaded|\b429\b|\b529\b|credit balance", re.I
+)
+AUTH_PATTERN = re.compile(
+    r"\b401\b|\b403\b|unauthori[sz]ed|invalid api key|authentication|not logged in|please run /login", re.I
+)
+
+# retries: extra attempts after failures of this class; delays in seconds
+RETRY_RULES = {
+    QUOTA: {"retries": 4, "base_delay": 60, "max_delay": 600},
+    AUTH: {"retries": 0, "base_delay": 0, "max_delay": 0},
+    CRASH: {"retries": 2, "base_delay": 15, "max_delay": 60},
+    TIMEOUT: {"retries": 1, "base_delay": 30, "max_delay": 30},
+    PARSE: {"retries": 1, "base_delay": 5, "max_delay": 5},
+}
+
+
+def classify(outcome, message=""):
+    """Error class for an attempt outcome from enrich.py (timeout, cli_error, empty, ...)."""
+    if outcome == "timeout":
+        return TIMEOUT
+    if outcome in ("unparseable", "invalid"):
+        return PARSE
+    message = message or ""
+    if AUTH_PATTERN.search(message):
+        return AUTH
+    if QUOTA_PATTERN.search(message):
+        return QUOTA
+    return CRASH
+
+
+def backoff(rule, retry):
+    """Exponential delay for the `retry`-th retry (1-based), capped, with jitter in its upper half."""
+    delay = min(rule["base_delay"] * 2 ** (retry - 1), rule["max_delay"])
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class RetryBudget:
+    """Per-company retry state: what each error class has used so far."""
+
+    def __init__(self, max_attempts, rules=RETRY_RULES):
+        self.max_attempts = max_attempts
+        self.rules = rules
+        self.attempts = 0
+        self.used = Counter()
+
+    def next_delay(self, error_class):
+        """Record a failed attempt; seconds to wait before retrying, or None to give up."""
+        self.attempts += 1
+        self.used[error_class] += 1
+        rule = self.rules[error_class]
+        if self.used[error_class] > rule["retries"] or self.attempts >= self.max_attempts:
+            return None
+        return backoff(rule, self.used[error_class])
+
+    def summary(self):
+        return ", ".join(f"{cls} x{n}" for cls, n in self.used.most_common())
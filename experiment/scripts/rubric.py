@@ -0,0 +1,94 @@
+"""
+Per-signal rubric fingerprints for enrichment_prompt.txt.
+
+The template is split into three parts:
+- preamble: everything before "SIGNAL SCORING RUBRICS"
+- one section per signal, each starting with a line "<signal_name> - ..."
+- the "OUTPUT FORMAT" block
+
+Each signal's section text is hashed, so editing one rubric only marks that
+signal stale. build_partial_template() rebuilds a template that asks for a
+subset of signals, keeping the same preamble and company data placeholder.
+build_batch_template() asks for several companies at once, keyed by batch_id.
+"""
+import hashlib
+import json
+import re
+
+RUBRICS_HEADER = "SIGNAL SCORING RUBRICS"
+OUTPUT_HEADER = "OUTPUT FORMAT"
+SECTION_START = re.compile(r"^([a-z][a-z_]*) - ", re.MULTILINE)
+
+
+def split_template(template):
+    """Return (preamble, {signal: section_text}, output_block)."""
+    rubrics_at = template.index(RUBRICS_HEADER)
+    output_at = template.index(OUTPUT_HEADER, rubrics_at)
+    preamble = template[:rubrics_at]
+    body = template[rubrics_at:output_at]
+    output_block = template[output_at:]
+
+    sections = {}
+    starts = list(SECTION_START.finditer(body))
+    for i, m in enumerate(starts):
+        end = starts[i + 1].start() if i + 1 < len(starts) else len(body)
+        sections[m.group(1)] = body[m.start():end].strip()
+    return preamble, sections, output_block
+
+
+def fingerprint(text):
+    return hashlib.sha256(text.encode()).hexdigest()[:12]
+
+
+def rubric_fingerprints(template):
+    """{signal: short hash of that signal's rubric section}."""
+    _, sections, _ = split_template(template)
+    return {signal: fingerprint(text) for signal, text in sections.items()}
+
+
+def stale_signals(record, fingerprints):
+    """Signals in `record` whose rubric version differs from the current template."""
+    versions = record.get("rubric_versions", {})
+    return [s for s, fp in fingerprints.items() if versions.get(s) != fp]
+
+
+def build_partial_template(template, signals):
+    """Template that only asks for `signals`, with a matching output format."""
+    preamble, sections, _ = split_template(template)
+    preamble = re.sub(r"exactly \d+ signals?", f"exactly {len(signals)} signal{'s' if len(signals) != 1 else ''}", preamble)
+
+    rubric_text = "\n\n".join(sections[s] for s in signals)
+    output_format = {
+        "company_name": "",
+        "domain": "",
+        "signals": {s: {"score": 0, "reasoning": ""} for s in signals},
+    }
+    return (
+        f"{preamble}{RUBRICS_HEADER} (with examples):\n\n{rubric_text}\n\n"
+        f"{OUTPUT_HEADER} (valid JSON only, no other text):\n{json.dumps(output_format, indent=2)}\n"
+    )
+
+
+BATCH_INSTRUCTIONS = """BATCH MODE:
+COMPANY DATA below is a JSON array of {size} companies. Research and score EACH company independently, exactly as you would on its own, using the rubrics below.
+Copy each company's "batch_id" into its result verbatim. Return ONE JSON object of the form {{"results": [...]}} with exactly one result per company, in the same order as the input.
+
+"""
+
+
+def build_batch_template(template, size):
+    """Template for `size` companies in one call; results come back keyed by batch_id."""
+    preamble, sections, output_block = split_template(template)
+    preamble = preamble.replace("COMPANY DATA:", BATCH_INSTRUCTIONS.format(size=size) + "COMPANY DATA:")
+
+    # Per-company skeleton from the original output block, plus the batch key
+    skeleton = json.loads(output_block[output_block.index("{"):])
+    result = {"batch_id": "", **skeleton}
+    output_format = {"results": [result]}
+
+    rubric_text = "\n\n".join(sections.values())
+    return (
+        f"{preamble}{RUBRICS_HEADER} (with examples):\n\n{rubric_text}\n\n"
+        f"{OUTPUT_HEADER} (valid JSON only, no other text; one entry in \"results\" per company):\n"
+        f"{json.dumps(output_format, indent=2)}\n"
+    )
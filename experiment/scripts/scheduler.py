@@ -0,0 +1,112 @@
+"""
+Makespan-aware ordering for enrich.py: longest expected enrichment first.
+
+Durations are learned from past runs: the run journal (per-company duration)
+and enrichment.log ("Enriching" -> "Saved to" spans,
+which include retries and backoff). A company seen before is predicted from
+its own history. Otherwise the prediction comes from companies with the
+same size bucket and company type, then the size bucket alone, then the
+global median.
+
+Dispatching the longest jobs first (LPT) keeps a few slow, retry-heavy
+companies from running alone at the end of a run. The governor's slot queue
+hands out work dynamically, so a slot that frees up early just takes the
+next job in this order.
+"""
+import statistics
+from collections import defaultdict
+
+DEFAULT_SECONDS = 90  # median company duration across the February runs
+MIN_SAMPLES = 3  # samples needed before a feature bucket is trusted
+
+
+def size_bucket(employee_count):
+    if not employee_count:
+        return "unknown"
+    if employee_count < 200:
+        return "<200"
+    if employee_count < 1000:
+        return "200-1k"
+    if employee_count < 5000:
+        return "1k-5k"
+    return "5k+"
+
+
+class DurationModel:
+    def __init__(self):
+        self.by_domain = defaultdict(list)
+        self.by_features = defaultdict(list)
+        self.by_size = defaultdict(list)
+        self.all = []
+        self._attached = set()  # domains whose samples are already in the feature buckets
+
+    def add(self, domain, seconds, company=None):
+        """Record one observed company duration (retries and backoff included)."""
+        domain = domain.lower().rstrip(".")
+        self.by_domain[domain].append(seconds)
+        self.all.append(seconds)
+        if company is not None:
+            self._attached.add(domain)
+            size = size_bucket(company.get("employee_count"))
+            self.by_features[(size, company.get("type", ""))].append(seconds)
+            self.by_size[size].append(seconds)
+
+    def attach(self, company):
+        """Credit a company's own past durations to its size/type buckets.
+
+        Lets samples recorded by domain alone be matched to company features
+        as a (streamed) company list is read. Each domain is credited once.
+        """
+        domain = company["domain"].lower().rstrip(".")
+        samples = self.by_domain.get(domain)
+        if not samples or domain in self._attached:
+            return
+        self._attached.add(domain)
+        size = size_bucket(company.get("employee_count"))
+        self.by_features[(size, company.get("type", ""))].extend(samples)
+        self.by_size[size].extend(samples)
+
+    def predict(self, company):
+        """Expected wall-clock seconds to enrich `company`."""
+        domain = company["domain"].lower().rstrip(".")
+        if domain in self.by_domain:
+            return statistics.median(self.by_domain[domain])
+
+        size = size_bucket(company.get("employee_count"))
+        for samples in (self.by_features.get((size, company.get("type", ""))), self.by_size.get(size), self.all):
+            if samples and (len(samples) >= MIN_SAMPLES or samples is self.all):
+                return statistics.median(samples)
+        return DEFAULT_SECONDS
+
+    def __len__(self):
+        return len(self.all)
+
+
+def fit_duration_model(companies=(), journal_rows=(), log_durations=()):
+    """Build a DurationModel from journal rows and parsed log spans.
+
+    `journal_rows`: (domain, duration_seconds) for finished companies.
+    `log_durations`: (domain, seconds) from enrichment_log.
+    Journal data wins for a domain that appears in both. `companies` may be
+    any iterable; a streamed list can instead be passed to model.attach()
+    one company at a time.
+    """
+    model = DurationModel()
+    seen = set()
+    for domain, seconds in journal_rows:
+        if seconds is None:
+            continue
+        seen.add(domain)
+        model.add(domain, seconds)
+    for domain, seconds in log_durations:
+        domain = domain.lower().rstrip(".")
+        if domain not in seen:
+            model.add(domain, seconds)
+    for company in companies:
+        model.attach(company)
+    return model
+
+
+def longest_first(items, predict):
+    """Sort `items` by predict(item), largest first (stable for ties)."""
+    return sorted(items, key=predict, reverse=True)
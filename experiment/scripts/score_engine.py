@@ -0,0 +1,141 @@
+"""
+Vectorized scoring for the enriched set (used by quick_analysis.py).
+
+SignalMatrix loads the enriched companies once into a companies x signals
+integer matrix. Scoring one weight vector is a matrix-vector product;
+scoring m of them is a single (m x signals) @ (signals x companies) matrix
+multiply, so thousands of weight configurations are evaluated per second.
+evaluate() reports, for every configuration, the numbers quick_analysis.py
+prints: average customer and non-customer score, their separation,
+customers in the top quartile, and the top 10.
+
+Scores match quick_analysis.compute_score: the weighted sum, normalized to
+0-100 by MAX_SIGNAL_SCORE x sum(weights) and rounded half to even. Rankings
+use a stable sort, so ties keep load order (customers first), as before.
+A signal missing from a record scores 0 and is counted in `missing`.
+
+Needs numpy (pip install numpy).
+"""
+from itertools import islice, product
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAX_SIGNAL_SCORE = 3
+SWEEP_CHUNK = 4096  # weight vectors scored per matrix multiply in a sweep
+RANK_METRICS = ("hit_rate", "separation")
+SWEEP_METRICS = ("hit_rate", "separation", "customer_avg", "non_customer_avg", "top_quartile_hits")
+
+
+def weight_grid(n_signals, values):
+    """Every weight vector over `values` per signal, in arrays of up to SWEEP_CHUNK rows.
+
+    All-zero vectors and scaled copies (weights with a common factor > 1,
+    which rank companies identically) are skipped.
+    """
+    combos = product(values, repeat=n_signals)
+    while True:
+        chunk = np.array(list(islice(combos, SWEEP_CHUNK)), dtype=np.int64).reshape(-1, n_signals)
+        if not len(chunk):
+            return
+        yield chunk[np.gcd.reduce(chunk, axis=1) == 1]
+
+
+class SignalMatrix:
+    def __init__(self, records, signals):
+        if np is None:
+            raise RuntimeError("The scoring engine needs numpy: pip install numpy")
+        self.signals = list(signals)
+        self.names = [r["company_name"] for r in records]
+        self.is_customer = np.array([bool(r.get("is_known_customer")) for r in records], dtype=bool)
+        self.scores = np.zeros((len(records), len(self.signals)), dtype=np.int8)
+        self.missing = 0
+        for i, record in enumerate(records):
+            found = record.get("signals", {})
+            for j, signal in enumerate(self.signals):
+                if signal in found:
+                    self.scores[i, j] = found[signal]["score"]
+                else:
+                    self.missing += 1
+        self._by_signal = self.scores.T.astype(np.float64)  # signals x companies, for the multiply
+
+    def __len__(self):
+        return len(self.names)
+
+    def weight_matrix(self, weights):
+        """(m, signals) array from a {signal: weight} dict, a list of them, or an array-like."""
+        if isinstance(weights, dict):
+            weights = [weights]
+        if len(weights) and isinstance(weights[0], dict):
+            weights = [[w.get(s, 0) for s in self.signals] for w in weights]
+        return np.atleast_2d(np.asarray(weights, dtype=np.float64))
+
+    def score(self, weights):
+        """0-100 scores, one row per weight vector: (m, companies)."""
+        w = self.weight_matrix(weights)
+        max_score = MAX_SIGNAL_SCORE * w.sum(axis=1, keepdims=True)
+        return np.round(w @ self._by_signal / max_score * 100)
+
+    def signal_means(self):
+        """(customer, non-customer) mean score per signal; 0 for an empty group."""
+        groups = self.scores[self.is_customer], self.scores[~self.is_customer]
+        return tuple(g.mean(axis=0) if len(g) else np.zeros(len(self.signals)) for g in groups)
+
+    def quartile_hits(self, scores):
+        """Customers in the top quartile of each row of `scores`, ties taken in load order like a stable sort.
+
+        Uses a partition for the cutoff score instead of sorting each row.
+        """
+        n = len(self)
+        cutoff = max(1, n // 4)
+        kth = np.partition(scores, n - cutoff, axis=1)[:, n - cutoff, None]  # the cutoff-th highest score
+        above = scores > kth
+        tied = scores == kth
+        room = cutoff - above.sum(axis=1, keepdims=True)
+        taken = tied & (np.cumsum(tied, axis=1) <= room)
+        return ((above | taken) & self.is_customer).sum(axis=1)
+
+    def evaluate(self, weights, top=10):
+        """Per weight vector: averages, separation and top-quartile hits, plus the top `top` company indices."""
+        scores = self.score(weights)
+        customer = self.is_customer
+        cutoff = max(1, len(self) // 4)
+        hits = self.quartile_hits(scores)
+        customer_avg = scores[:, customer].mean(axis=1) if customer.any() else np.zeros(len(scores))
+        non_customer_avg = scores[:, ~customer].mean(axis=1) if (~customer).any() else np.zeros(len(scores))
+        result = {
+            "scores": scores,
+            "customer_avg": customer_avg,
+            "non_customer_avg": non_customer_avg,
+            "separation": customer_avg - non_customer_avg,
+            "cutoff": cutoff,
+            "top_quartile_hits": hits,
+            "hit_rate": hits / cutoff,
+        }
+        if top:
+            result["top"] = np.argsort(-scores, axis=1, kind="stable")[:, :top]
+        return result
+
+    def sweep(self, weight_chunks, rank_by="hit_rate", keep=20):
+        """Evaluate every weight vector from `weight_chunks`; returns (best `keep` as {weights, metrics}, count).
+
+        Ranked by `rank_by`, the other metric breaking ties.
+        """
+        other = RANK_METRICS[rank_by == RANK_METRICS[0]]
+        best = None
+        count = 0
+        for chunk in weight_chunks:
+            if not len(chunk):
+                continue
+            count += len(chunk)
+            result = self.evaluate(chunk, top=0)
+            found = {"weights": self.weight_matrix(chunk), **{k: result[k] for k in SWEEP_METRICS}}
+            if best is not None:
+                found = {k: np.concatenate([best[k], v]) for k, v in found.items()}
+            ranked = np.lexsort((-found[other], -found[rank_by]))[:keep]
+            best = {k: v[ranked] for k, v in found.items()}
+        if best is not None:
+            best["top"] = self.evaluate(best["weights"])["top"]
+        return best, count
@@ -0,0 +1,275 @@
+"""
+Shared work queue for running enrich.py on several hosts at once.
+
+    tasks(key PK, company, work, version, priority, state, owner, lease_token,
+          lease_expires, claims, last_error, result, committed_by, updated_at)
+
+States: pending -> leased -> done | failed. A worker claims tasks under a
+lease token and heartbeats them. A lease that is not renewed in time
+expires, and the task can then be claimed by any other worker. Commits are
+gated on the token, so when two workers end up with the same company, only
+one result is ever committed. The loser's output is discarded. The committed
+record is stored in the queue, so `export` can write every result to any
+host's data/enriched/.
+
+`key` is journal_key() (the normalized domain). `work` is the list of stale
+signals for a partial re-score, or null for a full enrichment. `version`
+fingerprints the rubric set. Re-seeding with a new version re-opens
+finished tasks. Seeding also re-opens failed tasks, just as a plain re-run
+retries failures.
+
+Backends:
+    data/work_queue.sqlite / sqlite:///path   one host, or workers sharing a local disk
+    postgresql://user@host/db                 several hosts (needs psycopg)
+
+SQLite must not live on a network filesystem; use Postgres across machines.
+Lease expiry uses each worker's wall clock, so hosts need NTP-synced clocks.
+
+Usage:
+    python experiment/scripts/work_queue.py status [URL]
+    python experiment/scripts/work_queue.py export [URL] [DIR]
+    python experiment/scripts/work_queue.py requeue-failed [URL]
+"""
+import argparse
+import json
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+
+try:
+    import psycopg
+except ImportError:
+    psycopg = None
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+QUEUE_FILE = DATA_DIR / "work_queue.sqlite"
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS tasks (
+        key TEXT PRIMARY KEY,
+        company TEXT NOT NULL,
+        work TEXT,
+        version TEXT,
+        priority REAL NOT NULL DEFAULT 0,
+        state TEXT NOT NULL,
+        owner TEXT,
+        lease_token TEXT,
+        lease_expires DOUBLE PRECISION,
+        claims INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        result TEXT,
+        committed_by TEXT,
+        updated_at DOUBLE PRECISION NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS tasks_claimable ON tasks(state, priority)",
+    "CREATE INDEX IF NOT EXISTS tasks_token ON tasks(lease_token)",
+]
+
+
+class WorkQueue:
+    """Lease-based task queue over a DB-API connection (SQLite or Postgres)."""
+
+    placeholder = "?"
+    skip_locked = ""
+
+    def __init__(self, conn):
+        self.conn = conn
+        for statement in SCHEMA:
+            self._execute(statement)
+
+    def close(self):
+        self.conn.close()
+
+    def _execute(self, query, params=()):
+        return self.conn.execute(query.replace("?", self.placeholder), params)
+
+    def _executemany(self, query, rows):
+        self.conn.cursor().executemany(query.replace("?", self.placeholder), rows)
+
+    def seed(self, tasks, version):
+        """Queue work; `tasks` is [(key, company, stale signals or None, priority)].
+
+        New keys start pending; pending tasks take the new work and priority.
+        A task is re-opened when it failed, or when it was finished under
+        another rubric version. A task that is leased or already done under
+        this version is left alone, so workers that start later do not redo
+        work.
+        """
+        now = time.time()
+        self._executemany(
+            "INSERT INTO tasks (key, company, work, version, priority, state, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, 'pending', ?) "
+            "ON CONFLICT(key) DO UPDATE SET state = 'pending', work = excluded.work, "
+            "version = excluded.version, priority = excluded.priority, last_error = NULL, "
+            "updated_at = excluded.updated_at "
+            "WHERE tasks.state IN ('pending', 'failed') "
+            "OR (tasks.state = 'done' AND tasks.version != excluded.version)",
+            [(key, json.dumps(company), json.dumps(work) if work else None, version, priority, now)
+             for key, company, work, priority in tasks],
+        )
+        self.conn.commit()
+
+    def seed_done(self, keys, version):
+        """Record companies already finished on this host, so no other worker claims them."""
+        now = time.time()
+        self._executemany(
+            "INSERT INTO tasks (key, company, version, state, committed_by, updated_at) "
+            "VALUES (?, '{}', ?, 'done', 'seed', ?) "
+            "ON CONFLICT(key) DO UPDATE SET state = 'done', updated_at = excluded.updated_at "
+            "WHERE tasks.state = 'pending' AND tasks.version = excluded.version",
+            [(key, version, now) for key in keys],
+        )
+        self.conn.commit()
+
+    def claim(self, owner, limit, lease_seconds):
+        """Lease up to `limit` tasks, highest priority first, including expired leases.
+
+        Returns [{"key", "company", "stale", "token"}]. The single UPDATE is
+        atomic, so two workers never get the same task under a live lease.
+        """
+        if limit <= 0:
+            return []
+        token = uuid.uuid4().hex
+        now = time.time()
+        self._execute(
+            "UPDATE tasks SET state = 'leased', owner = ?, lease_token = ?, lease_expires = ?, "
+            "claims = claims + 1, updated_at = ? WHERE key IN ("
+            "SELECT key FROM tasks WHERE state = 'pending' OR (state = 'leased' AND lease_expires < ?) "
+            f"ORDER BY priority DESC LIMIT ?{self.skip_locked})",
+            (owner, token, now + lease_seconds, now, now, limit),
+        )
+        self.conn.commit()
+        rows = self._execute(
+            "SELECT key, company, work FROM tasks WHERE lease_token = ? ORDER BY priority DESC", (token,)
+        ).fetchall()
+        return [{"key": key, "company": json.loads(company), "stale": json.loads(work) if work else None,
+                 "token": token} for key, company, work in rows]
+
+    def heartbeat(self, tokens, lease_seconds):
+        """Extend every live lease held under `tokens`. Returns the number renewed."""
+        renewed = 0
+        expires = time.time() + lease_seconds
+        for token in tokens:
+            renewed += self._execute(
+                "UPDATE tasks SET lease_expires = ? WHERE lease_token = ? AND state = 'leased'",
+                (expires, token),
+            ).rowcount
+        self.conn.commit()
+        return renewed
+
+    def _finish(self, key, token, state, **fields):
+        fields["updated_at"] = time.time()
+        sets = ", ".join(f"{col} = ?" for col in fields)
+        changed = self._execute(
+            f"UPDATE tasks SET state = ?, lease_token = NULL, {sets} "
+            "WHERE key = ? AND lease_token = ? AND state = 'leased'",
+            (state, *fields.values(), key, token),
+        ).rowcount
+        self.conn.commit()
+        return changed == 1
+
+    def commit(self, key, token, owner, result):
+        """Store the result and mark the task done. False if the lease was lost."""
+        return self._finish(key, token, DONE, result=json.dumps(result), committed_by=owner, last_error=None)
+
+    def fail(self, key, token, error):
+        return self._finish(key, token, FAILED, last_error=error)
+
+    def release(self, key, token):
+        """Hand an unfinished task back (e.g. on shutdown) without counting it as failed."""
+        return self._finish(key, token, PENDING, owner=None, lease_expires=None)
+
+    def outstanding(self):
+        """Tasks that still need a worker: pending or leased (live or expired)."""
+        return self._execute("SELECT COUNT(*) FROM tasks WHERE state IN ('pending', 'leased')").fetchone()[0]
+
+    def counts(self):
+        return dict(self._execute("SELECT state, COUNT(*) FROM tasks GROUP BY state").fetchall())
+
+    def requeue_failed(self):
+        changed = self._execute(
+            "UPDATE tasks SET state = 'pending', last_error = NULL, updated_at = ? WHERE state = 'failed'",
+            (time.time(),),
+        ).rowcount
+        self.conn.commit()
+        return changed
+
+    def results(self):
+        """(key, record) for every task committed through the queue."""
+        for key, result in self._execute(
+            "SELECT key, result FROM tasks WHERE state = 'done' AND result IS NOT NULL ORDER BY key"
+        ):
+            yield key, json.loads(result)
+
+
+class SQLiteWorkQueue(WorkQueue):
+    def __init__(self, path=QUEUE_FILE):
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        super().__init__(conn)
+        self.conn.commit()
+
+
+class PostgresWorkQueue(WorkQueue):
+    placeholder = "%s"
+    # Concurrent claimers skip each other's candidate rows instead of blocking
+    skip_locked = " FOR UPDATE SKIP LOCKED"
+
+    def __init__(self, url):
+        if psycopg is None:
+            raise RuntimeError("A Postgres work queue needs psycopg: pip install 'psycopg[binary]'")
+        super().__init__(psycopg.connect(url))
+        self.conn.commit()
+
+
+def open_queue(url=None):
+    """Open a queue from a path, sqlite:///path or postgresql:// URL."""
+    url = str(url or QUEUE_FILE)
+    if url.startswith(("postgres://", "postgresql://")):
+        return PostgresWorkQueue(url)
+    if url.startswith("sqlite:///"):
+        url = url[len("sqlite:///"):]
+    return SQLiteWorkQueue(url)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and manage the shared enrichment work queue.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("status", "Task counts by state"),
+                            ("requeue-failed", "Move failed tasks back to pending")):
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument("url", nargs="?", default=str(QUEUE_FILE))
+    export = sub.add_parser("export", help="Write committed results as enrichment JSON files")
+    export.add_argument("url", nargs="?", default=str(QUEUE_FILE))
+    export.add_argument("out_dir", nargs="?", default=str(DATA_DIR / "enriched"))
+    args = parser.parse_args()
+
+    queue = open_queue(args.url)
+    if args.command == "status":
+        counts = queue.counts()
+        for state in (PENDING, LEASED, DONE, FAILED):
+            print(f"  {state:<8s} {counts.get(state, 0)}")
+    elif args.command == "requeue-failed":
+        print(f"Re-queued {queue.requeue_failed()} failed tasks")
+    elif args.command == "export":
+        # Imported here: enrich.py installs a SIGINT handler at import time
+        from enrich import get_output_path, write_json_atomic
+        out_dir = Path(args.out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        n = 0
+        for key, record in queue.results():
+            write_json_atomic(out_dir / get_output_path({"domain": key}).name, record)
+            n += 1
+        print(f"Exported {n} records to {out_dir}")
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()